@@ -1,15 +1,105 @@
 import sqlite3
 from neo4j import GraphDatabase
 from models.m_sqlite import m_sqlite
-import pandas as pd
 import os
 import argparse
 from datetime import datetime
 import difflib
+import hashlib
+import json
 import sys
+import csv
+import html
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from urllib.request import pathname2url
+
+# Comparaison des données par sommes de contrôle : nombre de sous-fenêtres par niveau
+# et taille (en lignes) à partir de laquelle les lignes sont comparées une à une
+CHECKSUM_FANOUT = 16
+CHECKSUM_LEAF_SIZE = 1000
+# Nombre de clés différentes affichées par genre et par table dans la console
+CONSOLE_KEYS_LIMIT = 20
+# Nombre de clés différentes gardées dans les résultats, par genre et par table
+STORED_KEYS_LIMIT = 1000
+# Nombre de lignes différentes écrites par table dans les rapports HTML et CSV (0 = sans limite)
+REPORT_ROWS_LIMIT = 1000
+
+def row_hash(*values):
+    """Empreinte 32 bits d'une ligne, sommée par SQLite pour chaque fenêtre de clés."""
+    digest = hashlib.blake2b(repr(values).encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "big")
+
+class FingerprintCache:
+    """
+    Empreintes des tables d'une base, gardées dans un fichier SQLite à côté d'elle.
+
+    Une empreinte est (hash du schéma, nombre de lignes, somme de contrôle).
+    Le cache n'est valable que pour l'état des fichiers qui l'ont produit : date de
+    modification et taille de la base et de son journal -wal, où une base en mode
+    WAL garde les écritures validées sans toucher au fichier principal.
+    PRAGMA data_version ne vaut que pour une même connexion et ne peut pas servir
+    d'une exécution à l'autre.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.path = f"{db_path}.fingerprints"
+
+    def stamp(self):
+        """État des fichiers de la base auxquels les empreintes correspondent"""
+        stamps = []
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            # un journal -wal vide (ouvert par un lecteur) ne contient aucune écriture
+            if os.path.exists(path) and (path == self.db_path or os.path.getsize(path) > 0):
+                stat = os.stat(path)
+                stamps.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+        return "/".join(stamps)
+
+    def load(self):
+        """Empreintes enregistrées {table: (hash du schéma, lignes, somme)}, vide si la base a changé"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            conn = sqlite3.connect(self.path)
+            try:
+                rows = conn.execute(
+                    "SELECT table_name, schema_hash, row_count, checksum FROM fingerprints WHERE stamp = ?",
+                    (self.stamp(),)
+                ).fetchall()
+            finally:
+                conn.close()
+            return {row[0]: tuple(row[1:]) for row in rows}
+        except sqlite3.Error:
+            return {}
+
+    def save(self, fingerprints):
+        """Remplace les empreintes enregistrées par celles de l'état actuel de la base"""
+        try:
+            conn = sqlite3.connect(self.path)
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS fingerprints (
+                        table_name TEXT PRIMARY KEY,
+                        schema_hash TEXT NOT NULL,
+                        row_count INTEGER NOT NULL,
+                        checksum INTEGER NOT NULL,
+                        stamp TEXT NOT NULL
+                    )
+                """)
+                conn.execute("DELETE FROM fingerprints")
+                stamp = self.stamp()
+                conn.executemany(
+                    "INSERT INTO fingerprints VALUES (?, ?, ?, ?, ?)",
+                    [(table, *fingerprint, stamp) for table, fingerprint in fingerprints.items()]
+                )
+            conn.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Impossible d'enregistrer les empreintes de {self.db_path}: {e}")
 
 class SQLiteComparator:
-    def __init__(self, db1_path, db2_path, output_format="console", output_file=None):
+    def __init__(self, db1_path, db2_path, output_format="console", output_file=None, jobs=1, use_cache=True,
+                 report_limit=REPORT_ROWS_LIMIT):
         """
         Initialise le comparateur de bases de données SQLite
         
@@ -18,11 +108,17 @@ class SQLiteComparator:
             db2_path: Chemin vers la deuxième base de données
             output_format: Format de sortie ("console", "html", "csv")
             output_file: Fichier de sortie pour HTML ou CSV
+            jobs: Nombre de processus comparant les tables en parallèle
+            use_cache: Réutiliser les empreintes des tables enregistrées à côté des bases
+            report_limit: Nombre de lignes différentes écrites par table dans les rapports (0 = sans limite)
         """
         self.db1_path = db1_path
         self.db2_path = db2_path
         self.output_format = output_format
         self.output_file = output_file
+        self.jobs = jobs
+        self.use_cache = use_cache
+        self.report_limit = report_limit
         self.results = {
             "tables_only_in_db1": [],
             "tables_only_in_db2": [],
@@ -59,30 +155,6 @@ class SQLiteComparator:
             indices.append((idx_name, columns, idx_info[2] == 1))  # (nom_index, colonnes, unique)
         return indices
 
-    def load_table_data(self, conn, table_name):
-        """Charge les données d'une table depuis la base de données"""
-        try:
-            # Déterminer la colonne de tri principale
-            cursor = conn.cursor()
-            cursor.execute(f"PRAGMA table_info({table_name})")
-            columns = cursor.fetchall()
-            
-            # Chercher une clé primaire
-            pk_columns = [col[1] for col in columns if col[5] > 0]  # col[5] > 0 signifie que c'est une partie de la clé primaire
-            
-            if pk_columns:
-                # Utiliser toutes les colonnes de la clé primaire pour le tri
-                order_by = f"ORDER BY {', '.join(pk_columns)}"
-            else:
-                # Si pas de clé primaire, utiliser la première colonne
-                order_by = f"ORDER BY {columns[0][1]}" if columns else ""
-            
-            df = pd.read_sql_query(f"SELECT * FROM {table_name} {order_by}", conn)
-            return df
-        except Exception as e:
-            print(f"Erreur lors du chargement des données de la table {table_name}: {e}")
-            return None
-
     def compare_table_structures(self, structure1, structure2):
         """Compare les structures de deux tables et retourne les différences"""
         differences = []
@@ -138,40 +210,278 @@ class SQLiteComparator:
         
         return differences
 
-    def compare_data(self, df1, df2):
-        """Compare les données de deux tables et retourne les différences"""
-        if df1 is None or df2 is None:
-            return "Impossible de comparer les données (erreur de chargement)"
+    def _window_condition(self, pk_columns, lower, upper, alias=None):
+        """Condition SQL et paramètres d'une fenêtre de clés [lower, upper) (None = non bornée)"""
+        prefix = f"{alias}." if alias else ""
+        key = f"({', '.join(prefix + col for col in pk_columns)})"
+        placeholders = f"({', '.join('?' for _ in pk_columns)})"
+        conditions = []
+        params = []
+        if lower is not None:
+            conditions.append(f"{key} >= {placeholders}")
+            params.extend(lower)
+        if upper is not None:
+            conditions.append(f"{key} < {placeholders}")
+            params.extend(upper)
+        return " AND ".join(conditions) or "1", params
+
+    def _window_checksum(self, conn, table, columns, pk_columns, lower, upper):
+        """Nombre de lignes et somme des empreintes d'une fenêtre, calculés par SQLite"""
+        where, params = self._window_condition(pk_columns, lower, upper)
+        query = f"SELECT count(*), coalesce(sum(row_hash({', '.join(columns)})), 0) FROM {table} WHERE {where}"
+        return conn.execute(query, params).fetchone()
+
+    def _window_boundaries(self, conn, table, pk_columns, lower, upper, step):
+        """Clés découpant une fenêtre en sous-fenêtres de `step` lignes (parcours trié de la clé primaire)"""
+        where, params = self._window_condition(pk_columns, lower, upper)
+        keys = ", ".join(pk_columns)
+        query = f"""
+        SELECT {keys} FROM (
+            SELECT {keys}, row_number() OVER (ORDER BY {keys}) AS rn FROM {table} WHERE {where}
+        ) WHERE rn % ? = 0
+        """
+        return [tuple(row) for row in conn.execute(query, params + [step]).fetchall()]
+
+    def _differing_windows(self, conn, table_name, columns, pk_columns, lower=None, upper=None):
+        """
+        Fenêtres de clés dont les sommes de contrôle diffèrent entre main et db2.
+
+        Une fenêtre différente est redécoupée (à la manière d'un arbre de Merkle)
+        jusqu'à CHECKSUM_LEAF_SIZE lignes ; seules les fenêtres finales sont rendues.
+        """
+        checksum1 = self._window_checksum(conn, f"main.{table_name}", columns, pk_columns, lower, upper)
+        checksum2 = self._window_checksum(conn, f"db2.{table_name}", columns, pk_columns, lower, upper)
+        if checksum1 == checksum2:
+            return
+
+        size = max(checksum1[0], checksum2[0])
+        if size <= CHECKSUM_LEAF_SIZE:
+            yield lower, upper
+            return
+
+        # Découper selon la base la plus remplie, les bornes valent pour les deux bases
+        schema = "main" if checksum1[0] >= checksum2[0] else "db2"
+        step = max(CHECKSUM_LEAF_SIZE, -(-size // CHECKSUM_FANOUT))
+        boundaries = self._window_boundaries(conn, f"{schema}.{table_name}", pk_columns, lower, upper, step)
+
+        for window_lower, window_upper in zip([lower] + boundaries, boundaries + [upper]):
+            yield from self._differing_windows(conn, table_name, columns, pk_columns, window_lower, window_upper)
+
+    def iter_data_differences(self, conn, table_name, columns, pk_columns, windows=None, with_rows=False):
+        """
+        Calcule dans SQLite les lignes ajoutées, supprimées ou modifiées d'une table.
+
+        La connexion doit avoir la deuxième base attachée sous le nom `db2`.
+        Avec une clé primaire, les différences sont trouvées par LEFT JOIN /
+        JOIN sur la clé, fenêtre par fenêtre ; sans clé primaire, par EXCEPT
+        sur les lignes entières. Seules les différences remontent en Python,
+        au fil du curseur.
+
+        Args:
+            conn: Connexion à la première base (main), db2 attachée
+            table_name: Nom de la table
+            columns: Colonnes de la table
+            pk_columns: Colonnes de la clé primaire (vide si aucune)
+            windows: Fenêtres de clés [lower, upper) à examiner (toute la table par défaut)
+            with_rows: Rendre aussi les lignes complètes de chaque base
+
+        Yields:
+            (genre, clé) avec genre dans "only_in_db1", "only_in_db2", "changed" ;
+            la clé est le tuple des colonnes de la clé primaire (ou la ligne entière sans clé).
+            Avec with_rows : (genre, clé, ligne DB1, ligne DB2), None pour la base sans la ligne.
+        """
+        if not pk_columns:
+            select = f"SELECT {', '.join(columns)} FROM"
+            for kind, first, second in (("only_in_db1", "main", "db2"), ("only_in_db2", "db2", "main")):
+                query = f"{select} {first}.{table_name} EXCEPT {select} {second}.{table_name}"
+                for row in conn.execute(query):
+                    row = tuple(row)
+                    if not with_rows:
+                        yield kind, row
+                    elif kind == "only_in_db1":
+                        yield kind, row, row, None
+                    else:
+                        yield kind, row, None, row
+            return
+
+        join = " AND ".join(f"a.{col} = b.{col}" for col in pk_columns)
+        keys = ", ".join(f"a.{col}" for col in pk_columns)
+        values = [col for col in columns if col not in pk_columns]
+        changed = " OR ".join(f"a.{col} IS NOT b.{col}" for col in values)
+        size = len(pk_columns)
+        width = len(columns)
+
+        # Avec with_rows, les lignes complètes suivent la clé dans le même curseur
+        row_a = ", " + ", ".join(f"a.{col}" for col in columns) if with_rows else ""
+        row_b = ", " + ", ".join(f"b.{col}" for col in columns) if with_rows else ""
+
+        for lower, upper in (windows if windows is not None else [(None, None)]):
+            where, params = self._window_condition(pk_columns, lower, upper, alias="a")
+
+            for kind, first, second in (("only_in_db1", "main", "db2"), ("only_in_db2", "db2", "main")):
+                query = f"""
+                SELECT {keys}{row_a} FROM {first}.{table_name} AS a
+                LEFT JOIN {second}.{table_name} AS b ON {join}
+                WHERE b.{pk_columns[0]} IS NULL AND {where}
+                """
+                for row in conn.execute(query, params):
+                    if not with_rows:
+                        yield kind, tuple(row)
+                    elif kind == "only_in_db1":
+                        yield kind, tuple(row[:size]), tuple(row[size:]), None
+                    else:
+                        yield kind, tuple(row[:size]), None, tuple(row[size:])
+
+            if changed:
+                query = f"""
+                SELECT {keys}{row_a}{row_b} FROM main.{table_name} AS a
+                JOIN db2.{table_name} AS b ON {join}
+                WHERE ({changed}) AND {where}
+                """
+                for row in conn.execute(query, params):
+                    if not with_rows:
+                        yield "changed", tuple(row)
+                    else:
+                        yield "changed", tuple(row[:size]), tuple(row[size:size + width]), tuple(row[size + width:])
+
+    def comparable_key(self, conn, table_name, structure):
+        """
+        Colonnes de la clé primaire utilisables pour comparer une table.
+
+        SQLite accepte NULL dans une clé primaire (hors INTEGER PRIMARY KEY) ;
+        les bornes de fenêtres et les jointures sur la clé ignoreraient ces
+        lignes. Dans ce cas, la table est comparée sans clé (EXCEPT).
+        """
+        pk_columns = [col[0] for col in sorted(structure, key=lambda col: col[3]) if col[3] > 0]
+        if not pk_columns:
+            return []
+        has_null = " OR ".join(f"{col} IS NULL" for col in pk_columns)
+        for schema in ("main", "db2"):
+            if conn.execute(f"SELECT 1 FROM {schema}.{table_name} WHERE {has_null} LIMIT 1").fetchone():
+                return []
+        return pk_columns
+
+    def compare_table_data(self, conn, table_name, structure):
+        """
+        Compare les données d'une table entre main et la base attachée db2.
+
+        Des sommes de contrôle sur des fenêtres de clé primaire isolent les
+        plages différentes (une table identique ne coûte qu'un parcours de chaque
+        base), puis iter_data_differences y calcule les clés exactes.
+
+        Returns:
+            (message, clés) : message None et clés None si les données sont identiques ;
+            sinon clés = {"key_columns": [...], "only_in_db1": [...], "only_in_db2": [...], "changed": [...],
+            "counts": {...}} ; au plus STORED_KEYS_LIMIT clés sont gardées par genre, les compteurs sont exacts.
+        """
+        try:
+            columns = [col[0] for col in structure]
+            pk_columns = self.comparable_key(conn, table_name, structure)
+
+            if pk_columns:
+                windows = list(self._differing_windows(conn, table_name, columns, pk_columns))
+            else:
+                # sans clé primaire : somme de contrôle de toute la table
+                windows = [(None, None)]
+                checksum1 = self._window_checksum(conn, f"main.{table_name}", columns, [], None, None)
+                checksum2 = self._window_checksum(conn, f"db2.{table_name}", columns, [], None, None)
+                if checksum1 == checksum2:
+                    windows = []
+            if not windows:
+                return None, None  # Pas de différences
+
+            # Les clés gardées sont limitées, les compteurs restent exacts
+            differences = {"key_columns": pk_columns or columns, "only_in_db1": [], "only_in_db2": [], "changed": [],
+                           "counts": {"only_in_db1": 0, "only_in_db2": 0, "changed": 0}}
+            for kind, key in self.iter_data_differences(conn, table_name, columns, pk_columns, windows):
+                differences["counts"][kind] += 1
+                if len(differences[kind]) < STORED_KEYS_LIMIT:
+                    differences[kind].append(key)
+
+            count1 = conn.execute(f"SELECT count(*) FROM main.{table_name}").fetchone()[0]
+            count2 = conn.execute(f"SELECT count(*) FROM db2.{table_name}").fetchone()[0]
+            counts = differences["counts"]
+            total = sum(counts.values())
+            message = (
+                f"{total} enregistrements différents (DB1={count1}, DB2={count2}) : "
+                f"{counts['only_in_db1']} uniquement dans DB1, "
+                f"{counts['only_in_db2']} uniquement dans DB2, "
+                f"{counts['changed']} modifiés"
+            )
+            if total == 0:
+                # sommes différentes mais aucune ligne isolée (lignes en double sans clé primaire) : les données diffèrent quand même
+                message = f"Sommes de contrôle différentes sans ligne différente isolée (lignes en double ?) : DB1={count1}, DB2={count2}"
+            return message, (differences if total else None)
+        except Exception as e:
+            print(f"Erreur lors de la comparaison des données de la table {table_name}: {e}")
+            return "Impossible de comparer les données (erreur de chargement)", None
+
+    def open_connections(self):
+        """
+        Ouvre les deux bases en lecture seule.
+
+        La deuxième base est aussi attachée à la première (sous le nom db2)
+        pour comparer les données dans SQLite.
+        """
+        def read_only(path):
+            return f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+
+        conn1 = sqlite3.connect(read_only(self.db1_path), uri=True)
+        conn2 = sqlite3.connect(read_only(self.db2_path), uri=True)
+        conn1.execute("ATTACH DATABASE ? AS db2", (read_only(self.db2_path),))
+        for conn in (conn1, conn2):
+            conn.create_function("row_hash", -1, row_hash, deterministic=True)
+        return conn1, conn2
+
+    def fingerprint_table(self, conn, table, structure, indices):
+        """Empreinte d'une table : (hash du schéma, nombre de lignes, somme de contrôle des lignes)"""
+        schema = json.dumps([sorted(structure), sorted((idx[0], idx[1], idx[2]) for idx in indices)], default=str)
+        schema_hash = hashlib.blake2b(schema.encode("utf-8"), digest_size=16).hexdigest()
+        columns = ", ".join(col[0] for col in structure)
+        row_count, checksum = conn.execute(
+            f"SELECT count(*), coalesce(sum(row_hash({columns})), 0) FROM {table}"
+        ).fetchone()
+        return schema_hash, row_count, checksum
+
+    def compare_table(self, conn1, conn2, table, cached1=None, cached2=None):
+        """
+        Compare une table commune.
+
+        Returns:
+            (différences, empreinte DB1, empreinte DB2) ; différences vaut None si la table est identique.
+        """
+        # Comparer la structure
+        structure1 = self.get_table_structure(conn1, table)
+        structure2 = self.get_table_structure(conn2, table)
         
-        if len(df1) != len(df2):
-            return f"Nombre d'enregistrements différent: DB1={len(df1)}, DB2={len(df2)}"
+        # Comparer les indices
+        indices1 = self.get_indices(conn1, table)
+        indices2 = self.get_indices(conn2, table)
         
-        # S'assurer que les colonnes sont dans le même ordre
-        cols1 = set(df1.columns)
-        cols2 = set(df2.columns)
-        common_cols = list(cols1.intersection(cols2))
+        # Mêmes empreintes des deux côtés (enregistrées ou recalculées) : table identique
+        fingerprint1 = cached1 or self.fingerprint_table(conn1, table, structure1, indices1)
+        fingerprint2 = cached2 or self.fingerprint_table(conn2, table, structure2, indices2)
+        if fingerprint1 == fingerprint2:
+            return None, fingerprint1, fingerprint2
         
-        # Comparer uniquement les colonnes communes
-        if common_cols:
-            df1_common = df1[common_cols].copy()
-            df2_common = df2[common_cols].copy()
-            
-            # Trier les DataFrames pour une comparaison cohérente
-            df1_common = df1_common.sort_values(by=common_cols).reset_index(drop=True)
-            df2_common = df2_common.sort_values(by=common_cols).reset_index(drop=True)
-            
-            if df1_common.equals(df2_common):
-                return None  # Pas de différences
-            else:
-                # Trouver les enregistrements différents
-                diff_indexes = []
-                for i in range(len(df1_common)):
-                    if i < len(df2_common) and not df1_common.iloc[i].equals(df2_common.iloc[i]):
-                        diff_indexes.append(i)
-                
-                return f"{len(diff_indexes)} enregistrements différents sur {len(df1_common)}"
-        else:
-            return "Aucune colonne commune pour comparer les données"
+        struct_diffs = self.compare_table_structures(structure1, structure2)
+        idx_diffs = self.compare_indices(indices1, indices2)
+        
+        # Comparer les données si les structures sont identiques
+        data_diff = None
+        data_keys = None
+        if not struct_diffs:
+            data_diff, data_keys = self.compare_table_data(conn1, table, structure1)
+        
+        # Déterminer si la table est identique ou différente
+        if not struct_diffs and not idx_diffs and not data_diff:
+            return None, fingerprint1, fingerprint2
+        return {
+            "structure_differences": struct_diffs,
+            "index_differences": idx_diffs,
+            "data_differences": data_diff,
+            "data_keys": data_keys
+        }, fingerprint1, fingerprint2
 
     def compare_tables(self):
         """Compare toutes les tables entre les deux bases de données"""
@@ -182,10 +492,6 @@ class SQLiteComparator:
             if not os.path.exists(self.db2_path):
                 raise FileNotFoundError(f"Base de données 2 introuvable: {self.db2_path}")
             
-            # Connexion aux bases de données
-            conn1 = sqlite3.connect(self.db1_path)
-            conn2 = sqlite3.connect(self.db2_path)
-            
             # Récupération des tables
             tables1 = self.get_tables(self.db1_path)
             tables2 = self.get_tables(self.db2_path)
@@ -199,64 +505,56 @@ class SQLiteComparator:
             # Tables communes à comparer
             common_tables = sorted(tables1.intersection(tables2))
             
-            # Compteurs pour la synthèse
-            total_tables = 0
-            identical_tables = 0
-            different_tables = 0
+            # Empreintes des exécutions précédentes, si les fichiers n'ont pas changé depuis
+            caches = (FingerprintCache(self.db1_path), FingerprintCache(self.db2_path))
+            cached1, cached2 = (cache.load() for cache in caches) if self.use_cache else ({}, {})
+            tasks = [(table, cached1.get(table), cached2.get(table)) for table in common_tables]
             
-            for table in common_tables:
-                total_tables += 1
-                
-                # Comparer la structure
-                structure1 = self.get_table_structure(conn1, table)
-                structure2 = self.get_table_structure(conn2, table)
-                struct_diffs = self.compare_table_structures(structure1, structure2)
-                
-                # Comparer les indices
-                indices1 = self.get_indices(conn1, table)
-                indices2 = self.get_indices(conn2, table)
-                idx_diffs = self.compare_indices(indices1, indices2)
-                
-                # Comparer les données si les structures sont identiques
-                data_diff = None
-                if not struct_diffs:
-                    df1 = self.load_table_data(conn1, table)
-                    df2 = self.load_table_data(conn2, table)
-                    data_diff = self.compare_data(df1, df2)
-                
-                # Déterminer si la table est identique ou différente
-                if not struct_diffs and not idx_diffs and not data_diff:
+            if self.jobs > 1 and len(common_tables) > 1:
+                # Une connexion en lecture seule par processus, ouverte à son démarrage
+                with ProcessPoolExecutor(
+                    max_workers=min(self.jobs, len(common_tables)),
+                    initializer=init_compare_worker,
+                    initargs=(self.db1_path, self.db2_path)
+                ) as pool:
+                    compared = list(pool.map(compare_table_in_worker, tasks))
+            else:
+                conn1, conn2 = self.open_connections()
+                try:
+                    compared = [(task[0], *self.compare_table(conn1, conn2, *task)) for task in tasks]
+                finally:
+                    # Fermeture des connexions
+                    conn1.close()
+                    conn2.close()
+            
+            # Regrouper les résultats dans l'ordre des tables
+            fingerprints1, fingerprints2 = {}, {}
+            for table, diffs, fingerprint1, fingerprint2 in compared:
+                fingerprints1[table] = fingerprint1
+                fingerprints2[table] = fingerprint2
+                if diffs is None:
                     self.results["identical_tables"].append(table)
-                    identical_tables += 1
                 else:
-                    self.results["different_tables"][table] = {
-                        "structure_differences": struct_diffs,
-                        "index_differences": idx_diffs,
-                        "data_differences": data_diff
-                    }
-                    different_tables += 1
+                    self.results["different_tables"][table] = diffs
+            
+            if self.use_cache:
+                for cache, cached, fingerprints in zip(caches, (cached1, cached2), (fingerprints1, fingerprints2)):
+                    if fingerprints != cached:
+                        cache.save(fingerprints)
             
             # Synthèse
             self.results["summary"] = {
-                "total_tables": total_tables,
-                "identical_tables": identical_tables,
-                "different_tables": different_tables,
+                "total_tables": len(common_tables),
+                "identical_tables": len(self.results["identical_tables"]),
+                "different_tables": len(self.results["different_tables"]),
                 "tables_only_in_db1": len(self.results["tables_only_in_db1"]),
                 "tables_only_in_db2": len(self.results["tables_only_in_db2"])
             }
             
-            # Fermeture des connexions
-            conn1.close()
-            conn2.close()
-            
             return self.results
             
         except Exception as e:
             print(f"Erreur lors de la comparaison des bases de données: {e}")
-            if 'conn1' in locals():
-                conn1.close()
-            if 'conn2' in locals():
-                conn2.close()
             raise
 
     def output_results(self):
@@ -323,6 +621,192 @@ class SQLiteComparator:
                 if diffs["data_differences"]:
                     print("    [Différences de données]")
                     print(f"      - {diffs['data_differences']}")
+                
+                if diffs.get("data_keys"):
+                    keys = diffs["data_keys"]
+                    print(f"    [Clés différentes ({', '.join(keys['key_columns'])})]")
+                    for kind, label in (("only_in_db1", "uniquement dans DB1"), ("only_in_db2", "uniquement dans DB2"), ("changed", "modifiée")):
+                        for key in keys[kind][:CONSOLE_KEYS_LIMIT]:
+                            print(f"      - {key} : {label}")
+                        if keys["counts"][kind] > CONSOLE_KEYS_LIMIT:
+                            print(f"      ... {keys['counts'][kind] - CONSOLE_KEYS_LIMIT} autre(s) clé(s) {label}")
+
+    def iter_report_rows(self, conn, table_name):
+        """
+        Relit les lignes différentes d'une table pour un rapport, sans les garder en mémoire.
+
+        Les sommes de contrôle isolent de nouveau les fenêtres différentes et
+        les lignes sont lues directement depuis le curseur de comparaison,
+        dans la limite de report_limit.
+
+        Returns:
+            (colonnes, itérateur de (genre, clé, ligne DB1, ligne DB2))
+        """
+        structure = self.get_table_structure(conn, table_name)
+        columns = [col[0] for col in structure]
+        pk_columns = self.comparable_key(conn, table_name, structure)
+        windows = self._differing_windows(conn, table_name, columns, pk_columns) if pk_columns else None
+        rows = self.iter_data_differences(conn, table_name, columns, pk_columns, windows, with_rows=True)
+        if self.report_limit:
+            rows = islice(rows, self.report_limit)
+        return columns, rows
+
+    def iter_report_cells(self, columns, kind, row1, row2):
+        """Détail d'une ligne différente : (colonne, valeur DB1, valeur DB2), une entrée par colonne modifiée"""
+        if kind == "only_in_db1":
+            yield "", json.dumps(dict(zip(columns, row1)), default=str), ""
+        elif kind == "only_in_db2":
+            yield "", "", json.dumps(dict(zip(columns, row2)), default=str)
+        else:
+            for column, value1, value2 in zip(columns, row1, row2):
+                if value1 != value2:
+                    yield column, value1, value2
+
+    def _output_csv(self):
+        """
+        Écrit les résultats dans un fichier CSV, ligne par ligne.
+
+        Colonnes : section, table, genre, cle, colonne, valeur_db1, valeur_db2, detail.
+        Les lignes différentes de chaque table sont écrites au fil de la
+        comparaison, suivies d'une ligne "tronque" si la limite est atteinte.
+        """
+        conn1, conn2 = self.open_connections()
+        try:
+            with open(self.output_file, "w", encoding="utf-8", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(["section", "table", "genre", "cle", "colonne", "valeur_db1", "valeur_db2", "detail"])
+
+                # Synthèse
+                for name, value in self.results["summary"].items():
+                    writer.writerow(["synthese", "", name, "", "", "", "", value])
+
+                for table in self.results["tables_only_in_db1"]:
+                    writer.writerow(["tables", table, "uniquement_db1", "", "", "", "", ""])
+                for table in self.results["tables_only_in_db2"]:
+                    writer.writerow(["tables", table, "uniquement_db2", "", "", "", "", ""])
+                for table in self.results["identical_tables"]:
+                    writer.writerow(["tables", table, "identique", "", "", "", "", ""])
+
+                # Tables différentes
+                for table, diffs in self.results["different_tables"].items():
+                    for diff in diffs["structure_differences"]:
+                        writer.writerow(["structure", table, "", "", "", "", "", diff])
+                    for diff in diffs["index_differences"]:
+                        writer.writerow(["indices", table, "", "", "", "", "", diff])
+                    if diffs["data_differences"]:
+                        writer.writerow(["donnees", table, "synthese", "", "", "", "", diffs["data_differences"]])
+
+                    keys = diffs.get("data_keys")
+                    if not keys:
+                        continue
+                    columns, rows = self.iter_report_rows(conn1, table)
+                    written = 0
+                    for kind, key, row1, row2 in rows:
+                        key = json.dumps(list(key), default=str)
+                        for column, value1, value2 in self.iter_report_cells(columns, kind, row1, row2):
+                            writer.writerow(["donnees", table, kind, key, column, value1, value2, ""])
+                        written += 1
+
+                    remaining = sum(keys["counts"].values()) - written
+                    if remaining > 0:
+                        writer.writerow(["donnees", table, "tronque", "", "", "", "", f"{remaining} ligne(s) différente(s) non écrite(s)"])
+        finally:
+            conn1.close()
+            conn2.close()
+        print(f"Rapport CSV écrit: {self.output_file}")
+
+    def _output_html(self):
+        """
+        Écrit les résultats dans un fichier HTML, section par section.
+
+        Le document est écrit au fil de l'eau : chaque ligne différente est
+        ajoutée au fichier dès sa lecture, dans la limite de report_limit par table.
+        """
+        conn1, conn2 = self.open_connections()
+        try:
+            with open(self.output_file, "w", encoding="utf-8") as file:
+                def write(text):
+                    file.write(text + "\n")
+
+                def write_list(title, items):
+                    if not items:
+                        return
+                    write(f"<h2>{html.escape(title)}</h2>\n<ul>")
+                    for item in items:
+                        write(f"  <li>{html.escape(str(item))}</li>")
+                    write("</ul>")
+
+                write("<!DOCTYPE html>\n<html lang=\"fr\">\n<head>\n<meta charset=\"utf-8\">")
+                write("<title>Comparaison des bases de données SQLite</title>")
+                write("<style>body{font-family:sans-serif} table{border-collapse:collapse} "
+                      "td,th{border:1px solid #ccc;padding:2px 6px} .only_in_db1{background:#fdd} "
+                      ".only_in_db2{background:#dfd} .changed{background:#ffd}</style>")
+                write("</head>\n<body>")
+                write("<h1>Comparaison des bases de données SQLite</h1>")
+                write(f"<p>DB1: {html.escape(self.db1_path)}<br>DB2: {html.escape(self.db2_path)}<br>"
+                      f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>")
+
+                # Synthèse
+                summary = self.results["summary"]
+                write("<h2>Synthèse</h2>\n<table>")
+                for label, name in (("Total des tables communes", "total_tables"), ("Tables identiques", "identical_tables"),
+                                    ("Tables différentes", "different_tables"), ("Tables uniquement dans DB1", "tables_only_in_db1"),
+                                    ("Tables uniquement dans DB2", "tables_only_in_db2")):
+                    write(f"  <tr><th>{label}</th><td>{summary.get(name, 0)}</td></tr>")
+                write("</table>")
+
+                write_list("Tables uniquement dans DB1", self.results["tables_only_in_db1"])
+                write_list("Tables uniquement dans DB2", self.results["tables_only_in_db2"])
+                write_list("Tables identiques", self.results["identical_tables"])
+
+                # Tables différentes
+                if self.results["different_tables"]:
+                    write("<h2>Tables différentes</h2>")
+                for table, diffs in self.results["different_tables"].items():
+                    write(f"<section>\n<h3>{html.escape(table)}</h3>")
+                    write_list("Différences de structure", diffs["structure_differences"])
+                    write_list("Différences d'indices", diffs["index_differences"])
+                    if diffs["data_differences"]:
+                        write(f"<p>{html.escape(diffs['data_differences'])}</p>")
+
+                    keys = diffs.get("data_keys")
+                    if keys:
+                        columns, rows = self.iter_report_rows(conn1, table)
+                        write(f"<table>\n  <tr><th>Genre</th><th>Clé ({html.escape(', '.join(keys['key_columns']))})</th>"
+                              "<th>Colonne</th><th>DB1</th><th>DB2</th></tr>")
+                        written = 0
+                        for kind, key, row1, row2 in rows:
+                            key = html.escape(", ".join(str(value) for value in key))
+                            for column, value1, value2 in self.iter_report_cells(columns, kind, row1, row2):
+                                write(f"  <tr class=\"{kind}\"><td>{kind}</td><td>{key}</td><td>{html.escape(column)}</td>"
+                                      f"<td>{html.escape(str(value1))}</td><td>{html.escape(str(value2))}</td></tr>")
+                            written += 1
+                        write("</table>")
+
+                        remaining = sum(keys["counts"].values()) - written
+                        if remaining > 0:
+                            write(f"<p>... {remaining} ligne(s) différente(s) non écrite(s)</p>")
+                    write("</section>")
+
+                write("</body>\n</html>")
+        finally:
+            conn1.close()
+            conn2.close()
+        print(f"Rapport HTML écrit: {self.output_file}")
+
+# Comparateur et connexions propres à chaque processus du mode --jobs
+worker_state = {}
+
+def init_compare_worker(db1_path, db2_path):
+    """Ouvre les connexions en lecture seule d'un processus de comparaison"""
+    comparator = SQLiteComparator(db1_path, db2_path)
+    worker_state["comparator"] = comparator
+    worker_state["connections"] = comparator.open_connections()
+
+def compare_table_in_worker(task):
+    """Compare une table dans un processus de comparaison ; task = (table, empreinte DB1, empreinte DB2)"""
+    conn1, conn2 = worker_state["connections"]
+    return (task[0], *worker_state["comparator"].compare_table(conn1, conn2, *task))
 
 def main():
     """Fonction principale pour l'exécution en ligne de commande"""
@@ -332,6 +816,12 @@ def main():
     parser.add_argument("-f", "--format", choices=["console", "html", "csv"], default="console",
                         help="Format de sortie (défaut: console)")
     parser.add_argument("-o", "--output", help="Fichier de sortie pour les formats HTML et CSV")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Nombre de processus comparant les tables en parallèle (défaut: 1)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ne pas réutiliser ni enregistrer les empreintes des tables")
+    parser.add_argument("--limit", type=int, default=REPORT_ROWS_LIMIT,
+                        help=f"Lignes différentes écrites par table dans les rapports HTML et CSV, 0 = sans limite (défaut: {REPORT_ROWS_LIMIT})")
     
     args = parser.parse_args()
     
@@ -339,7 +829,7 @@ def main():
         parser.error("Un fichier de sortie est requis pour les formats HTML et CSV")
     
     try:
-        comparator = SQLiteComparator(args.db1, args.db2, args.format, args.output)
+        comparator = SQLiteComparator(args.db1, args.db2, args.format, args.output, args.jobs, not args.no_cache, args.limit)
         comparator.compare_tables()
         comparator.output_results()
     except Exception as e:
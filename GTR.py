@@ -6,6 +6,9 @@ from neo4j import GraphDatabase
 import pandas as pd
 import os
 from sqlalchemy import Date  # Import du type Date
+from sqlalchemy.engine import make_url
+from helper.sqlite_db import sqlite_bulk_load
+from helper.neo4j_db import get_all_etiquette, SCHEMA_LABEL
 
 def configurer_sqlalchemy(uri_base_donnees):
     moteur = create_engine(uri_base_donnees)
@@ -18,40 +21,27 @@ def configurer_neo4j(uri_neo4j, utilisateur_neo4j, mot_de_passe_neo4j):
 
 def recuperer_noeuds(driver):
     with driver.session() as session:
-        requete = """
+        # Types des colonnes de chaque étiquette, découverts en une seule requête
+        types_colonnes = dict(get_all_etiquette(session) or {})
+
+        # Les nœuds sont lus au fil de l'eau (pas de collect() géant côté serveur)
+        requete = f"""
         MATCH (n)
-        UNWIND labels(n) AS etiquette
-        RETURN etiquette AS table, 
-               collect({nodeId: id(n), properties: properties(n)}) AS donnees
+        WHERE NOT n:{SCHEMA_LABEL}
+        RETURN labels(n) AS etiquettes, id(n) AS nodeId, properties(n) AS properties
         """
         result = session.run(requete)
 
         donnees = {}
-        types_colonnes = {}
 
         for record in result:
-            table = record["table"]
-            nodes_data = record["donnees"]
-            
-            # Transformer les données pour cette étiquette
-            processed_data = []
-            for node in nodes_data:
-                # Fusionner nodeId et propriétés
-                node_props = node["properties"].copy()
-                node_props["neo4j_id"] = node["nodeId"]  # Conserver l'ID Neo4j pour les références
-                
-                # Gérer les types
-                if "_types" in node_props:
-                    if table not in types_colonnes:
-                        types_colonnes[table] = {
-                            entry.split(":")[0]: entry.split(":")[1] 
-                            for entry in node_props["_types"]
-                        }
-                    node_props.pop("_types", None)
-                
-                processed_data.append(node_props)
-            
-            donnees[table] = processed_data
+            # Fusionner nodeId et propriétés
+            node_props = dict(record["properties"])
+            node_props["neo4j_id"] = record["nodeId"]  # Conserver l'ID Neo4j pour les références
+            node_props.pop("_types", None)
+
+            for table in record["etiquettes"]:
+                donnees.setdefault(table, []).append(dict(node_props))
 
         return donnees, types_colonnes
 
@@ -192,26 +182,32 @@ def inserer_donnees(moteur, tables, donnees):
 
 
 
-def transformer_graphe_en_relationnel(uri_base_donnees, uri_neo4j, utilisateur_neo4j, mot_de_passe_neo4j):
-
-    # Supprimer la base de données SQLite si elle existe
-    db_path = "Sortie.db"
-    if os.path.exists(db_path):
-        os.remove(db_path)
-        print(f"{db_path} supprimé.")
+def transformer_graphe_en_relationnel(uri_base_donnees, uri_neo4j, utilisateur_neo4j, mot_de_passe_neo4j,
+                                      chargement_rapide=True, en_memoire=False):
 
-    moteur, metadonnees = configurer_sqlalchemy(uri_base_donnees)
-
-
-    
+    db_path = make_url(uri_base_donnees).database
 
     driver = configurer_neo4j(uri_neo4j, utilisateur_neo4j, mot_de_passe_neo4j)
     
     donnees, types_colonnes = recuperer_noeuds(driver)
     relations = recuperer_relations(driver)
-    
-    tables = creer_tables(moteur, metadonnees, donnees, relations, types_colonnes)
-    inserer_donnees(moteur, tables, donnees)
+
+    if chargement_rapide:
+        # Nouvelle base construite à part (réglages de chargement rapide),
+        # puis mise à la place de l'ancienne d'un seul coup
+        with sqlite_bulk_load(db_path, en_memoire) as moteur:
+            metadonnees = MetaData()
+            tables = creer_tables(moteur, metadonnees, donnees, relations, types_colonnes)
+            inserer_donnees(moteur, tables, donnees)
+    else:
+        # Supprimer la base de données SQLite si elle existe
+        if os.path.exists(db_path):
+            os.remove(db_path)
+            print(f"{db_path} supprimé.")
+
+        moteur, metadonnees = configurer_sqlalchemy(uri_base_donnees)
+        tables = creer_tables(moteur, metadonnees, donnees, relations, types_colonnes)
+        inserer_donnees(moteur, tables, donnees)
     
     driver.close()
     print("Transformation terminée !")
@@ -2,6 +2,9 @@ from sqlalchemy import create_engine, MetaData
 from sqlalchemy.exc import SQLAlchemyError
 from neo4j import GraphDatabase, exceptions as neo4j_exceptions
 import pandas as pd
+from helper.utils import dataframe_to_records
+from helper.neo4j_db import SCHEMA_LABEL
+from enviroment import NEO4J_INDEX_TIMEOUT
 
 # Configuration des bases de données
 def configurer_sqlalchemy(uri_base_donnees):
@@ -41,6 +44,15 @@ def recuperer_donnees_table(moteur, nom_table):
         print(f"Erreur lors de la récupération des données de {nom_table} : {e}")
         return pd.DataFrame()
 
+def recuperer_lots_table(moteur, nom_table, taille_lot=10000):
+    """Parcourt une table par lots de `taille_lot` lignes au lieu de la charger entièrement."""
+    try:
+        yield from pd.read_sql_query(f"SELECT * FROM {nom_table}", moteur, chunksize=taille_lot)
+    except SQLAlchemyError as e:
+        print(f"Erreur lors de la récupération des données de {nom_table} : {e}")
+        # un lot manquant ne doit pas passer pour la fin de la table
+        raise
+
 def creer_noeud(tx, etiquette, proprietes):
     try:
         requete = f"CREATE (n:{etiquette} $props)"
@@ -49,18 +61,57 @@ def creer_noeud(tx, etiquette, proprietes):
         print(f"Erreur lors de la création d'un nœud {etiquette} : {e}")
 
 
+def enregistrer_types(tx, etiquette, types):
+    """Enregistre les types des colonnes une seule fois par étiquette, dans un nœud de métadonnées."""
+    try:
+        requete = f"MERGE (m:{SCHEMA_LABEL} {{label: $etiquette}}) SET m._types = $types"
+        tx.run(requete, etiquette=etiquette, types=types)
+    except neo4j_exceptions.Neo4jError as e:
+        print(f"Erreur lors de l'enregistrement des types de {etiquette} : {e}")
+
+
 def inserer_noeuds(driver, metadonnees, moteur):
     with driver.session() as session:
         for nom_table, table in metadonnees.tables.items():
-            df = recuperer_donnees_table(moteur, nom_table)
-            
             # Récupérer les types des colonnes
             types_colonnes = {col.name: str(col.type) for col in table.columns}
+            session.write_transaction(enregistrer_types, nom_table, [f"{k}:{v}" for k, v in types_colonnes.items()])
             
-            for _, ligne in df.iterrows():
-                proprietes = ligne.to_dict()
-                proprietes["_types"] = [f"{k}:{v}" for k, v in types_colonnes.items()]
-                session.write_transaction(creer_noeud, nom_table, proprietes)
+            for df in recuperer_lots_table(moteur, nom_table):
+                for proprietes in dataframe_to_records(df):
+                    session.write_transaction(creer_noeud, nom_table, proprietes)
+
+
+def creer_index(driver, metadonnees):
+    """Crée les contraintes et index sur les clés primaires et étrangères avant la création des relations."""
+    cles = set()
+    for table in metadonnees.tables.values():
+        pk = [col.name for col in table.primary_key.columns]
+        if len(pk) == 1:
+            cles.add((table.name, pk[0], True))
+        for fk in table.foreign_keys:
+            cles.add((table.name, fk.parent.name, False))
+            cles.add((fk.column.table.name, fk.column.name, False))
+
+    with driver.session() as session:
+        for etiquette, propriete, unique in sorted(cles):
+            if not unique and (etiquette, propriete, True) in cles:
+                continue
+            try:
+                if unique:
+                    session.run(
+                        f"CREATE CONSTRAINT uniq_{etiquette}_{propriete} IF NOT EXISTS "
+                        f"FOR (n:{etiquette}) REQUIRE n.{propriete} IS UNIQUE"
+                    ).consume()
+                else:
+                    session.run(
+                        f"CREATE INDEX idx_{etiquette}_{propriete} IF NOT EXISTS "
+                        f"FOR (n:{etiquette}) ON (n.{propriete})"
+                    ).consume()
+            except neo4j_exceptions.Neo4jError as e:
+                print(f"Erreur lors de la création de l'index {etiquette}.{propriete} : {e}")
+        session.run("CALL db.awaitIndexes($timeout)", timeout=NEO4J_INDEX_TIMEOUT).consume()
+    print("Index créés !")
 
 
 def creer_relation(tx, etiquette1, prop1, etiquette2, prop2, type_relation):
@@ -95,16 +146,15 @@ def inserer_relations(driver, metadonnees, moteur):
                 FROM {table_enfant} c
                 JOIN {table_parent} p ON c.{child_column} = p.{parent_column}
                 """
-                df_rel = recuperer_donnees_table(moteur, table_enfant)
-                
                 # Création des relations dans Neo4j
-                for _, ligne in df_rel.iterrows():
-                    session.write_transaction(
-                        creer_relation,
-                        table_enfant, {child_column: ligne[child_column]},  # Colonne de la table enfant
-                        table_parent, {parent_column: ligne[parent_column]},  # Colonne de la table parent
-                        type_relation
-                    )
+                for df_rel in recuperer_lots_table(moteur, table_enfant):
+                    for ligne in dataframe_to_records(df_rel):
+                        session.write_transaction(
+                            creer_relation,
+                            table_enfant, {child_column: ligne[child_column]},  # Colonne de la table enfant
+                            table_parent, {parent_column: ligne[parent_column]},  # Colonne de la table parent
+                            type_relation
+                        )
 
 def transformer_relationnel_en_graphe(uri_base_donnees, uri_neo4j, utilisateur_neo4j, mot_de_passe_neo4j):
     moteur, metadonnees = configurer_sqlalchemy(uri_base_donnees)
@@ -112,6 +162,7 @@ def transformer_relationnel_en_graphe(uri_base_donnees, uri_neo4j, utilisateur_n
     
     nettoyer_base_neo4j(driver)
     inserer_noeuds(driver, metadonnees, moteur)
+    creer_index(driver, metadonnees)
     inserer_relations(driver, metadonnees, moteur)
     
     driver.close()
@@ -5,4 +5,17 @@ USERNAME_NEO4J = "neo4j"
 PASSWORD_NEO4J = "password"
 DATABASE_URI_TEST = 'data/example.db'
 DATABASE_URI_OUPUT_TEST = 'data/output.db'
-DATABASE_TYPE = 'sqlite'
\ No newline at end of file
+DATABASE_TYPE = 'sqlite'
+NEO4J_BATCH_SIZE = 5000
+NEO4J_INDEX_TIMEOUT = 300
+SQL_BATCH_SIZE = 10000
+NEO4J_WORKERS = 1
+SYNC_STATE_PATH = 'data/.neo_sync_state.db'
+JOURNAL_PATH = 'data/.migration_journal.db'
+NEO4J_FETCH_SIZE = 1000
+CONSTRAINT_SCAN_LIMIT = None
+SQLITE_BULK_LOAD = False
+SQLITE_BULK_CACHE_SIZE = 262144
+PIPELINE_QUEUE_SIZE = 8
+PIPELINE_READERS = 1
+PIPELINE_COMMIT_BATCHES = 20
\ No newline at end of file
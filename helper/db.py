@@ -1,9 +1,10 @@
-from sqlalchemy import MetaData, create_engine, Engine
-from enviroment import DATABASE_TYPE
+from sqlalchemy import MetaData, create_engine, Connection, Engine
+from enviroment import DATABASE_TYPE, SQL_BATCH_SIZE
 from .postgrey_db import postgreSchema
 from .sqlite_db import (sqliteIsJoinTable, sqliteSchema, sqlite_connector, 
-                        sqliteGetRelationsMatrice, sqlite_get_all,sqlite_get_all_relations,
-                        sqlite_single_table_relations, create_sqlite_table, sqlite_bulk_insert_data)
+                        sqliteGetRelationsMatrice, sqlite_get_all,sqlite_get_all_relations, sqlite_get_batches, sqlite_primary_key,
+                        sqlite_single_table_relations, create_sqlite_table, sqlite_bulk_insert_data, sqlite_insert_rows,
+                        invalidate_sqlite_metadata)
 
 
 # core
@@ -80,6 +81,22 @@ def get_all(db_engine: Engine, table: str):
             # Gestion d'une erreur si le moteur de base de données n'est pas reconnu
             raise ValueError(f"engineMotor {DATABASE_TYPE} does not exist !")
         
+def get_batches(db_engine: Engine, table: str, batch_size: int = SQL_BATCH_SIZE, after: tuple = None):
+    match DATABASE_TYPE:
+        case 'sqlite':
+            return sqlite_get_batches(table, db_engine, batch_size, after)
+        case _:
+            # Gestion d'une erreur si le moteur de base de données n'est pas reconnu
+            raise ValueError(f"engineMotor {DATABASE_TYPE} does not exist !")
+        
+def get_primary_key(db_engine: Engine, table: str):
+    match DATABASE_TYPE:
+        case 'sqlite':
+            return sqlite_primary_key(table, db_engine)
+        case _:
+            # Gestion d'une erreur si le moteur de base de données n'est pas reconnu
+            raise ValueError(f"engineMotor {DATABASE_TYPE} does not exist !")
+        
 def get_all_relations(db_engine: Engine, table1: str, table2: str):
     match DATABASE_TYPE:
         case 'sqlite':
@@ -112,4 +129,22 @@ def bulk_insert_data(db_engine: Engine, table: str, datas: list, type_dict: dict
             return sqlite_bulk_insert_data(db_engine, table, datas, type_dict)
         case _:
             # Gestion d'une erreur si le moteur de base de données n'est pas reconnu
-            raise ValueError(f"engineMotor {DATABASE_TYPE} does not exist !")
\ No newline at end of file
+            raise ValueError(f"engineMotor {DATABASE_TYPE} does not exist !")
+        
+        
+def insert_rows(conn: Connection, table: str, datas: list, type_dict: dict):
+    match DATABASE_TYPE:
+        case 'sqlite':
+            return sqlite_insert_rows(conn, table, datas, type_dict)
+        case _:
+            # Gestion d'une erreur si le moteur de base de données n'est pas reconnu
+            raise ValueError(f"engineMotor {DATABASE_TYPE} does not exist !")
+        
+        
+def invalidate_metadata(db_engine: Engine, table: str = None):
+    match DATABASE_TYPE:
+        case 'sqlite':
+            return invalidate_sqlite_metadata(db_engine, table)
+        case _:
+            # Gestion d'une erreur si le moteur de base de données n'est pas reconnu
+            raise ValueError(f"engineMotor {DATABASE_TYPE} does not exist !")
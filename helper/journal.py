@@ -0,0 +1,102 @@
+import sqlite3
+import threading
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+# Types de clé sans équivalent JSON, enregistrés avec une étiquette {"t": type, "v": valeur}
+# pour être relus avec leur type : une date relue comme chaîne ne se compare plus à la clé
+KEY_TYPES = {
+    "datetime": (datetime, datetime.isoformat, datetime.fromisoformat),
+    "date": (date, date.isoformat, date.fromisoformat),
+    "time": (time, time.isoformat, time.fromisoformat),
+    "decimal": (Decimal, str, Decimal),
+    "bytes": (bytes, bytes.hex, bytes.fromhex),
+}
+
+def encode_key_value(value):
+    """Sérialise une valeur de clé non JSON avec son type (datetime avant date, qui en est la classe mère)."""
+    for name, (kind, encode, _) in KEY_TYPES.items():
+        if isinstance(value, kind):
+            return {"t": name, "v": encode(value)}
+    raise TypeError(f"Valeur de clé non enregistrable dans le journal : {value!r}")
+
+def decode_key_value(obj: dict):
+    """Relit une valeur enregistrée par encode_key_value."""
+    if obj.keys() == {"t", "v"} and obj["t"] in KEY_TYPES:
+        return KEY_TYPES[obj["t"]][2](obj["v"])
+    return obj
+
+class MigrationJournal:
+    """
+    Journal de progression d'une migration, stocké dans un petit fichier SQLite local.
+
+    Chaque migration (`run`, ex: "neo:data/example.db") est découpée en étapes
+    (`step`, ex: "nodes:employe"). Le journal retient les étapes terminées et,
+    pour une étape en cours, la clé du dernier lot validé. Il peut être partagé
+    entre plusieurs threads.
+    """
+
+    def __init__(self, path: str, run: str):
+        """
+        Args:
+            path: Chemin du fichier SQLite du journal.
+            run: Identifiant de la migration.
+        """
+        self.run = run
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS journal (
+                    run TEXT NOT NULL,
+                    step TEXT NOT NULL,
+                    done INTEGER NOT NULL DEFAULT 0,
+                    checkpoint TEXT,
+                    PRIMARY KEY (run, step)
+                )
+            """)
+
+    def reset(self):
+        """Oublie toute la progression de la migration (nouveau départ)."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM journal WHERE run = ?", (self.run,))
+
+    def is_done(self, step: str) -> bool:
+        """Indique si une étape est terminée."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT done FROM journal WHERE run = ? AND step = ?", (self.run, step)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def mark_done(self, step: str):
+        """Marque une étape comme terminée."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO journal (run, step, done) VALUES (?, ?, 1) "
+                "ON CONFLICT (run, step) DO UPDATE SET done = 1",
+                (self.run, step)
+            )
+
+    def get_checkpoint(self, step: str):
+        """Retourne la clé du dernier lot validé d'une étape, ou None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT checkpoint FROM journal WHERE run = ? AND step = ?", (self.run, step)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return tuple(json.loads(row[0], object_hook=decode_key_value))
+
+    def save_checkpoint(self, step: str, key):
+        """Enregistre la clé du dernier lot validé d'une étape."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO journal (run, step, checkpoint) VALUES (?, ?, ?) "
+                "ON CONFLICT (run, step) DO UPDATE SET checkpoint = excluded.checkpoint",
+                (self.run, step, json.dumps(list(key), default=encode_key_value))
+            )
+
+    def close(self):
+        self.conn.close()
@@ -1,11 +1,35 @@
 from typing import Any, Dict
+from sqlalchemy import MetaData
 from neo4j import Driver, GraphDatabase, ManagedTransaction,Session
 from neo4j.exceptions import Neo4jError
-from enviroment import URI_HOST_NEO4J,URI_PORT_NEO4J,USERNAME_NEO4J,PASSWORD_NEO4J,URI_AGENT_NEO4J
-from .db import get_all
+from enviroment import URI_HOST_NEO4J,URI_PORT_NEO4J,USERNAME_NEO4J,PASSWORD_NEO4J,URI_AGENT_NEO4J,NEO4J_BATCH_SIZE,NEO4J_INDEX_TIMEOUT
+from .db import get_batches
+from .utils import dataframe_to_records
 import pandas as pd
 import json
 import re
+import time
+from weakref import WeakKeyDictionary
+
+# Étiquette des nœuds de métadonnées : un nœud par étiquette porte les types de ses colonnes
+SCHEMA_LABEL = "_Schema"
+
+# Types SQL déduits des types de propriétés Neo4j, pour les étiquettes sans nœud de métadonnées
+NEO4J_PROPERTY_TYPES = {
+    "String": "VARCHAR",
+    "Long": "INTEGER",
+    "Integer": "INTEGER",
+    "Double": "FLOAT",
+    "Float": "FLOAT",
+    "Boolean": "BOOLEAN",
+    "Date": "DATE",
+    "LocalDateTime": "DATETIME",
+    "DateTime": "DATETIME",
+}
+
+# Schéma découvert (étiquettes et types) par session, gardé jusqu'à la prochaine modification du graphe :
+# une autre session (autre exécution, autre base) relit toujours le schéma
+schema_cache: "WeakKeyDictionary[Session, Dict[str, Dict[str, str]]]" = WeakKeyDictionary()
 
 
 def is_noeud_exist(transacManager: ManagedTransaction, etiquette1: str, prop1: dict) -> bool:
@@ -52,9 +76,43 @@ def create_noeud(transacManager: ManagedTransaction, etiquette: str, properties:
 
         query = f"CREATE (n:{etiquette} $props)"
         transacManager.run(query, props=properties)
+        invalidate_schema_cache()
 
     except Neo4jError as e:
         print(f"Erreur lors de la création d'un nœud {etiquette} : {e}")
+
+def create_noeuds(transacManager: ManagedTransaction, etiquette: str, rows: list[dict]) -> None:
+    """
+    Crée un lot de nœuds dans la base Neo4j en une seule requête UNWIND.
+
+    Args:
+        transacManager (ManagedTransaction): Transaction Neo4j active.
+        etiquette (str): L'étiquette des nœuds à créer (ex: "Person").
+        rows (list[dict]): Liste des propriétés de chaque nœud.
+    """
+    query = (
+        f"UNWIND $rows AS row "
+        f"CREATE (n:{etiquette}) "
+        f"SET n = row"
+    )
+    transacManager.run(query, rows=rows)
+    invalidate_schema_cache()
+
+def store_label_types(transacManager: ManagedTransaction, etiquette: str, types: list[str]) -> None:
+    """
+    Enregistre les types des colonnes d'une étiquette dans son nœud de métadonnées.
+
+    Args:
+        transacManager (ManagedTransaction): Transaction Neo4j active.
+        etiquette (str): L'étiquette décrite (ex: "Person").
+        types (list[str]): Types des colonnes au format "colonne:TYPE".
+    """
+    query = (
+        f"MERGE (m:{SCHEMA_LABEL} {{label: $label}}) "
+        f"SET m._types = $types"
+    )
+    transacManager.run(query, label=etiquette, types=types)
+    invalidate_schema_cache()
     
 def has_link(transacManager: ManagedTransaction, etiquette1: str, prop1: dict, etiquette2: str, prop2: dict, link: str):
     """
@@ -125,6 +183,261 @@ def add_link(transacManager: ManagedTransaction, etiquette1: str, prop1: dict, e
     except Neo4jError as e:
         print(f"Erreur lors de la création d'une relation {link} : {e}")
         
+def add_links(transacManager: ManagedTransaction, etiquette1: str, keys1: list[str], etiquette2: str, keys2: list[str], link: str, rows: list[dict], with_properties: bool = False) -> None:
+    """
+    Crée un lot de liens entre deux étiquettes en une seule requête UNWIND.
+
+    Args:
+        transacManager: Transaction Neo4j
+        etiquette1 (str): étiquette des nœuds sources (ex: 'Person')
+        keys1 (list[str]): propriétés identifiant le nœud source (ex: ['id'])
+        etiquette2 (str): étiquette des nœuds cibles (ex: 'Company')
+        keys2 (list[str]): propriétés identifiant le nœud cible (ex: ['id'])
+        link (str): nom de la relation (ex: 'WORKS_FOR')
+        rows (list[dict]): lignes de la forme {"source": {...}, "target": {...}, "props": {...}}
+        with_properties (bool): remplace les propriétés de la relation par `row.props`
+    """
+    source_match = " AND ".join(f"a.{k} = row.source.{k}" for k in keys1)
+    target_match = " AND ".join(f"b.{k} = row.target.{k}" for k in keys2)
+
+    query = (
+        f"UNWIND $rows AS row "
+        f"MATCH (a:{etiquette1}) WHERE {source_match} "
+        f"MATCH (b:{etiquette2}) WHERE {target_match} "
+        f"MERGE (a)-[r:{link}]->(b) "
+    )
+    if with_properties:
+        query += "SET r = row.props"
+
+    transacManager.run(query, rows=rows)
+
+def insert_links(neo_session: Session, etiquette1: str, etiquette2: str, link: str, rows: list[dict], batch_size: int = NEO4J_BATCH_SIZE) -> int:
+    """
+    Crée les liens entre deux étiquettes par lots, une transaction par lot.
+
+    Args:
+        neo_session (Session): Session active Neo4j.
+        etiquette1 (str): étiquette des nœuds sources.
+        etiquette2 (str): étiquette des nœuds cibles.
+        link (str): nom de la relation.
+        rows (list[dict]): lignes {"source": {...}, "target": {...}, "props": {...}} (voir `add_links`).
+        batch_size (int): nombre de liens envoyés par transaction.
+
+    Returns:
+        int: nombre de lignes envoyées à Neo4j.
+    """
+    if not rows:
+        return 0
+
+    keys1 = list(rows[0]["source"].keys())
+    keys2 = list(rows[0]["target"].keys())
+    with_properties = "props" in rows[0]
+
+    for offset in range(0, len(rows), batch_size):
+        neo_session.execute_write(
+            add_links, etiquette1, keys1, etiquette2, keys2, link,
+            rows[offset:offset + batch_size], with_properties
+        )
+    return len(rows)
+        
+def write_by_batch(neo_session: Session, work, rows: list, *args, batch_size: int = NEO4J_BATCH_SIZE) -> int:
+    """
+    Exécute `work(tx, *args, lot)` dans une transaction par lot de `batch_size` lignes.
+
+    Returns:
+        int: nombre de lignes envoyées.
+    """
+    for offset in range(0, len(rows), batch_size):
+        neo_session.execute_write(work, *args, rows[offset:offset + batch_size])
+    return len(rows)
+
+def upsert_noeuds(transacManager: ManagedTransaction, etiquette: str, keys: list[str], rows: list[dict]) -> None:
+    """
+    Crée ou met à jour un lot de nœuds identifiés par leur clé (MERGE puis SET).
+
+    Args:
+        transacManager (ManagedTransaction): Transaction Neo4j active.
+        etiquette (str): L'étiquette des nœuds.
+        keys (list[str]): Propriétés formant la clé primaire.
+        rows (list[dict]): Propriétés complètes de chaque nœud.
+    """
+    match = ", ".join(f"{k}: row.{k}" for k in keys)
+    query = (
+        f"UNWIND $rows AS row "
+        f"MERGE (n:{etiquette} {{{match}}}) "
+        f"SET n = row"
+    )
+    transacManager.run(query, rows=rows)
+    invalidate_schema_cache()
+
+def delete_noeuds(transacManager: ManagedTransaction, etiquette: str, keys: list[str], rows: list[dict]) -> None:
+    """
+    Supprime un lot de nœuds (et leurs liens) identifiés par leur clé.
+
+    Args:
+        transacManager (ManagedTransaction): Transaction Neo4j active.
+        etiquette (str): L'étiquette des nœuds.
+        keys (list[str]): Propriétés formant la clé primaire.
+        rows (list[dict]): Valeurs de la clé de chaque nœud à supprimer.
+    """
+    where = " AND ".join(f"n.{k} = row.{k}" for k in keys)
+    query = (
+        f"UNWIND $rows AS row "
+        f"MATCH (n:{etiquette}) WHERE {where} "
+        f"DETACH DELETE n"
+    )
+    transacManager.run(query, rows=rows)
+    invalidate_schema_cache()
+
+def delete_links_from(transacManager: ManagedTransaction, etiquette1: str, keys1: list[str], etiquette2: str, link: str, rows: list[dict]) -> None:
+    """
+    Supprime les liens `link` qui partent d'un lot de nœuds sources.
+
+    Args:
+        transacManager (ManagedTransaction): Transaction Neo4j active.
+        etiquette1 (str): étiquette des nœuds sources.
+        keys1 (list[str]): propriétés identifiant le nœud source.
+        etiquette2 (str): étiquette des nœuds cibles.
+        link (str): nom de la relation.
+        rows (list[dict]): valeurs de la clé de chaque nœud source.
+    """
+    where = " AND ".join(f"a.{k} = row.{k}" for k in keys1)
+    query = (
+        f"UNWIND $rows AS row "
+        f"MATCH (a:{etiquette1})-[r:{link}]->(:{etiquette2}) WHERE {where} "
+        f"DELETE r"
+    )
+    transacManager.run(query, rows=rows)
+
+def delete_links(transacManager: ManagedTransaction, etiquette1: str, keys1: list[str], etiquette2: str, keys2: list[str], link: str, rows: list[dict]) -> None:
+    """
+    Supprime un lot de liens donnés par leurs extrémités (voir `add_links` pour le format des lignes).
+    """
+    source_match = " AND ".join(f"a.{k} = row.source.{k}" for k in keys1)
+    target_match = " AND ".join(f"b.{k} = row.target.{k}" for k in keys2)
+    query = (
+        f"UNWIND $rows AS row "
+        f"MATCH (a:{etiquette1})-[r:{link}]->(b:{etiquette2}) "
+        f"WHERE {source_match} AND {target_match} "
+        f"DELETE r"
+    )
+    transacManager.run(query, rows=rows)
+
+def delete_all_links(transacManager: ManagedTransaction, etiquette1: str, etiquette2: str, link: str) -> None:
+    """Supprime tous les liens `link` entre deux étiquettes."""
+    transacManager.run(f"MATCH (:{etiquette1})-[r:{link}]->(:{etiquette2}) DELETE r")
+
+def delete_label(transacManager: ManagedTransaction, etiquette: str) -> None:
+    """Supprime tous les nœuds d'une étiquette et leurs liens."""
+    transacManager.run(f"MATCH (n:{etiquette}) DETACH DELETE n")
+    invalidate_schema_cache()
+
+def delete_noeuds_after(transacManager: ManagedTransaction, etiquette: str, keys: list[str], after: tuple) -> None:
+    """
+    Supprime les nœuds dont la clé est strictement supérieure à `after` (ordre lexicographique).
+
+    Utilisé à la reprise d'une migration pour retirer les lots écrits après le dernier point de reprise.
+
+    Args:
+        transacManager (ManagedTransaction): Transaction Neo4j active.
+        etiquette (str): L'étiquette des nœuds.
+        keys (list[str]): Propriétés formant la clé primaire, dans l'ordre de la clé.
+        after (tuple): Valeurs de la clé du dernier lot validé.
+    """
+    conditions = []
+    for i, key in enumerate(keys):
+        equal = [f"n.{k} = $k{j}" for j, k in enumerate(keys[:i])]
+        conditions.append("(" + " AND ".join(equal + [f"n.{key} > $k{i}"]) + ")")
+
+    query = (
+        f"MATCH (n:{etiquette}) "
+        f"WHERE {' OR '.join(conditions)} "
+        f"DETACH DELETE n"
+    )
+    transacManager.run(query, **{f"k{i}": v for i, v in enumerate(after)})
+    invalidate_schema_cache()
+
+def get_key_columns(metadata: MetaData, labels: list[str]) -> Dict[str, Dict[str, set]]:
+    """
+    Recense, pour chaque étiquette, les propriétés utilisées pour retrouver les nœuds lors de la création des liens.
+
+    Args:
+        metadata (MetaData): Métadonnées SQLAlchemy réfléchies de la base source.
+        labels (list[str]): Tables transformées en nœuds.
+
+    Returns:
+        Dict[str, Dict[str, set]]: {"table": {"primary": {("id",)}, "lookup": {("entreprise_id",), ...}}}
+    """
+    keys: Dict[str, Dict[str, set]] = {label: {"primary": set(), "lookup": set()} for label in labels}
+
+    for table_name, table in metadata.tables.items():
+        # Clé primaire de la table
+        pk_columns = tuple(col.name for col in table.primary_key.columns)
+        if table_name in keys and pk_columns:
+            keys[table_name]["primary"].add(pk_columns)
+
+        for fk_constraint in table.foreign_key_constraints:
+            # Colonnes de la clé étrangère (côté source du lien)
+            if table_name in keys:
+                keys[table_name]["lookup"].add(tuple(fk_constraint.column_keys))
+
+            # Colonnes référencées (côté cible du lien)
+            for fk in fk_constraint.elements:
+                target = fk.column.table.name
+                if target in keys:
+                    keys[target]["lookup"].add((fk.column.name,))
+
+    # Inutile d'indexer deux fois une clé déjà couverte par la clé primaire
+    for label_keys in keys.values():
+        label_keys["lookup"] -= label_keys["primary"]
+    return keys
+
+def create_key_indexes(neo_session: Session, metadata: MetaData, labels: list[str], timeout: int = NEO4J_INDEX_TIMEOUT) -> None:
+    """
+    Crée les contraintes d'unicité et les index sur les clés utilisées par les liens, puis attend qu'ils soient en ligne.
+
+    Les clés primaires simples deviennent des contraintes d'unicité (un index
+    simple est créé si les données contiennent des doublons), les clés
+    composées et les clés étrangères deviennent des index de plage.
+
+    Args:
+        neo_session (Session): Session active Neo4j.
+        metadata (MetaData): Métadonnées SQLAlchemy réfléchies de la base source.
+        labels (list[str]): Tables transformées en nœuds.
+        timeout (int): Délai maximum d'attente des index, en secondes.
+    """
+    def create_index(label: str, columns: tuple) -> None:
+        name = f"idx_{label}_{'_'.join(columns)}"
+        props = ", ".join(f"n.{col}" for col in columns)
+        neo_session.run(f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON ({props})").consume()
+
+    for label, label_keys in get_key_columns(metadata, labels).items():
+        for columns in label_keys["primary"]:
+            try:
+                if len(columns) == 1:
+                    name = f"uniq_{label}_{columns[0]}"
+                    neo_session.run(f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.{columns[0]} IS UNIQUE").consume()
+                else:
+                    create_index(label, columns)
+            except Neo4jError as e:
+                print(f"[WARNING] Contrainte d'unicité impossible sur {label}{columns} : {e}")
+                try:
+                    create_index(label, columns)
+                except Neo4jError as e:
+                    print(f"[ERROR] Échec de la création de l'index sur {label}{columns} : {e}")
+
+        for columns in label_keys["lookup"]:
+            try:
+                create_index(label, columns)
+            except Neo4jError as e:
+                print(f"[ERROR] Échec de la création de l'index sur {label}{columns} : {e}")
+
+    try:
+        neo_session.run("CALL db.awaitIndexes($timeout)", timeout=timeout).consume()
+        print("[SUCCESS] Index et contraintes en ligne.")
+    except Neo4jError as e:
+        print(f"[ERROR] Les index ne sont pas en ligne après {timeout}s : {e}")
+        
 def load_neo() -> Driver:
     """
     Crée et retourne une instance du driver Neo4j.
@@ -150,46 +463,63 @@ def erase_neo_db(driver: Driver) -> None:
     try:
         with driver.session() as session:
             session.execute_write(lambda tx: tx.run("MATCH (n) DETACH DELETE n"))
+        invalidate_schema_cache()
     except Neo4jError as e:
         print(f"Erreur lors du nettoyage de la base Neo4j : {e}")
         
-def insert_noeud_from_table(table_name: str, table_struct, neo_session: Session, db_engine: Driver) -> bool:
+def insert_noeud_from_table(table_name: str, table_struct, neo_session: Session, db_engine: Driver, batch_size: int = NEO4J_BATCH_SIZE, after: tuple = None, on_batch=None) -> bool:
     """
     Insère les données d'une table SQL dans Neo4j sous forme de nœuds.
 
+    La table est lue par lots de `batch_size` lignes et chaque lot est envoyé
+    dans une seule requête UNWIND par transaction, au lieu d'une transaction par ligne.
+
     Args:
         table_name (str): Nom de la table SQL.
         table_struct (Table): Structure SQLAlchemy de la table (pour les types).
         neo_session (Session): Session active Neo4j.
         db_engine (Engine): Moteur de base de données SQL.
+        batch_size (int): Nombre de lignes envoyées par transaction.
+        after (tuple): Clé primaire après laquelle reprendre la lecture (facultatif).
+        on_batch (callable): Appelé avec la clé primaire de la dernière ligne de chaque lot validé (facultatif).
 
     Returns:
         bool: True si l'import a réussi, False sinon.
     """
     try:
         print(f"[INFO] Lecture des données de la table : {table_name}")
-        table_datas: pd.DataFrame = get_all(db_engine, table_name)
-
-        if table_datas.empty:
-            print(f"[INFO] Aucune donnée à migrer depuis {table_name}.")
-            return True
 
         # Récupération des types de colonnes depuis SQLAlchemy
         table_colums_type: Dict[str, str] = {
             col.name: str(col.type) for col in table_struct.columns
         }
+        # Les types de colonnes sont stockés une seule fois, dans le nœud de métadonnées de l'étiquette
+        types = [f"{k}:{v}" for k, v in table_colums_type.items()]
+        neo_session.execute_write(store_label_types, table_name, types)
 
-        print(f"[INFO] Début de la migration vers Neo4j : {len(table_datas)} lignes à insérer...")
+        print(f"[INFO] Début de la migration vers Neo4j par lots de {batch_size} lignes...")
 
-        for _, row in table_datas.iterrows():
-            properties = row.to_dict()
-            # Ajouter les types de colonnes comme méta-infos (facultatif)
-            properties["_types"] = [f"{k}:{v}" for k, v in table_colums_type.items()]
-            
-            # Écriture transactionnelle dans Neo4j
-            neo_session.execute_write(create_noeud, table_name, properties)
+        pk_columns = [col.name for col in table_struct.primary_key.columns]
+
+        total = 0
+        start = time.perf_counter()
+        # Lecture de la table par lots : la mémoire ne dépend pas de la taille de la table
+        for table_datas in get_batches(db_engine, table_name, batch_size, after):
+            rows = dataframe_to_records(table_datas)
+            # Écriture transactionnelle dans Neo4j (un lot par transaction)
+            neo_session.execute_write(create_noeuds, table_name, rows)
+            total += len(rows)
+
+            if on_batch is not None and pk_columns:
+                on_batch(tuple(rows[-1][col] for col in pk_columns))
+
+        if total == 0:
+            print(f"[INFO] Aucune donnée à migrer depuis {table_name}.")
+            return True
 
-        print(f"[SUCCESS] Migration terminée pour la table {table_name}.")
+        elapsed = time.perf_counter() - start
+        rate = total / elapsed if elapsed > 0 else float("inf")
+        print(f"[SUCCESS] Migration terminée pour la table {table_name} : {total} lignes en {elapsed:.2f}s ({rate:.0f} lignes/s).")
         return True
 
     except Exception as e:
@@ -209,15 +539,80 @@ def get_relations(neo_session: Session, label1: str, label2: str):
         print(f"[ERROR] Échec de l'import des relation entre depuis {label1} et {label2}: {e}")
         return pd.DataFrame()
 
+def get_relation_catalog(neo_session: Session) -> Dict[tuple, dict]:
+    """
+    Construit le catalogue des relations du graphe en un seul parcours agrégé.
+
+    Chaque entrée est indexée par (étiquette source, type, étiquette cible) et
+    donne le nombre de relations et leur sens : "both" quand des relations du
+    même type (voir reverse_relation_types) existent aussi de la cible vers la
+    source, "out" sinon.
+
+    Args:
+        neo_session (Session): Session Neo4j active.
+
+    Returns:
+        Dict[tuple, dict]: {(source, type, cible): {"count": int, "direction": str}}
+    """
+    query = f"""
+    MATCH (s)-[r]->(t)
+    WITH labels(s) AS sources, type(r) AS relation_type, labels(t) AS targets, count(r) AS count
+    UNWIND sources AS source
+    UNWIND targets AS target
+    WITH source, relation_type, target, sum(count) AS count
+    WHERE source <> '{SCHEMA_LABEL}' AND target <> '{SCHEMA_LABEL}'
+    RETURN source, relation_type, target, count
+    """
+    catalog = {
+        (record["source"], record["relation_type"], record["target"]): {"count": record["count"]}
+        for record in neo_session.run(query)
+    }
+
+    # sens de chaque relation, type par type : deux types sans rapport en sens opposés restent "out"
+    for (source, relation_type, target), entry in catalog.items():
+        reverse = reverse_relation_types(source, relation_type, target)
+        entry["direction"] = "both" if any((target, other, source) in catalog for other in reverse) else "out"
+    return catalog
+
+def reverse_relation_types(source: str, relation_type: str, target: str) -> list[str]:
+    """
+    Types de relation qui, de `target` vers `source`, forment avec `relation_type` une relation dans les deux sens :
+    le même type, et pour une table d'association le type miroir créé par models/neo ("link_to_<source>_through_<table>").
+    """
+    types = [relation_type]
+    prefix = f"link_to_{target}_through_"
+    if relation_type.startswith(prefix):
+        types.append(f"link_to_{source}_through_{relation_type[len(prefix):]}")
+    return types
+
 def clean_label(raw_label: str) -> str:
     match = re.search(r"`(.+?)`", raw_label)
     return match.group(1) if match else raw_label
 
 
 
-def get_all_etiquette(neo_session: Session):
+def parse_types(type_entries: list[str]) -> Dict[str, str]:
+    """Convertit une liste "colonne:TYPE" en dictionnaire {colonne: TYPE}."""
+    types: Dict[str, str] = {}
+    for entry in type_entries:
+        if ":" in entry:
+            key, type_str = entry.split(":", 1)
+            types[key.strip()] = type_str.strip()
+    return types
+
+def invalidate_schema_cache() -> None:
+    """Oublie le schéma découvert, pour toutes les sessions (à appeler quand les nœuds, les étiquettes ou leurs types changent)."""
+    schema_cache.clear()
+
+def get_all_etiquette(neo_session: Session, use_cache: bool = True):
     """
-    Scans all labels in the Neo4j database and extracts property types from the `_types` field in each node.
+    Scans all labels in the Neo4j database and reads their property types in one query.
+
+    Types come from the `_Schema` metadata node of each label. Labels without
+    a metadata node get types inferred from `db.schema.nodeTypeProperties()`,
+    except legacy graphs whose nodes still carry a `_types` field, which is
+    read from one of their nodes. The result is cached for the session until
+    one of the write helpers changes the graph (see invalidate_schema_cache).
 
     Returns:
         A dictionary like:
@@ -230,28 +625,46 @@ def get_all_etiquette(neo_session: Session):
             ...
         }
     """
-    
+    if use_cache and neo_session in schema_cache:
+        return schema_cache[neo_session]
+
     try:
-        label_types: Dict[str, Dict[str, str]] = {}
+        query = f"""
+        MATCH (m:{SCHEMA_LABEL})
+        RETURN m.label AS label, m._types AS types, null AS property, null AS property_types
+        UNION ALL
+        CALL db.schema.nodeTypeProperties() YIELD nodeLabels, propertyName, propertyTypes
+        UNWIND nodeLabels AS label
+        WITH label, propertyName, propertyTypes
+        WHERE label <> '{SCHEMA_LABEL}'
+        RETURN label, null AS types, propertyName AS property, propertyTypes AS property_types
+        """
+        schema_types: Dict[str, list[str]] = {}
+        inferred: Dict[str, Dict[str, str]] = {}
+        for record in neo_session.run(query):
+            if record["types"] is not None:
+                schema_types[record["label"]] = record["types"]
+                continue
+            properties = inferred.setdefault(record["label"], {})
+            if record["property"] is not None:
+                property_types = record["property_types"] or []
+                properties[record["property"]] = NEO4J_PROPERTY_TYPES.get(property_types[0] if len(property_types) == 1 else None, "TEXT")
 
-        # Step 1: Get all labels
-        result = neo_session.run("CALL db.labels() YIELD label RETURN label")
-        labels = [record["label"] for record in result]
+        label_types: Dict[str, Dict[str, str]] = {}
+        for label, properties in inferred.items():
+            type_entries = schema_types.get(label)
 
-        # Step 2: For each label, sample one node and read _types
-        for label in labels:
-            query = f"MATCH (n:`{label}`) RETURN n._types AS types LIMIT 1"
-            result = neo_session.run(query)
-            record = result.single()
+            # Legacy graphs, sample one node and read _types
+            if type_entries is None and "_types" in properties:
+                record = neo_session.run(f"MATCH (n:`{label}`) RETURN n._types AS types LIMIT 1").single()
+                type_entries = record.get("types") if record else None
 
-            if record and record.get("types"):
-                type_entries = record["types"]
-                label_types[label] = {}
+            if type_entries:
+                label_types[label] = parse_types(type_entries)
+            elif properties:
+                label_types[label] = properties
 
-                for entry in type_entries:
-                    if ":" in entry:
-                        key, type_str = entry.split(":", 1)
-                        label_types[label][key.strip()] = type_str.strip()
+        schema_cache[neo_session] = label_types
         return label_types
     except Exception as e:
         print(f"[ERROR] Échec de la recuperation des etiquettes : {e}")
@@ -268,16 +681,36 @@ def get_relation_matrice(labels: list[str], neo_session: Session):
         return False
     
     
-def get_data_from_label(label: str, neo_session: Session):
+def get_data_from_label(label: str, neo_session: Session, batch_size: int = NEO4J_BATCH_SIZE):
+    """
+    Parcourt les nœuds d'une étiquette par lots, sans tout charger en mémoire.
+
+    Une seule requête est exécutée : le driver en rapatrie les résultats au fil
+    de la lecture, par paquets de `fetch_size` (voir NEO4J_FETCH_SIZE, fixé à
+    l'ouverture de la session). La session ne doit pas servir à une autre
+    requête tant que le générateur n'est pas épuisé.
+
+    Args:
+        label (str): Étiquette des nœuds à lire.
+        neo_session (Session): Session Neo4j active.
+        batch_size (int): Nombre de nœuds par lot.
+
+    Yields:
+        list[dict]: Propriétés des nœuds du lot.
+    """
     try:
-        result = neo_session.run(f"MATCH (n: {label}) RETURN n;")
-        
-        datas = [dict(record["n"]._properties) for record in result]
-            
-        return datas
+        result = neo_session.run(f"MATCH (n:{label}) RETURN properties(n) AS props")
+        batch = []
+        for record in result:
+            batch.append(record["props"])
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
     except Exception as e:
         print(f"[ERROR] Échec de la recuperation des données depuis {label} : {e}")
-        return False
+        raise
     
     
     
\ No newline at end of file
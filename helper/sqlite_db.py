@@ -1,8 +1,13 @@
 import pandas as pd
+import os
+import sqlite3
+from contextlib import contextmanager
 from typing import Dict
-from sqlalchemy import Table, Column, Engine, MetaData
+from sqlalchemy import Table, Column, Connection, Engine, MetaData, create_engine, event, text
 from sqlalchemy.exc import SQLAlchemyError
-from .utils import convertir_type,cast_value
+from sqlalchemy.pool import StaticPool
+from .utils import convertir_type,build_type_plan,cast_batch
+from enviroment import SQL_BATCH_SIZE, SQLITE_BULK_CACHE_SIZE
 
 # sqlite
 def sqliteIsJoinTable(table: str, db_engine: Engine):
@@ -85,6 +90,67 @@ def sqlite_get_all(table: str, db_engine: Engine):
         print(f"Erreur lors de la récupération des données de {table} : {e}")
         return pd.DataFrame()
 
+def sqlite_primary_key(table: str, db_engine: Engine) -> list[str]:
+    """
+    Retourne les colonnes de la clé primaire d'une table, dans l'ordre de la clé.
+
+    :param table: Nom de la table.
+    :param db_engine: Moteur (ou connexion) SQLAlchemy.
+    :return: Liste des colonnes de la clé primaire (vide si aucune).
+    """
+    schema_df = pd.read_sql_query(f"PRAGMA table_info('{table}');", db_engine)
+    pk_df = schema_df[schema_df['pk'] > 0].sort_values('pk')
+    return pk_df['name'].tolist()
+
+def sqlite_get_batches(table: str, db_engine: Engine, batch_size: int, after: tuple = None):
+    """
+    Parcourt une table par lots de taille bornée.
+
+    Si la table a une clé primaire, la pagination se fait par clé (keyset) :
+    chaque lot reprend après la dernière clé du lot précédent, ce qui permet
+    aussi de reprendre après une clé donnée. Sinon, les lots sont lus avec
+    le curseur de `pd.read_sql_query(chunksize=...)`.
+
+    :param table: Nom de la table.
+    :param db_engine: Moteur (ou connexion) SQLAlchemy.
+    :param batch_size: Nombre maximum de lignes par lot.
+    :param after: Valeurs de la clé primaire après lesquelles commencer (facultatif).
+    :return: Générateur de DataFrame.
+    """
+    try:
+        pk_columns = sqlite_primary_key(table, db_engine)
+
+        if not pk_columns:
+            yield from pd.read_sql_query(f"SELECT * FROM {table}", db_engine, chunksize=batch_size)
+            return
+
+        key = ", ".join(pk_columns)
+        placeholders = ", ".join(f":k{i}" for i in range(len(pk_columns)))
+        last_key = tuple(after) if after is not None else None
+
+        while True:
+            params = {"limit": batch_size}
+            where = ""
+            if last_key is not None:
+                where = f"WHERE ({key}) > ({placeholders})"
+                params.update({f"k{i}": v for i, v in enumerate(last_key)})
+
+            query = text(f"SELECT * FROM {table} {where} ORDER BY {key} LIMIT :limit")
+            batch = pd.read_sql_query(query, db_engine, params=params)
+            if batch.empty:
+                return
+
+            yield batch
+
+            if len(batch) < batch_size:
+                return
+            # tolist() rend des scalaires Python, que sqlite3 sait lier (pas numpy.int64)
+            last_key = tuple(batch[col].iloc[-1:].tolist()[0] for col in pk_columns)
+    except SQLAlchemyError as e:
+        print(f"Erreur lors de la récupération des données de {table} : {e}")
+        # un lot manquant ne doit pas passer pour la fin de la table
+        raise
+
 def sqlite_get_all_relations(table1: str, table2: str, db_engine: Engine):
     try:
         df = sqlite_single_table_relations(table1, db_engine)
@@ -112,6 +178,7 @@ def create_sqlite_table(db_engine: Engine, table: str, fields: dict):
         tab = Table(table, metadata, *columns)
         
         metadata.create_all(db_engine)
+        invalidate_sqlite_metadata(db_engine, table)
                     
         return True
     except SQLAlchemyError as e:
@@ -119,31 +186,150 @@ def create_sqlite_table(db_engine: Engine, table: str, fields: dict):
         return False
     
 
-def cast_row(row: dict, type_map: dict) -> dict:
-    return {k: cast_value(v, type_map.get(k, "VARCHAR")) for k, v in row.items()}
+# Métadonnées réfléchies par moteur, table par table, pour ne pas relire tout le schéma à chaque insertion
+metadata_cache: Dict[Engine, MetaData] = {}
 
-def sqlite_bulk_insert_data(db_engine: Engine, table_name: str, datas: list, type_map: dict):
+def get_sqlite_table(db_engine: Engine, table_name: str, bind: Connection = None):
+    """Retourne la structure d'une table, réfléchie une seule fois par moteur (avec `bind` si une connexion est déjà ouverte)."""
+    metadata = metadata_cache.setdefault(db_engine, MetaData())
+    if table_name not in metadata.tables:
+        try:
+            metadata.reflect(bind=bind if bind is not None else db_engine, only=[table_name])
+        except SQLAlchemyError:
+            return None
+    return metadata.tables.get(table_name)
+
+def invalidate_sqlite_metadata(db_engine: Engine, table: str = None):
+    """Oublie les métadonnées en cache d'une table (ou de toutes les tables) après un changement de schéma."""
+    if table is None:
+        metadata_cache.pop(db_engine, None)
+    elif db_engine in metadata_cache and table in metadata_cache[db_engine].tables:
+        metadata_cache[db_engine].remove(metadata_cache[db_engine].tables[table])
+
+def sqlite_bulk_insert_data(db_engine: Engine, table_name: str, datas: list, type_map: dict, batch_size: int = SQL_BATCH_SIZE):
     try:
-        metadata = MetaData()
-        metadata.reflect(bind=db_engine)
-        table = metadata.tables.get(table_name)
-        
+        table = get_sqlite_table(db_engine, table_name)
 
         if table is not None:
-            insert_datas = [{k: d[k] for k in table.columns.keys()} for d in datas]
-            insert_datas = [cast_row(d, type_map) for d in insert_datas]
+            # conversion de chaque colonne, préparée une seule fois par table
+            plan = build_type_plan(tuple(table.columns.keys()), tuple(sorted(type_map.items())))
 
             with db_engine.connect() as conn:
-                with conn.begin():
-                    conn.execute(
-                        table.insert(),
-                        insert_datas
-                    )
+                # une transaction par lot : la mémoire reste bornée quelle que soit la taille de l'étiquette
+                for start in range(0, len(datas), batch_size):
+                    insert_datas = cast_batch(datas[start:start + batch_size], plan)
+                    with conn.begin():
+                        conn.execute(
+                            table.insert(),
+                            insert_datas
+                        )
                 print("[SUCCESS] Données insérées avec succès.")
         else:
             print(f"[ERREUR] Table '{table_name}' introuvable.")
     
         return True
     except SQLAlchemyError as e:
-        print(f"[ERREUR] Erreur lors de l'insertion des données dans ' {table}: {e}")
-        return False
\ No newline at end of file
+        print(f"[ERREUR] Erreur lors de l'insertion des données dans ' {table_name}: {e}")
+        return False
+
+def sqlite_insert_rows(conn: Connection, table_name: str, datas: list, type_map: dict, batch_size: int = SQL_BATCH_SIZE):
+    """
+    Insère des lignes avec une connexion déjà ouverte, dans sa transaction en cours.
+
+    La transaction n'est pas validée : l'appelant choisit quand valider, et
+    une erreur est propagée pour qu'il puisse l'annuler.
+    """
+    table = get_sqlite_table(conn.engine, table_name, conn)
+    if table is None:
+        raise ValueError(f"Table '{table_name}' introuvable.")
+
+    plan = build_type_plan(tuple(table.columns.keys()), tuple(sorted(type_map.items())))
+    for start in range(0, len(datas), batch_size):
+        conn.execute(table.insert(), cast_batch(datas[start:start + batch_size], plan))
+
+def bulk_load_tmp_path(path: str) -> str:
+    """Fichier temporaire dans lequel sqlite_bulk_load construit la base `path`."""
+    return f"{path}.tmp"
+
+@contextmanager
+def sqlite_bulk_load(path: str, in_memory: bool = False, cache_size: int = SQLITE_BULK_CACHE_SIZE, resume: bool = False):
+    """
+    Construit une nouvelle base SQLite en mode chargement rapide.
+
+    Les données sont écrites dans un fichier temporaire (ou en mémoire) avec
+    journal_mode=WAL, synchronous=OFF et un grand cache : une coupure de courant
+    peut corrompre le fichier temporaire, jamais `path`. À la sortie sans
+    erreur, ANALYZE et PRAGMA optimize sont lancés, puis le fichier remplace `path` de façon atomique. En cas
+    d'erreur, `path` n'est pas modifié et le fichier temporaire est conservé
+    pour qu'une reprise (`resume`) continue à partir de lui.
+
+    Les tables des étiquettes n'ont pas d'index à différer (leur clé `id`
+    INTEGER PRIMARY KEY est le rowid) ; les tables d'association sont
+    remplies depuis une table de transit sans index, triée sur leur clé.
+
+    :param path: Chemin du fichier SQLite final.
+    :param in_memory: Construire la base en mémoire, puis la copier sur disque avec l'API de sauvegarde.
+    :param cache_size: Taille du cache de pages, en Kio.
+    :param resume: Rouvrir le fichier temporaire laissé par un chargement interrompu au lieu de repartir de zéro.
+    :return: Moteur SQLAlchemy de la base en construction.
+    """
+    tmp_path = bulk_load_tmp_path(path)
+    if resume and in_memory:
+        raise ValueError("une base construite en mémoire ne peut pas être reprise")
+    if not resume:
+        for leftover in (tmp_path, f"{tmp_path}-wal", f"{tmp_path}-shm"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    if in_memory:
+        # une seule connexion partagée : la base en mémoire vit avec elle
+        db_engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    else:
+        db_engine = create_engine(sqlite_connector(tmp_path))
+
+    @event.listens_for(db_engine, "connect")
+    def bulk_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute(f"PRAGMA cache_size = -{cache_size}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        cursor.close()
+
+    try:
+        yield db_engine
+
+        with db_engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+            conn.execute(text("PRAGMA optimize"))
+
+        if in_memory:
+            raw = db_engine.raw_connection()
+            try:
+                target = sqlite3.connect(tmp_path)
+                raw.driver_connection.backup(target)
+                target.close()
+            finally:
+                raw.close()
+        # fermer toutes les connexions du pool : le changement de journal demande un accès exclusif
+        db_engine.dispose()
+
+        if not in_memory:
+            # ramener le WAL dans le fichier principal avant le renommage
+            conn = sqlite3.connect(tmp_path)
+            try:
+                mode = conn.execute("PRAGMA journal_mode = DELETE").fetchone()[0]
+            finally:
+                conn.close()
+            if mode != "delete":
+                raise RuntimeError(f"journal WAL de {tmp_path} toujours ouvert par une autre connexion")
+
+        os.replace(tmp_path, path)
+        print(f"[SUCCESS] Base SQLite écrite : {path}")
+    except BaseException:
+        db_engine.dispose()
+        if os.path.exists(tmp_path):
+            print(f"[WARNING] Base partielle conservée pour une reprise : {tmp_path}")
+        raise
+    finally:
+        invalidate_sqlite_metadata(db_engine)
@@ -0,0 +1,138 @@
+import sqlite3
+import hashlib
+import json
+
+"""
+    Empreintes des lignes sources conservées entre deux synchronisations SQL -> Neo4j.
+
+    Chaque ligne est identifiée par sa clé primaire (sérialisée en JSON) et
+    résumée par un hash de son contenu. Les empreintes sont stockées dans un
+    petit fichier SQLite local, par base source et par table.
+"""
+
+def open_sync_state(path: str) -> sqlite3.Connection:
+    """
+    Ouvre (et crée si besoin) le fichier d'état de synchronisation.
+
+    :param path: Chemin du fichier SQLite d'état.
+    :return: Connexion sqlite3 ouverte.
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            source TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            pk TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            PRIMARY KEY (source, table_name, pk)
+        )
+    """)
+    # empreintes de la synchronisation en cours, écrites lot par lot et
+    # reportées dans `fingerprints` une fois la synchronisation terminée
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS next_fingerprints (
+            source TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            pk TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            PRIMARY KEY (source, table_name, pk)
+        )
+    """)
+    conn.commit()
+    return conn
+
+def has_sync_state(conn: sqlite3.Connection, source: str) -> bool:
+    """Indique si une synchronisation a déjà été enregistrée pour cette base source."""
+    row = conn.execute("SELECT 1 FROM fingerprints WHERE source = ? LIMIT 1", (source,)).fetchone()
+    return row is not None
+
+def reset_sync_state(conn: sqlite3.Connection, source: str) -> None:
+    """Oublie toutes les empreintes d'une base source."""
+    with conn:
+        conn.execute("DELETE FROM fingerprints WHERE source = ?", (source,))
+        conn.execute("DELETE FROM next_fingerprints WHERE source = ?", (source,))
+
+def has_fingerprints(conn: sqlite3.Connection, source: str, table: str) -> bool:
+    """Indique si une table a des empreintes enregistrées."""
+    row = conn.execute(
+        "SELECT 1 FROM fingerprints WHERE source = ? AND table_name = ? LIMIT 1", (source, table)
+    ).fetchone()
+    return row is not None
+
+def load_fingerprints(conn: sqlite3.Connection, source: str, table: str, keys: list[str]) -> dict[str, str]:
+    """
+    Charge les empreintes de la dernière synchronisation pour un lot de clés.
+
+    :param keys: Clés primaires JSON du lot (passées en un seul paramètre JSON).
+    :return: Dictionnaire {clé primaire JSON: hash} des clés déjà connues.
+    """
+    cursor = conn.execute(
+        "SELECT pk, hash FROM fingerprints "
+        "WHERE source = ? AND table_name = ? AND pk IN (SELECT value FROM json_each(?))",
+        (source, table, json.dumps(keys))
+    )
+    return dict(cursor.fetchall())
+
+def clear_next_fingerprints(conn: sqlite3.Connection, source: str, table: str) -> None:
+    """Oublie les empreintes en cours d'une table (nouveau parcours)."""
+    with conn:
+        conn.execute("DELETE FROM next_fingerprints WHERE source = ? AND table_name = ?", (source, table))
+
+def stage_fingerprints(conn: sqlite3.Connection, source: str, table: str, fingerprints: dict[str, str]) -> None:
+    """Écrit les empreintes d'un lot de la synchronisation en cours."""
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO next_fingerprints (source, table_name, pk, hash) VALUES (?, ?, ?, ?)",
+            ((source, table, pk, row_hash) for pk, row_hash in fingerprints.items())
+        )
+
+def iter_deleted_keys(conn: sqlite3.Connection, source: str, table: str, batch_size: int):
+    """
+    Parcourt par lots les clés connues à la dernière synchronisation mais absentes
+    du parcours en cours (lignes supprimées depuis).
+
+    :return: Générateur de listes de clés primaires JSON.
+    """
+    cursor = conn.execute(
+        "SELECT f.pk FROM fingerprints f "
+        "WHERE f.source = ? AND f.table_name = ? AND NOT EXISTS ("
+        "  SELECT 1 FROM next_fingerprints n "
+        "  WHERE n.source = f.source AND n.table_name = f.table_name AND n.pk = f.pk"
+        ")",
+        (source, table)
+    )
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield [pk for pk, in rows]
+
+def save_fingerprints(conn: sqlite3.Connection, source: str, table: str) -> None:
+    """Remplace les empreintes d'une table par celles de la synchronisation courante."""
+    with conn:
+        conn.execute("DELETE FROM fingerprints WHERE source = ? AND table_name = ?", (source, table))
+        conn.execute(
+            "INSERT INTO fingerprints (source, table_name, pk, hash) "
+            "SELECT source, table_name, pk, hash FROM next_fingerprints WHERE source = ? AND table_name = ?",
+            (source, table)
+        )
+        conn.execute("DELETE FROM next_fingerprints WHERE source = ? AND table_name = ?", (source, table))
+
+def normalize_value(value):
+    """Rend la valeur indépendante du type inféré par pandas pour le lot (1.0 et 1 donnent la même empreinte)."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def row_key(row: dict, pk_columns: list[str]) -> str:
+    """Sérialise la clé primaire d'une ligne."""
+    return json.dumps([normalize_value(row[col]) for col in pk_columns], default=str)
+
+def key_values(key: str, pk_columns: list[str]) -> dict:
+    """Retrouve les valeurs de la clé primaire à partir de sa forme sérialisée."""
+    return dict(zip(pk_columns, json.loads(key)))
+
+def row_hash(row: dict) -> str:
+    """Calcule l'empreinte du contenu d'une ligne."""
+    content = json.dumps({k: normalize_value(v) for k, v in row.items()}, sort_keys=True, default=str)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
@@ -4,7 +4,12 @@ from sqlalchemy import (
 )
 
 from datetime import datetime
+from functools import lru_cache
+import warnings
+import numpy as np
+import pandas as pd
 
+@lru_cache(maxsize=None)
 def convertir_type(sql_type: str):
     """Convertit un type SQL en type SQLAlchemy en utilisant match-case (Python 3.10+)."""
     sql_type = sql_type.upper().strip()
@@ -52,4 +57,158 @@ def cast_value(value: str, type_name: str):
         else:  # default to string
             return str(value)
     except Exception:
-        return value  # fallback
\ No newline at end of file
+        return value  # fallback
+
+def fallback(function):
+    """Conversion d'une valeur avec le repli de cast_value : la valeur est gardée si elle ne se convertit pas."""
+    def cast(value):
+        try:
+            return function(value)
+        except Exception:
+            return value  # fallback
+    return cast
+
+def merge_converted(column: pd.Series, mask: np.ndarray, values: np.ndarray, failed: np.ndarray, function) -> list:
+    """
+    Assemble une colonne convertie en bloc : NULL hors du masque, et `function`
+    appliquée valeur par valeur seulement là où la conversion en bloc a échoué.
+    """
+    result = np.where(mask, values, None)
+    cast = fallback(function)
+    originals = column.to_numpy()
+    for i in np.flatnonzero(mask & failed):
+        result[i] = cast(originals[i])
+    return result.tolist()
+
+def unchanged(column: pd.Series, mask: np.ndarray) -> list:
+    return np.where(mask, column.to_numpy(), None).tolist()
+
+def is_text(column: pd.Series) -> pd.Series:
+    return column.map(type).eq(str)
+
+def cast_integer_column(column: pd.Series, mask: np.ndarray) -> list:
+    # colonne déjà entière (hors booléens) : rien à convertir, sans passer par float64
+    if pd.api.types.infer_dtype(column, skipna=True) == "integer":
+        return unchanged(column, mask)
+    numeric = pd.to_numeric(column, errors="coerce").to_numpy(dtype=float)
+    # au-delà de 2**53 un float64 n'est plus exact, et int() tronque les non-entiers :
+    # ces valeurs repassent par int() une à une
+    exact = np.isfinite(numeric) & (np.trunc(numeric) == numeric) & (np.abs(numeric) < 2**53)
+    values = np.where(exact, numeric, 0).astype(np.int64).astype(object)
+    return merge_converted(column, mask, values, ~exact, int)
+
+def cast_float_column(column: pd.Series, mask: np.ndarray) -> list:
+    if pd.api.types.infer_dtype(column, skipna=True) == "floating":
+        return unchanged(column, mask)
+    numeric = pd.to_numeric(column, errors="coerce").to_numpy(dtype=float)
+    return merge_converted(column, mask, numeric.astype(object), np.isnan(numeric), float)
+
+def cast_boolean_column(column: pd.Series, mask: np.ndarray) -> list:
+    if pd.api.types.infer_dtype(column, skipna=True) == "boolean":
+        return unchanged(column, mask)
+    # les booléens Neo4j sont gardés tels quels, les chaînes suivent cast_value
+    native = column.map(type).eq(bool).to_numpy()
+    values = np.where(native, column.to_numpy(), column.isin(["true", "1", "True"]).to_numpy())
+    return unchanged(pd.Series(values, dtype=object), mask)
+
+def parse_date(value: str):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+def cast_date_column(column: pd.Series, mask: np.ndarray) -> list:
+    # seules les chaînes sont analysées en bloc, les autres valeurs suivent cast_value
+    parsed = pd.to_datetime(column.where(is_text(column)), format="%Y-%m-%d", errors="coerce")
+    return merge_converted(column, mask, parsed.dt.date.to_numpy(), parsed.isna().to_numpy(), parse_date)
+
+def cast_datetime_column(column: pd.Series, mask: np.ndarray) -> list:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parsed = pd.to_datetime(column.where(is_text(column)), format="ISO8601", errors="coerce")
+    if not pd.api.types.is_datetime64_dtype(parsed) or isinstance(parsed.dtype, pd.DatetimeTZDtype):
+        # fuseaux horaires : pandas les ramène à un seul, fromisoformat garde celui de chaque valeur
+        return merge_converted(column, mask, column.to_numpy(), np.ones(len(column), dtype=bool), datetime.fromisoformat)
+    return merge_converted(column, mask, parsed.array.to_pydatetime(), parsed.isna().to_numpy(), datetime.fromisoformat)
+
+def cast_string_column(column: pd.Series, mask: np.ndarray) -> list:
+    if pd.api.types.infer_dtype(column, skipna=True) == "string":
+        return unchanged(column, mask)
+    return unchanged(column.astype(str), mask)
+
+# Conversion de colonne par type, construite une seule fois (mêmes règles que cast_value)
+COLUMN_CASTERS = {
+    "INTEGER": cast_integer_column,
+    "FLOAT": cast_float_column,
+    "BOOLEAN": cast_boolean_column,
+    "DATE": cast_date_column,
+    "DATETIME": cast_datetime_column,
+}
+
+@lru_cache(maxsize=None)
+def build_type_plan(columns: tuple, types: tuple) -> tuple:
+    """
+    Associe à chaque colonne d'une table sa fonction de conversion.
+
+    Args:
+        columns (tuple): noms des colonnes de la table.
+        types (tuple): paires (colonne, type) de l'étiquette.
+
+    Returns:
+        tuple: paires (colonne, conversion), VARCHAR par défaut.
+    """
+    type_map = dict(types)
+    return tuple(
+        (column, COLUMN_CASTERS.get(type_map.get(column, "VARCHAR"), cast_string_column))
+        for column in columns
+    )
+
+def cast_batch(datas: list[dict], plan: tuple) -> list[dict]:
+    """
+    Convertit un lot de lignes colonne par colonne selon un plan de types.
+
+    Args:
+        datas (list[dict]): lignes à convertir (propriétés absentes = NULL).
+        plan (tuple): plan retourné par build_type_plan.
+
+    Returns:
+        list[dict]: lignes converties, limitées aux colonnes du plan.
+    """
+    if not datas:
+        return []
+    names = [column for column, _ in plan]
+
+    # dtype=object : pandas ne doit pas inférer de type (un NULL rendrait une colonne d'entiers float64)
+    frame = pd.DataFrame(datas, columns=names, dtype=object)
+    masks = frame.notna().to_numpy()
+    columns = [caster(frame[name], masks[:, i]) for i, (name, caster) in enumerate(plan)]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+def dataframe_to_records(datas: pd.DataFrame) -> list[dict]:
+    """
+    Convertit un lot (DataFrame) en liste de dictionnaires de valeurs Python natives.
+
+    La conversion se fait colonne par colonne : NaN/NaT/NA deviennent None,
+    les scalaires numpy deviennent des int/float/bool Python et les dates
+    pandas des datetime/timedelta Python.
+
+    Args:
+        datas (pd.DataFrame): lot de lignes à convertir.
+
+    Returns:
+        list[dict]: une entrée par ligne, utilisable comme paramètre Neo4j.
+    """
+    columns = []
+    for name in datas.columns:
+        column = datas[name]
+        mask = column.notna().to_numpy()
+
+        if pd.api.types.is_datetime64_any_dtype(column):
+            values = column.array.to_pydatetime()
+        elif pd.api.types.is_timedelta64_dtype(column):
+            values = column.array.to_pytimedelta()
+        else:
+            # astype(object) rend des scalaires Python pour les colonnes numpy
+            values = column.astype(object).to_numpy()
+
+        columns.append(np.where(mask, values, None).tolist())
+
+    names = list(datas.columns)
+    return [dict(zip(names, row)) for row in zip(*columns)]
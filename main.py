@@ -1,9 +1,15 @@
 from models.neo import neo
 from models.m_sqlite import m_sqlite
+from models.neo_import import neo_import
+from models.neo_sync import neo_sync
 from enviroment import DATABASE_URI_TEST,DATABASE_URI_OUPUT_TEST
 
 
 # test extration from sql to neo4j
 # neo(DATABASE_URI_TEST)
+# synchronisation incrementale (seules les lignes modifiees sont envoyees)
+# neo_sync(DATABASE_URI_TEST)
+# export hors ligne pour neo4j-admin database import
+# neo_import(DATABASE_URI_TEST, 'data/import')
 m_sqlite(DATABASE_URI_OUPUT_TEST)
     
\ No newline at end of file
@@ -1,75 +1,114 @@
-from helper.neo4j_db import load_neo, get_all_etiquette, get_data_from_label
-from helper.db import connector, create_table, bulk_insert_data
+from helper.neo4j_db import load_neo, get_all_etiquette, get_data_from_label, get_relation_catalog
+from helper.db import connector, create_table, bulk_insert_data, insert_rows, invalidate_metadata
+from helper.sqlite_db import sqlite_bulk_load, bulk_load_tmp_path
 from helper.relations_extractor import get_neo_matrice_relations
+from helper.journal import MigrationJournal
+from enviroment import (JOURNAL_PATH, NEO4J_FETCH_SIZE, CONSTRAINT_SCAN_LIMIT, SQL_BATCH_SIZE, SQLITE_BULK_LOAD,
+                        PIPELINE_READERS, PIPELINE_QUEUE_SIZE, PIPELINE_COMMIT_BATCHES)
 from sqlalchemy import text
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+import os
 
 """
     Transform database from neo4j to sql.
 
     Args:
         uri (str): the database uri.
+        resume (bool): continue an interrupted migration from its journal instead of starting over.
+        bulk_load (bool): build the file with the fast bulk-load profile; an interrupted bulk load is resumed from its temporary file.
+        in_memory (bool): with bulk_load, build the database in memory before writing it to disk.
+        readers (int): number of Neo4j reader threads; above 1 the labels are read concurrently and written by a single SQLite writer.
 
     Returns:
         bool: true when is correct an false otherwise.
 """
-def m_sqlite(uri: str):
+def m_sqlite(uri: str, resume: bool = False, bulk_load: bool = SQLITE_BULK_LOAD, in_memory: bool = False,
+             readers: int = PIPELINE_READERS):
     """Transform database from neo4j to sql."""
-    try:
-        # connexion a notre bd sql
-        driver_sql, metadata = connector(uri)
+    if bulk_load:
+        # le journal suit le fichier temporaire : sans lui, rien à reprendre
+        if resume and not os.path.exists(bulk_load_tmp_path(uri)):
+            print(f"[INFO] Aucune base partielle à reprendre pour {uri} : nouvelle migration")
+            resume = False
         
+        # nouvelle base construite à part, puis mise en place d'un seul coup
+        with sqlite_bulk_load(uri, in_memory, resume=resume) as driver_sql:
+            transform_to_sqlite(driver_sql, f"m_sqlite:{bulk_load_tmp_path(uri)}", resume, readers)
+        return
+    
+    # connexion a notre bd sql
+    driver_sql, metadata = connector(uri)
+    try:
+        transform_to_sqlite(driver_sql, f"m_sqlite:{uri}", resume, readers)
+    finally:
+        driver_sql.dispose()
+
+def transform_to_sqlite(driver_sql, run: str, resume: bool = False, readers: int = PIPELINE_READERS):
+    """Copie les étiquettes et relations Neo4j dans la base SQLite ouverte."""
+    try:
         # connexion a la bd neo4j
         driver_neo = load_neo()
         
-        with driver_neo.session() as session:
+        # journal de progression (etapes terminees)
+        journal = MigrationJournal(JOURNAL_PATH, run)
+        
+        with driver_neo.session(fetch_size=NEO4J_FETCH_SIZE) as session:
+            # les contraintes en cache viennent peut-être d'un autre graphe
+            constraints_cache.clear()
+            
             # get all labels 
             labels_data = get_all_etiquette(session)
             
             print("[INFO] Début de la creation des tables")
             
-            # Supprimer toutes les tables existantes
-            drop_existing_tables(driver_sql, labels_data.keys())
+            if resume:
+                print(f"[INFO] Reprise de la migration depuis le journal {JOURNAL_PATH}")
+            else:
+                journal.reset()
+                # Supprimer toutes les tables existantes
+                drop_existing_tables(driver_sql, labels_data.keys())
             
             # Créer les tables et leurs contraintes
             for table, data in labels_data.items():
-                # Créer la table avec sa structure
+                # Extraire les contraintes (un seul parcours par étiquette, mis en cache)
+                extract_neo4j_constraints(session, table)
+                
+                # Créer la table avec sa structure et ses colonnes NOT NULL
                 create_table(driver_sql, table, data)
                 print(f"[SUCCESS] Table created: {table}")
-                
-                # Extraire et appliquer les contraintes
-                constraints = extract_neo4j_constraints(session, table)
-                if constraints:
-                    apply_constraints_to_sqlite(driver_sql, table, constraints)
-                print(f"[SUCCESS] Constraints applied to: {table}")
             
             print("[INFO] Fin de la creation des tables")
             
             print("[INFO] Début de l'insertion des données")
             
             # Insérer les données dans les tables
-            for table, data in labels_data.items():
-                # get all data for each label
-                labels_datas = get_data_from_label(table, session)
-                print(f"[INFO] Au total {len(labels_datas)} ligne(s) à inserées")
-                
-                row_datas = [label_to_row(row) for row in labels_datas]
-                bulk_insert_data(driver_sql, table, row_datas, data)
-                
-                print(f"[SUCCESS] Données inserées dans la table : {table}")
+            if readers > 1:
+                results = insert_labels_pipelined(labels_data, driver_neo, driver_sql, readers, journal)
+            else:
+                results = insert_labels(labels_data, driver_sql, session, journal)
+            
+            # une étiquette en échec n'est pas marquée terminée : la reprise la recommencera
+            failed = [table for table, result in results.items() if not result["success"]]
+            if failed:
+                raise RuntimeError(f"échec de l'insertion des données dans : {', '.join(failed)}")
             
             print("[INFO] Fin de l'insertion des données")
             
             print("[INFO] Début de la creation des liens")
             
-            # Récupérer la matrice des relations
-            matrice_relations = get_neo_matrice_relations(session, labels_data.keys())
+            # Catalogue des relations (un seul parcours du graphe) et matrice des relations
+            catalog = get_relation_catalog(session)
+            matrice_relations = get_neo_matrice_relations(session, labels_data.keys(), catalog)
             
             if matrice_relations is not None and len(matrice_relations) > 0:
                 # Créer les relations simples (one-to-many)
-                insert_simple_relations(matrice_relations, driver_sql, session)
+                insert_simple_relations(matrice_relations, driver_sql, session, catalog, journal)
                 
                 # Créer les relations many-to-many
-                insert_many_to_many_relations(matrice_relations, driver_sql, session)
+                insert_many_to_many_relations(matrice_relations, driver_sql, session, catalog, journal)
             else:
                 print("[WARNING] Aucune relation trouvée dans la base Neo4j")
             
@@ -80,67 +119,244 @@ def m_sqlite(uri: str):
         raise
     finally:
         # Nettoyage des ressources
-        if 'driver_sql' in locals():
-            driver_sql.dispose()
         if 'driver_neo' in locals():
             driver_neo.close()
+        if 'journal' in locals():
+            journal.close()
+
+def insert_labels(labels_data, driver_sql, session, journal: MigrationJournal):
+    """
+    Copie les nœuds de chaque étiquette, l'une après l'autre, en lisant et insérant par lots.
+
+    Returns:
+        dict: pour chaque étiquette {"success": bool, "rows": int, "error": str | None}.
+    """
+    results = {}
+    for table, data in labels_data.items():
+        step = f"data:{table}"
+        if journal.is_done(step):
+            print(f"[INFO] Données déjà inserées dans la table : {table}")
+            continue
+        
+        # Retirer les lignes d'une insertion interrompue
+        clear_table(driver_sql, table)
+        
+        # lire les noeuds par lots et les inserer au fil de l'eau
+        result = results[table] = {"success": True, "rows": 0, "error": None}
+        for labels_datas in get_data_from_label(table, session):
+            row_datas = [label_to_row(row) for row in labels_datas]
+            if not bulk_insert_data(driver_sql, table, row_datas, data):
+                result.update(success=False, error="échec de l'insertion")
+                break
+            result["rows"] += len(row_datas)
+        
+        if result["success"]:
+            journal.mark_done(step)
+            print(f"[SUCCESS] {result['rows']} ligne(s) inserées dans la table : {table}")
+        else:
+            print(f"[ERROR] Échec de l'insertion dans la table {table} : {result['error']}")
+    return results
+
+def insert_labels_pipelined(labels_data, driver_neo, driver_sql, readers: int, journal: MigrationJournal):
+    """
+    Copie les nœuds de plusieurs étiquettes en pipeline.
+
+    Plusieurs lecteurs, chacun avec sa propre session Neo4j, déposent les lots
+    lus dans une file bornée (PIPELINE_QUEUE_SIZE lots au plus en mémoire).
+    Le thread appelant est le seul à écrire dans SQLite : il vide la file avec
+    une seule connexion et valide sa transaction tous les PIPELINE_COMMIT_BATCHES
+    lots, et à la fin de chaque étiquette. Si l'écrivain s'arrête
+    (erreur, Ctrl-C), les lecteurs sont prévenus et ne restent pas bloqués
+    sur la file pleine.
+
+    Args:
+        labels_data (dict): types des colonnes par étiquette {etiquette: {colonne: type}}.
+        driver_neo (Driver): driver Neo4j.
+        driver_sql (Engine): moteur de la base SQLite.
+        readers (int): nombre de lecteurs.
+        journal (MigrationJournal): journal de reprise.
+
+    Returns:
+        dict: pour chaque étiquette {"success": bool, "rows": int, "error": str | None}.
+    """
+    tables = {table: data for table, data in labels_data.items() if not journal.is_done(f"data:{table}")}
+    for table in labels_data.keys() - tables.keys():
+        print(f"[INFO] Données déjà inserées dans la table : {table}")
+    
+    # Retirer les lignes d'une insertion interrompue
+    for table in tables:
+        clear_table(driver_sql, table)
+    
+    batches = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    stop = threading.Event()
+    
+    def put(item):
+        # attendre une place dans la file tant que l'écrivain n'a pas abandonné
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def read(table):
+        # (étiquette, lignes, erreur) ; lignes = None marque la fin de l'étiquette
+        if stop.is_set():
+            return
+        try:
+            with driver_neo.session(fetch_size=NEO4J_FETCH_SIZE) as session:
+                for labels_datas in get_data_from_label(table, session):
+                    if not put((table, [label_to_row(row) for row in labels_datas], None)):
+                        return
+            put((table, None, None))
+        except Exception as e:
+            put((table, None, e))
+    
+    results = {table: {"success": True, "rows": 0, "error": None} for table in tables}
+    print(f"[INFO] Insertion de {len(tables)} table(s) avec {readers} lecteurs")
+    
+    with ThreadPoolExecutor(max_workers=readers) as pool:
+        for table in tables:
+            pool.submit(read, table)
+        
+        try:
+            write_batches(batches, results, tables, driver_sql, journal)
+        except BaseException:
+            # arrêter les lecteurs, puis libérer ceux qui attendent une place dans la file
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            while True:
+                try:
+                    batches.get_nowait()
+                except queue.Empty:
+                    break
+            raise
+    
+    return results
+
+def write_batches(batches, results, tables, driver_sql, journal: MigrationJournal):
+    """Écrivain du pipeline : vide la file et insère les lots jusqu'à la fin de toutes les étiquettes."""
+    remaining = len(tables)
+    written = 0
+    # étiquettes ayant des lignes dans la transaction en cours
+    pending = set()
+    
+    with driver_sql.connect() as conn:
+        while remaining:
+            table, row_datas, error = batches.get()
+            result = results[table]
+            
+            if row_datas is not None:
+                # après un échec, les lots restants de l'étiquette sont ignorés (la file doit rester vidée)
+                if result["success"]:
+                    try:
+                        insert_rows(conn, table, row_datas, tables[table])
+                    except Exception as e:
+                        # l'annulation emporte aussi les lots non validés des autres étiquettes
+                        conn.rollback()
+                        result.update(success=False, error=str(e))
+                        for other in pending - {table}:
+                            results[other].update(success=False, error=f"lots annulés par l'échec de {table}")
+                        pending.clear()
+                        continue
+                    result["rows"] += len(row_datas)
+                    pending.add(table)
+                    written += 1
+                    if written % PIPELINE_COMMIT_BATCHES == 0:
+                        conn.commit()
+                        pending.clear()
+                continue
+            
+            remaining -= 1
+            if error is not None:
+                result.update(success=False, error=str(error))
+            
+            if result["success"]:
+                # les lignes de l'étiquette sont validées avant de la marquer terminée
+                conn.commit()
+                pending.clear()
+                journal.mark_done(f"data:{table}")
+                print(f"[SUCCESS] {result['rows']} ligne(s) inserées dans la table : {table}")
+            else:
+                print(f"[ERROR] Échec de l'insertion dans la table {table} : {result['error']}")
 
 def label_to_row(data: dict):
     """Convertit les données d'un nœud Neo4j en ligne SQLite."""
     return {k: v for k, v in data.items() if k != "_types"}
 
-def check_relation_exists(session_neo, source_table, target_table, relation_name):
-    """Vérifie si une relation existe dans Neo4j."""
-    query = f"""
-    MATCH (s:{source_table})-[r:{relation_name}]->(t:{target_table})
-    RETURN count(r) as count
-    """
-    result = session_neo.run(query)
-    record = result.single()
-    return record and record['count'] > 0
+def clear_table(driver_sql, table_name):
+    """Vide une table SQLite avant d'y (ré)insérer les données."""
+    with driver_sql.connect() as conn:
+        conn.execute(text(f"DELETE FROM {table_name}"))
+        conn.commit()
+
+def check_relation_exists(catalog, source_table, target_table, relation_name):
+    """Vérifie dans le catalogue des relations si une relation existe dans Neo4j."""
+    entry = catalog.get((source_table, relation_name, target_table))
+    return entry is not None and entry["count"] > 0
 
-def insert_simple_relations(relations_dict, driver_sql, session_neo):
+def insert_simple_relations(relations_dict, driver_sql, session_neo, catalog, journal: MigrationJournal = None):
     """Crée les relations one-to-many dans la base SQLite."""
     for source_table, relations in relations_dict.items():
         for target_table, relation_info in relations.items():
             if relation_info["type"] == "inner":
+                step = f"fk:{source_table}->{target_table}:{relation_info['name']}"
+                if journal is not None and journal.is_done(step):
+                    print(f"[INFO] Relation déjà créée : {source_table} -----------> {target_table}")
+                    continue
+                
                 print(f"[INFO] Création de la relation : {source_table} -----------> {target_table}")
                 
                 # Vérifier si la relation existe dans Neo4j
-                if not check_relation_exists(session_neo, source_table, target_table, relation_info['name']):
+                if not check_relation_exists(catalog, source_table, target_table, relation_info['name']):
                     print(f"[WARNING] La relation {relation_info['name']} n'existe pas dans Neo4j")
                     continue
                 
                 try:
                     with driver_sql.connect() as conn:
-                        # Récupérer les données de la relation
+                        # Récupérer seulement les identifiants des deux extrémités
                         query = f"""
                         MATCH (s:{source_table})-[r:{relation_info['name']}]->(t:{target_table})
-                        RETURN s, t
+                        RETURN s.id AS source_id, t.id AS target_id
                         """
                         result = session_neo.run(query)
                         
-                        # Créer les clés étrangères
-                        for record in result:
-                            source_node = record['s']
-                            target_node = record['t']
-                            
-                            # Mettre à jour la table source avec la clé étrangère
-                            update_query = text(f"""
-                            UPDATE {source_table}
-                            SET {target_table}_id = :target_id
-                            WHERE id = :source_id
-                            """)
-                            conn.execute(update_query, {
-                                "target_id": target_node['id'],
-                                "source_id": source_node['id']
-                            })
+                        # Table temporaire recevant les paires (source, cible) d'un lot
+                        conn.execute(text("DROP TABLE IF EXISTS temp.fk_staging"))
+                        conn.execute(text("CREATE TEMP TABLE fk_staging (source_id PRIMARY KEY, target_id)"))
+                        
+                        insert_query = text("INSERT OR REPLACE INTO temp.fk_staging (source_id, target_id) VALUES (:source_id, :target_id)")
+                        update_query = text(f"""
+                        UPDATE {source_table}
+                        SET {target_table}_id = fk_staging.target_id
+                        FROM temp.fk_staging
+                        WHERE {source_table}.id = fk_staging.source_id
+                        """)
+                        
+                        # Créer les clés étrangères : une mise à jour ensembliste par lot
+                        count = 0
+                        while True:
+                            pairs = [record.data() for record in islice(result, SQL_BATCH_SIZE)]
+                            if not pairs:
+                                break
+                            conn.execute(insert_query, pairs)
+                            conn.execute(update_query)
+                            conn.execute(text("DELETE FROM temp.fk_staging"))
+                            count += len(pairs)
+                        
+                        conn.execute(text("DROP TABLE temp.fk_staging"))
+                        print(f"[INFO] {count} clé(s) étrangère(s) renseignée(s) dans {source_table}")
+                        
+                        conn.commit()
                         
+                        if journal is not None:
+                            journal.mark_done(step)
                         print(f"[SUCCESS] Relation créée : {source_table} -----------> {target_table}")
                 except Exception as e:
                     print(f"[ERREUR] Erreur lors de la creation de la relation {source_table} -> {target_table} : {e}")
 
-def insert_many_to_many_relations(relations_dict, driver_sql, session_neo):
+def insert_many_to_many_relations(relations_dict, driver_sql, session_neo, catalog, journal: MigrationJournal = None):
     """Crée les relations many-to-many dans la base SQLite."""
     processed_relations = set()  # Pour garder une trace des relations déjà traitées
     
@@ -156,199 +372,221 @@ def insert_many_to_many_relations(relations_dict, driver_sql, session_neo):
                     continue
                 
                 processed_relations.add(assoc_table)
+                
+                step = f"assoc:{assoc_table}"
+                if journal is not None and journal.is_done(step):
+                    print(f"[INFO] Table d'association déjà créée : {assoc_table}")
+                    continue
                 print(f"[INFO] Création de la relation many-to-many : {source_table} <----> {target_table} (table: {assoc_table})")
                 
                 # Vérifier si la relation existe dans Neo4j
-                if not check_relation_exists(session_neo, source_table, target_table, relation_info['name']):
+                if not check_relation_exists(catalog, source_table, target_table, relation_info['name']):
                     print(f"[WARNING] La relation {relation_info['name']} n'existe pas dans Neo4j")
                     continue
                 
                 try:
+                    key_columns = [f"{source_table}_id", f"{target_table}_id"]
+                    
+                    # Propriétés portées par les relations, connues avant de créer la table
+                    props_query = f"""
+                    MATCH (:{source_table})-[r:{relation_info['name']}]->(:{target_table})
+                    UNWIND keys(r) AS prop
+                    RETURN collect(DISTINCT prop) AS props
+                    """
+                    record = session_neo.run(props_query).single()
+                    prop_columns = [
+                        prop for prop in (record["props"] if record else [])
+                        if prop != 'id' and prop not in key_columns  # Éviter les conflits avec les IDs
+                    ]
+                    columns = key_columns + prop_columns
+                    
                     with driver_sql.connect() as conn:
-                        # Démarrer une transaction explicite
-                        trans = conn.begin()
-                        
-                        try:
-                            # Créer la table d'association avec toutes les contraintes dès le début
+                        with conn.begin():
+                            # Créer la table d'association avec toutes ses colonnes et contraintes dès le début
+                            extra_columns = "".join(f"{prop} TEXT,\n" for prop in prop_columns)
                             create_table_query = f"""
                             CREATE TABLE IF NOT EXISTS {assoc_table} (
                                 {source_table}_id INTEGER NOT NULL,
                                 {target_table}_id INTEGER NOT NULL,
+                                {extra_columns}
                                 PRIMARY KEY ({source_table}_id, {target_table}_id),
                                 FOREIGN KEY ({source_table}_id) REFERENCES {source_table}(id) ON DELETE CASCADE,
                                 FOREIGN KEY ({target_table}_id) REFERENCES {target_table}(id) ON DELETE CASCADE
                             )
                             """
                             conn.execute(text(create_table_query))
-                            
-                            # Récupérer les données de la relation avec leurs propriétés
-                            query = f"""
-                            MATCH (s:{source_table})-[r:{relation_info['name']}]->(t:{target_table})
-                            RETURN s, t, r
-                            """
-                            print(f"[DEBUG] Exécution de la requête Neo4j: {query}")
-                            result = session_neo.run(query)
-                            
-                            # Compter le nombre de relations trouvées
-                            count = 0
-                            for record in result:
-                                count += 1
-                                source_node = record['s']
-                                target_node = record['t']
-                                relation_props = record['r']
-                                
-                                print(f"[DEBUG] Relation trouvée: {source_table}(id={source_node['id']}) -> {target_table}(id={target_node['id']})")
-                                
-                                # Préparer les colonnes et valeurs pour l'insertion
-                                columns = [f"{source_table}_id", f"{target_table}_id"]
-                                values = [source_node['id'], target_node['id']]
-                                
-                                # Ajouter les propriétés de la relation si elles existent
-                                if relation_props:
-                                    for prop_name, prop_value in relation_props.items():
-                                        if prop_name not in ['id']:  # Éviter les conflits avec les IDs
-                                            # Ajouter la colonne si elle n'existe pas déjà
-                                            if prop_name not in columns:
-                                                alter_query = f"ALTER TABLE {assoc_table} ADD COLUMN {prop_name} TEXT"
-                                                conn.execute(text(alter_query))
-                                                columns.append(prop_name)
-                                            values.append(prop_value)
-                                
-                                # Construire et exécuter la requête d'insertion
-                                placeholders = ', '.join([':' + col for col in columns])
-                                insert_query = text(f"""
-                                INSERT INTO {assoc_table} ({', '.join(columns)})
-                                VALUES ({placeholders})
-                                """)
-                                
-                                # Créer le dictionnaire de paramètres
-                                params = dict(zip(columns, values))
-                                conn.execute(insert_query, params)
-                            
-                            # Valider la transaction
-                            trans.commit()
-                            print(f"[DEBUG] Nombre total de relations insérées: {count}")
-                            print(f"[SUCCESS] Relation many-to-many créée : {source_table} <----> {target_table} (table: {assoc_table})")
-                            
-                        except Exception as e:
-                            # En cas d'erreur, annuler la transaction
-                            trans.rollback()
-                            raise e
+                            # Retirer les lignes d'une exécution interrompue
+                            conn.execute(text(f"DELETE FROM {assoc_table}"))
+                        invalidate_metadata(driver_sql, assoc_table)
+                        
+                        # Table de transit sans clé ni index : l'index de la clé primaire
+                        # est construit une seule fois, à partir des lignes triées
+                        staging = f"{assoc_table}_staging"
+                        with conn.begin():
+                            conn.execute(text(f"DROP TABLE IF EXISTS temp.{staging}"))
+                            conn.execute(text(f"CREATE TEMP TABLE {staging} AS SELECT {', '.join(columns)} FROM {assoc_table} WHERE 0"))
+                        
+                        # Récupérer les identifiants et les propriétés de chaque relation
+                        query = f"""
+                        MATCH (s:{source_table})-[r:{relation_info['name']}]->(t:{target_table})
+                        RETURN s.id AS source_id, t.id AS target_id, properties(r) AS props
+                        """
+                        result = session_neo.run(query)
+                        
+                        placeholders = ', '.join([':' + col for col in columns])
+                        insert_query = text(f"""
+                        INSERT INTO temp.{staging} ({', '.join(columns)})
+                        VALUES ({placeholders})
+                        """)
+                        
+                        # Insérer les lignes par lots, une transaction par lot
+                        count = 0
+                        while True:
+                            records = list(islice(result, SQL_BATCH_SIZE))
+                            if not records:
+                                break
+                            rows = [
+                                {
+                                    key_columns[0]: record["source_id"],
+                                    key_columns[1]: record["target_id"],
+                                    **{prop: record["props"].get(prop) for prop in prop_columns}
+                                }
+                                for record in records
+                            ]
+                            with conn.begin():
+                                conn.execute(insert_query, rows)
+                            count += len(rows)
+                        
+                        with conn.begin():
+                            conn.execute(text(f"""
+                            INSERT INTO {assoc_table} ({', '.join(columns)})
+                            SELECT {', '.join(columns)} FROM temp.{staging}
+                            ORDER BY {', '.join(key_columns)}
+                            """))
+                            conn.execute(text(f"DROP TABLE temp.{staging}"))
+                        
+                        if journal is not None:
+                            journal.mark_done(step)
+                        print(f"[INFO] Nombre total de relations insérées: {count}")
+                        print(f"[SUCCESS] Relation many-to-many créée : {source_table} <----> {target_table} (table: {assoc_table})")
                             
                 except Exception as e:
                     print(f"[ERREUR] Erreur lors de la creation de la table {assoc_table} : {e}")
 
-def extract_neo4j_constraints(session, table_name):
-    """Extrait les contraintes d'une table Neo4j."""
+# Contraintes déjà extraites, par étiquette (réutilisées par create_table)
+constraints_cache = {}
+
+def extract_neo4j_constraints(session, table_name, scan_limit=CONSTRAINT_SCAN_LIMIT):
+    """
+    Extrait les contraintes d'une table Neo4j en un seul parcours de l'étiquette.
+
+    Pour chaque propriété, le parcours compte les valeurs présentes et les
+    valeurs distinctes ; le nombre total de nœuds vient du count store.
+    Avec `scan_limit`, le parcours s'arrête aux `scan_limit` premiers nœuds
+    lus (LIMIT) : c'est un parcours tronqué, pas un échantillon aléatoire, et
+    les propriétés uniques ou toujours présentes ne le sont que sur ces nœuds
+    ("truncated").
+
+    Ces statistiques décrivent les données, pas le schéma : les colonnes
+    NOT NULL viennent seulement des contraintes d'existence déclarées dans
+    Neo4j ("required").
+    """
+    if table_name in constraints_cache:
+        return constraints_cache[table_name]
     try:
         constraints = {
             "unique": [],
             "not_null": [],
-            "primary_key": []
+            "primary_key": [],
+            "required": [],
+            "truncated": False
         }
         
-        # Vérifier les propriétés uniques
-        query = f"""
-        MATCH (n:{table_name})
-        WITH n, keys(n) as props
-        UNWIND props as prop
-        WITH prop, count(distinct n[prop]) as unique_count, count(n) as total_count
-        WHERE unique_count = total_count AND unique_count > 0
-        RETURN collect(prop) as unique_props
-        """
-        result = session.run(query)
-        record = result.single()
-        if record and record['unique_props']:
-            constraints["unique"].extend(record['unique_props'])
+        total = session.run(f"MATCH (n:{table_name}) RETURN count(n) AS total").single()["total"]
         
-        # Vérifier les propriétés non nulles
+        truncated = bool(scan_limit) and total > scan_limit
+        
+        # Présence et unicité de chaque propriété, calculées ensemble.
+        # La clé vide, présente sur chaque nœud, compte les nœuds examinés.
         query = f"""
         MATCH (n:{table_name})
-        WITH n, keys(n) as props
-        UNWIND props as prop
-        WITH prop, count(n[prop]) as non_null_count, count(n) as total_count
-        WHERE non_null_count = total_count
-        RETURN collect(prop) as not_null_props
+        WITH n {"LIMIT $limit" if truncated else ""}
+        UNWIND keys(n) + [''] AS prop
+        WITH prop, count(*) AS non_null_count, count(DISTINCT n[prop]) AS unique_count
+        RETURN prop, non_null_count, unique_count
         """
-        result = session.run(query)
-        record = result.single()
-        if record and record['not_null_props']:
-            constraints["not_null"].extend(record['not_null_props'])
+        stats = {record["prop"]: record for record in session.run(query, limit=scan_limit)}
+        scanned = stats.pop("", {"non_null_count": 0})["non_null_count"]
+        
+        for prop, record in stats.items():
+            if record["non_null_count"] == scanned:
+                constraints["not_null"].append(prop)
+            if record["unique_count"] == record["non_null_count"] and record["unique_count"] > 0:
+                constraints["unique"].append(prop)
+        
+        if truncated:
+            constraints["truncated"] = True
+            print(f"[INFO] Contraintes de {table_name} estimées sur les {scanned}/{total} premiers nœuds (parcours tronqué)")
+        
+        constraints["required"] = get_required_properties(session, table_name)
         
         # L'ID est toujours une clé primaire
         constraints["primary_key"].append("id")
         
+        constraints_cache[table_name] = constraints
         return constraints
     except Exception as e:
         print(f"[ERROR] Erreur lors de l'extraction des contraintes pour {table_name}: {e}")
         return None
 
-def apply_constraints_to_sqlite(driver_sql, table_name, constraints):
-    """Applique les contraintes extraites à la table SQLite."""
+def get_required_properties(session, table_name):
+    """Propriétés rendues obligatoires par une contrainte Neo4j (existence ou clé de nœud)."""
+    query = """
+    SHOW CONSTRAINTS YIELD type, entityType, labelsOrTypes, properties
+    WHERE entityType = 'NODE' AND type IN ['NODE_PROPERTY_EXISTENCE', 'NODE_KEY'] AND $label IN labelsOrTypes
+    RETURN properties
+    """
     try:
-        with driver_sql.connect() as conn:
-            # Appliquer les contraintes NOT NULL
-            for column in constraints.get('not_null', []):
-                if column != 'id':  # L'ID est déjà NOT NULL
-                    try:
-                        query = text(f"""
-                        ALTER TABLE {table_name} 
-                        ADD CONSTRAINT nn_{table_name}_{column} 
-                        CHECK ({column} IS NOT NULL)
-                        """)
-                        conn.execute(query)
-                    except Exception as e:
-                        print(f"Impossible d'appliquer NOT NULL à {column}: {e}")
-            
-            # Ne pas créer d'indices uniques
-            # Les indices seront créés automatiquement par SQLite pour les clés primaires
-            
-            conn.commit()
-            print(f"Contraintes appliquées avec succès à la table {table_name}")
-        
+        return sorted({prop for record in session.run(query, label=table_name) for prop in record["properties"]})
     except Exception as e:
-        print(f"Erreur lors de l'application des contraintes pour {table_name}: {e}")
-        raise
+        # contraintes d'existence non disponibles (édition Community, ancienne version)
+        print(f"[WARNING] Contraintes d'existence illisibles pour {table_name}: {e}")
+        return []
+
+# Correspondance des types Neo4j vers les types SQLite
+SQLITE_TYPE_MAPPING = {
+    'String': 'VARCHAR',
+    'Integer': 'INTEGER',
+    'Date': 'DATE',
+    'DateTime': 'DATETIME',
+    'Float': 'REAL',
+    'Boolean': 'BOOLEAN',
+    'Long': 'INTEGER',
+    'Double': 'REAL',
+    'LocalDate': 'DATE',
+    'LocalDateTime': 'DATETIME',
+    'LocalTime': 'TIME',
+    'Duration': 'TEXT',
+    'Point': 'TEXT',
+    'Node': 'TEXT',
+    'Relationship': 'TEXT',
+    'Path': 'TEXT',
+    'List': 'TEXT',
+    'Map': 'TEXT'
+}
 
 def get_sqlite_type(neo4j_type):
     """Convertit un type Neo4j en type SQLite approprié."""
-    print(f"[DEBUG] Type Neo4j reçu: {neo4j_type} (type: {type(neo4j_type)})")
-    
     # Si le type est une liste, prendre le type des éléments
     if isinstance(neo4j_type, list) and len(neo4j_type) > 0:
         neo4j_type = neo4j_type[0]
-        print(f"[DEBUG] Type après extraction de la liste: {neo4j_type}")
     
     # Si le type est un dictionnaire, prendre le type de la valeur
     if isinstance(neo4j_type, dict):
         neo4j_type = list(neo4j_type.values())[0]
-        print(f"[DEBUG] Type après extraction du dictionnaire: {neo4j_type}")
     
     # Convertir le type en string et enlever les caractères spéciaux
     neo4j_type = str(neo4j_type).strip('[]{}')
-    print(f"[DEBUG] Type après nettoyage: {neo4j_type}")
-    
-    # Règles spéciales pour certains types
-    type_mapping = {
-        'String': 'VARCHAR',
-        'Integer': 'INTEGER',
-        'Date': 'DATE',
-        'DateTime': 'DATETIME',
-        'Float': 'REAL',
-        'Boolean': 'BOOLEAN',
-        'Long': 'INTEGER',
-        'Double': 'REAL',
-        'LocalDate': 'DATE',
-        'LocalDateTime': 'DATETIME',
-        'LocalTime': 'TIME',
-        'Duration': 'TEXT',
-        'Point': 'TEXT',
-        'Node': 'TEXT',
-        'Relationship': 'TEXT',
-        'Path': 'TEXT',
-        'List': 'TEXT',
-        'Map': 'TEXT'
-    }
     
     # Règles spéciales pour les colonnes spécifiques
     if neo4j_type == 'id':
@@ -361,9 +599,7 @@ def get_sqlite_type(neo4j_type):
         return 'INTEGER'
     
     # Utiliser le mapping pour les autres types
-    sql_type = type_mapping.get(neo4j_type, 'TEXT')
-    print(f"[DEBUG] Type SQLite final: {sql_type}")
-    return sql_type
+    return SQLITE_TYPE_MAPPING.get(neo4j_type, 'TEXT')
 
 def drop_existing_indices(driver_sql, table_name):
     """Supprime tous les indices existants pour une table donnée."""
@@ -402,6 +638,10 @@ def create_table(driver_sql, table_name, properties):
 
             print(f"[DEBUG] Création de la table {table_name} avec les propriétés: {properties}")
             
+            # Propriétés obligatoires d'après les contraintes déclarées dans Neo4j (pas d'après les données)
+            inferred = constraints_cache.get(table_name)
+            not_null = inferred["required"] if inferred else []
+            
             # Construire la requête de création de table
             columns = []
             for prop_name, prop_type in properties.items():
@@ -412,7 +652,7 @@ def create_table(driver_sql, table_name, properties):
                 constraints = []
                 if prop_name == 'id':
                     constraints.append('PRIMARY KEY')
-                if prop_name in ['id', 'nom', 'ville', 'date_embauche']:  # Colonnes qui doivent être NOT NULL
+                if prop_name in ['id', 'nom', 'ville', 'date_embauche'] or prop_name in not_null:  # Colonnes qui doivent être NOT NULL
                     constraints.append('NOT NULL')
                 
                 # Construire la définition de la colonne
@@ -435,6 +675,7 @@ def create_table(driver_sql, table_name, properties):
             # Les indices seront créés automatiquement par SQLite pour les clés primaires
             
             conn.commit()
+            invalidate_metadata(driver_sql, table_name)
             print(f"Table {table_name} créée avec succès.")
 
     except Exception as e:
@@ -470,5 +711,6 @@ def drop_existing_tables(driver_sql, table_names):
                     print(f"[DEBUG] Table {table} supprimée")
             
             conn.commit()
+            invalidate_metadata(driver_sql)
     except Exception as e:
         print(f"[ERROR] Erreur lors de la suppression des tables: {e}")
\ No newline at end of file
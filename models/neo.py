@@ -1,17 +1,26 @@
 from helper.relations_extractor import db_relations,summary_relation
-from helper.neo4j_db import add_link, load_neo, erase_neo_db, insert_noeud_from_table
-from helper.db import connector, get_all, get_all_relations,get_single_table_relations
+from helper.neo4j_db import (insert_links, load_neo, erase_neo_db, insert_noeud_from_table, create_key_indexes,
+                             delete_label, delete_noeuds_after)
+from helper.db import connector, get_batches, get_all_relations,get_single_table_relations, get_primary_key
+from helper.utils import dataframe_to_records
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from helper.sync_state import open_sync_state, reset_sync_state
+from helper.journal import MigrationJournal
+from enviroment import NEO4J_WORKERS, SYNC_STATE_PATH, JOURNAL_PATH
+import time
 
 """
     Transform database from sql to neo4j.
 
     Args:
         uri (str): the database uri.
+        workers (int): number of tables migrated in parallel (1 = sequential).
+        resume (bool): continue an interrupted migration from its journal instead of starting over.
 
     Returns:
         bool: true when is correct an false otherwise.
 """
-def neo(uri: str):
+def neo(uri: str, workers: int = NEO4J_WORKERS, resume: bool = False):
     # construire la matrice des relation
     all_relations = db_relations(uri)
 
@@ -23,8 +32,19 @@ def neo(uri: str):
     driver_sql,metadata = connector(uri)
     # connexion a la bd neo4j
     driver_neo = load_neo()
-    # formatage de la bd no4j
-    erase_neo_db(driver_neo)
+    # journal de progression (tables et liens termines, dernier lot valide)
+    journal = MigrationJournal(JOURNAL_PATH, f"neo:{uri}")
+
+    if resume:
+        print(f"[INFO] Reprise de la migration depuis le journal {JOURNAL_PATH}")
+    else:
+        # formatage de la bd no4j
+        erase_neo_db(driver_neo)
+        journal.reset()
+        # la base est reconstruite : les empreintes d'une synchronisation incrementale precedente ne sont plus valables
+        state = open_sync_state(SYNC_STATE_PATH)
+        reset_sync_state(state, uri)
+        state.close()
     
     # recuperer les nom des tables non [associative]
     tables = all_relations.columns.to_list()
@@ -36,27 +56,178 @@ def neo(uri: str):
     
     with driver_neo.session() as session:
         
-        # creer des noeuds pour toute les tables qui ne sont pas [associative]
-        for table_name, table_struct in tables_for_noeud.items():
-            res = insert_noeud_from_table(table_name, table_struct, session, driver_sql)
-            if res:
-              print(f"{table_struct} has ended the transformation successfully...............")
-            else:
-                print(f"Something went wrong for {table_name} please try again.....")
+        if workers > 1:
+            # creer les noeuds en parallele, les liens ne sont crees qu'une fois tous les noeuds inseres
+            insert_noeuds_parallel(tables_for_noeud, driver_sql, driver_neo, workers, journal)
+        else:
+            # creer des noeuds pour toute les tables qui ne sont pas [associative]
+            for table_name, table_struct in tables_for_noeud.items():
+                res = migrate_noeuds(table_name, table_struct, session, driver_sql, journal)
+                if res:
+                  print(f"{table_struct} has ended the transformation successfully...............")
+                else:
+                    print(f"Something went wrong for {table_name} please try again.....")
+        
+        # index et contraintes sur les clés avant la création des liens
+        print(f"[INFO] Création des index sur les clés")
+        create_key_indexes(session, metadata, list(tables_for_noeud.keys()))
                 
         print(f"[INFO] Début de la création des liens")
         
         # construction de liens direct entrte les noeuds (clé étrangère simple)
-        insert_simple_relation(table_summary_relation, driver_sql, session)
+        insert_simple_relation(table_summary_relation, driver_sql, session, journal)
         # Creer des relations entre les noeuds
-        insert_many_to_many_relation(table_summary_relation, driver_sql, session)
+        insert_many_to_many_relation(table_summary_relation, driver_sql, session, journal)
         
         print(f"[INFO] Fin de la création des liens")
+
+    journal.close()
         
                 
           
 
-def insert_simple_relation(table_summary_relation, driver, session_neo):
+def migrate_noeuds(table_name, table_struct, session_neo, driver_sql, journal: MigrationJournal) -> bool:
+    """
+    Crée les noeuds d'une table en tenant le journal de reprise à jour.
+
+    Une table terminée est ignorée. Une table interrompue reprend après la clé
+    du dernier lot validé, les noeuds écrits au-delà étant d'abord supprimés ;
+    sans point de reprise (ou sans clé primaire), la table est rechargée.
+
+    Returns:
+        bool: True si l'import a réussi, False sinon.
+    """
+    step = f"nodes:{table_name}"
+    if journal.is_done(step):
+        print(f"[INFO] Noeuds déjà créés pour {table_name}, table ignorée.")
+        return True
+
+    pk_columns = [col.name for col in table_struct.primary_key.columns]
+    after = journal.get_checkpoint(step)
+
+    if after is not None and pk_columns:
+        session_neo.execute_write(delete_noeuds_after, table_name, pk_columns, after)
+    else:
+        session_neo.execute_write(delete_label, table_name)
+        after = None
+
+    success = insert_noeud_from_table(
+        table_name, table_struct, session_neo, driver_sql,
+        after=after, on_batch=lambda key: journal.save_checkpoint(step, key)
+    )
+    if success:
+        journal.mark_done(step)
+    return success
+
+def run_link_step(journal: MigrationJournal, step: str, link, *args):
+    """Crée un type de lien en reprenant après le dernier lot validé ; les liens étant créés par MERGE, rejouer un lot ne crée pas de doublon."""
+    if journal is None:
+        link(*args)
+        return
+
+    if journal.is_done(step):
+        print(f"[INFO] Liens déjà créés ({step}), étape ignorée.")
+        return
+
+    link(*args, after=journal.get_checkpoint(step), on_batch=lambda key: journal.save_checkpoint(step, key))
+    journal.mark_done(step)
+
+def insert_noeuds_parallel(tables_for_noeud, driver_sql, driver_neo, workers: int, journal: MigrationJournal):
+    """
+    Crée les noeuds de plusieurs tables en parallèle.
+
+    Chaque table est traitée par un worker qui ouvre sa propre session Neo4j
+    et sa propre connexion SQL. La fonction rend la main quand toutes les
+    tables sont terminées.
+
+    Args:
+        tables_for_noeud (dict): tables à transformer en noeuds {nom: Table}.
+        driver_sql (Engine): moteur de la base SQL source.
+        driver_neo (Driver): driver Neo4j.
+        workers (int): nombre de workers.
+        journal (MigrationJournal): journal de reprise partagé par les workers.
+
+    Returns:
+        dict: pour chaque table {"success": bool, "elapsed": float, "error": str | None}.
+    """
+    def migrate(table_name, table_struct):
+        start = time.perf_counter()
+        with driver_sql.connect() as conn, driver_neo.session() as session:
+            success = migrate_noeuds(table_name, table_struct, session, conn, journal)
+        return success, time.perf_counter() - start
+
+    results = {}
+    print(f"[INFO] Migration de {len(tables_for_noeud)} table(s) avec {workers} workers")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(migrate, table_name, table_struct): table_name
+            for table_name, table_struct in tables_for_noeud.items()
+        }
+        for future in as_completed(futures):
+            table_name = futures[future]
+            try:
+                success, elapsed = future.result()
+                results[table_name] = {"success": success, "elapsed": elapsed, "error": None}
+            except Exception as e:
+                results[table_name] = {"success": False, "elapsed": None, "error": str(e)}
+
+            done = len(results)
+            status = "OK" if results[table_name]["success"] else "ÉCHEC"
+            print(f"[INFO] [{done}/{len(futures)}] {table_name} : {status}")
+
+    failed = {name: res for name, res in results.items() if not res["success"]}
+    for table_name, res in failed.items():
+        print(f"Something went wrong for {table_name} please try again..... {res['error'] or ''}")
+    print(f"[INFO] Noeuds créés : {len(results) - len(failed)} table(s) réussie(s), {len(failed)} en échec")
+    return results
+
+def simple_link_rows(records: list[dict], key_map: dict) -> list[dict]:
+    """Construit les lignes (clé source, clé cible) d'un lien par clé étrangère simple."""
+    rows = []
+    seen = set()
+    for row in records:
+        # Extraire les clés étrangères de la source
+        foreign_keys = {k: row[k] for k in key_map.keys()}
+        values = tuple(foreign_keys.values())
+        # Une seule paire (clé source, clé cible) par valeur de clé étrangère
+        if None in values or values in seen:
+            continue
+        seen.add(values)
+        rows.append({
+            "source": foreign_keys,
+            # Adapter les noms de colonnes à ceux de la cible
+            "target": {key_map[k]: v for k, v in foreign_keys.items()},
+        })
+    return rows
+
+def join_link_rows(records: list[dict], source_key: dict, target_key: dict, with_properties: bool = True) -> list[dict]:
+    """Construit les lignes d'un lien à partir des lignes d'une table d'association."""
+    rows = []
+    for row in records:
+        link_row = {
+            "source": {source_key["to"]: row[source_key["from"]]},
+            "target": {target_key["to"]: row[target_key["from"]]},
+        }
+        if with_properties:
+            link_row["props"] = row
+        rows.append(link_row)
+    return rows
+
+def get_join_keys(driver, relation_info, source_table, target_table):
+    """Retourne les clés (from -> to) de la table d'association vers la source et la cible, ou None."""
+    rel_data = get_single_table_relations(driver, relation_info["table"])
+    key_map = {
+        row['table']: {"to": row['to'], "from": row['from']}
+        for _, row in rel_data.iterrows()
+    }
+
+    if source_table not in key_map or target_table not in key_map:
+        print(f"[WARNING] Clés introuvables dans {relation_info['table']} pour {source_table} -> {target_table}")
+        return None
+    return key_map[source_table], key_map[target_table]
+
+def insert_simple_relation(table_summary_relation, driver, session_neo, journal: MigrationJournal = None):
     for source_table, relations in table_summary_relation.items():
         # Filtrer les relations INNER uniquement
         inner_relations = {
@@ -65,35 +236,35 @@ def insert_simple_relation(table_summary_relation, driver, session_neo):
         }
 
         for target_table, relation_info in inner_relations.items():
-            # Récupérer les métadonnées et la relation FK → PK
-            rel_data = get_all_relations(driver, source_table, target_table)
-            key_map = {row['from']: row['to'] for _, row in rel_data.iterrows()}
-
-            print(f"[INFO] start creating link : {source_table} -----------> {target_table}")
-
-            # Récupérer les lignes de la table source
-            source_rows = get_all(driver, source_table)
-
-            for _, row in source_rows.iterrows():
-                # Extraire les clés étrangères de la source
-                foreign_keys = {k: row[k] for k in key_map.keys()}
-                # Adapter les noms de colonnes à ceux de la cible
-                target_keys = {key_map[k]: v for k, v in foreign_keys.items()}
-
-                # Création du lien dans Neo4j
-                add_link(
-                    session_neo,
-                    source_table,
-                    foreign_keys,
-                    target_table,
-                    target_keys,
-                    relation_info["name"]
-                )
-
-            print(f"[SUCCESS] link created : {source_table} -----------> {target_table}")
+            step = f"links:{source_table}->{target_table}:{relation_info['name']}"
+            run_link_step(journal, step, link_simple_relation, source_table, target_table, relation_info, driver, session_neo)
+
+def link_simple_relation(source_table, target_table, relation_info, driver, session_neo, after: tuple = None, on_batch=None):
+    # Récupérer les métadonnées et la relation FK → PK
+    rel_data = get_all_relations(driver, source_table, target_table)
+    key_map = {row['from']: row['to'] for _, row in rel_data.iterrows()}
+
+    print(f"[INFO] start creating link : {source_table} -----------> {target_table}")
+
+    pk_columns = get_primary_key(driver, source_table)
+
+    # Parcourir les lignes de la table source par lots
+    count = 0
+    start = time.perf_counter()
+    for source_rows in get_batches(driver, source_table, after=after):
+        rows = simple_link_rows(dataframe_to_records(source_rows[list(key_map.keys())]), key_map)
+
+        # Création des liens dans Neo4j par lots
+        count += insert_links(session_neo, source_table, target_table, relation_info["name"], rows)
+
+        if on_batch is not None and pk_columns:
+            on_batch(tuple(source_rows[col].iloc[-1:].tolist()[0] for col in pk_columns))
+    elapsed = time.perf_counter() - start
+
+    print(f"[SUCCESS] link created : {source_table} -----------> {target_table} ({count} pairs in {elapsed:.2f}s)")
          
 
-def insert_many_to_many_relation(table_summary_relation, driver, session_neo):
+def insert_many_to_many_relation(table_summary_relation, driver, session_neo, journal: MigrationJournal = None):
     for source_table, relations in table_summary_relation.items():
         # Filtrer les relations INNER uniquement
         inner_relations = {
@@ -102,35 +273,32 @@ def insert_many_to_many_relation(table_summary_relation, driver, session_neo):
         }  
         
         for target_table, relation_info in inner_relations.items() :
-            # Récupérer les métadonnées et la relation FK → PK
-            rel_data = get_single_table_relations(driver, relation_info["table"])
-            key_map = {
-                row['table']: {"to": row['to'], "from": row['from']}
-                for _, row in rel_data.iterrows()
-            }
-            
-            print(f"[INFO] Début de la creation du lien : {source_table} -----------> {target_table}")
-            
-            # Récupérer les lignes de la table source
-            source_rows = get_all(driver, relation_info["table"])
-            for _, row in source_rows.iterrows():
-                # Extraire les clés étrangères de la source
-                foreign_keys = {table_key["to"]: row[table_key["from"]] for r_table, table_key in key_map.items() if r_table == source_table}
-                target_keys = {table_key["to"]: row[table_key["from"]] for r_table, table_key in key_map.items() if r_table == target_table}
-                
+            step = f"links:{source_table}->{target_table}:{relation_info['name']}"
+            run_link_step(journal, step, link_many_to_many_relation, source_table, target_table, relation_info, driver, session_neo)
 
-                # Création du lien dans Neo4j
-                
-                add_link(
-                    session_neo,
-                    source_table,
-                    foreign_keys,
-                    target_table,
-                    target_keys,
-                    relation_info["name"],
-                    row
-                )
-                
+def link_many_to_many_relation(source_table, target_table, relation_info, driver, session_neo, after: tuple = None, on_batch=None):
+    # Récupérer les métadonnées et la relation FK → PK
+    join_keys = get_join_keys(driver, relation_info, source_table, target_table)
+    if join_keys is None:
+        return
+    source_key, target_key = join_keys
+    
+    print(f"[INFO] Début de la creation du lien : {source_table} -----------> {target_table}")
+    
+    pk_columns = get_primary_key(driver, relation_info["table"])
+
+    # Parcourir les lignes de la table d'association par lots
+    count = 0
+    start = time.perf_counter()
+    for source_rows in get_batches(driver, relation_info["table"], after=after):
+        records = dataframe_to_records(source_rows)
+        rows = join_link_rows(records, source_key, target_key)
+
+        # Création des liens dans Neo4j par lots
+        count += insert_links(session_neo, source_table, target_table, relation_info["name"], rows)
+
+        if on_batch is not None and pk_columns and records:
+            on_batch(tuple(records[-1][col] for col in pk_columns))
+    elapsed = time.perf_counter() - start
 
-            print(f"[SUCCESS] Lien crée : {source_table} -----------> {target_table}")
-                
\ No newline at end of file
+    print(f"[SUCCESS] Lien crée : {source_table} -----------> {target_table} ({count} lignes en {elapsed:.2f}s)")
@@ -0,0 +1,261 @@
+from helper.relations_extractor import db_relations,summary_relation
+from helper.db import connector, get_batches, get_all_relations,get_single_table_relations
+from helper.neo4j_db import SCHEMA_LABEL
+import pandas as pd
+import os
+
+"""
+    Export a sql database to neo4j-admin import CSV files (offline bulk import).
+
+    Args:
+        uri (str): the database uri.
+        output_dir (str): folder receiving the node and relationship files.
+
+    Returns:
+        dict: the generated files {"nodes": [...], "relationships": [...]}.
+"""
+def neo_import(uri: str, output_dir: str):
+    # construire la matrice des relation
+    all_relations = db_relations(uri)
+
+    # dataframe contenant pour chaque table ses relations
+    table_summary_relation = summary_relation(all_relations)
+
+    # connextion a notre bd sql
+    driver_sql,metadata = connector(uri)
+
+    # recuperer les nom des tables non [associative]
+    tables = all_relations.columns.to_list()
+    tables_for_noeud = {key: value for key, value in metadata.tables.items() if key in tables}
+
+    os.makedirs(output_dir, exist_ok=True)
+    files = {"nodes": [], "relationships": []}
+
+    # colonne servant d'identifiant (ID space) pour chaque table
+    id_columns = {}
+
+    # types des colonnes : un noeud de métadonnées par étiquette
+    path = os.path.join(output_dir, f"{SCHEMA_LABEL}_nodes.csv")
+    export_schema(tables_for_noeud, path)
+    files["nodes"].append((SCHEMA_LABEL, path))
+
+    # un fichier de noeuds par table non [associative]
+    for table_name, table_struct in tables_for_noeud.items():
+        pk_columns = [col.name for col in table_struct.primary_key.columns]
+        id_columns[table_name] = pk_columns[0] if len(pk_columns) == 1 else None
+
+        path = os.path.join(output_dir, f"{table_name}_nodes.csv")
+        count = export_noeuds(table_name, table_struct, id_columns[table_name], driver_sql, path)
+        files["nodes"].append((table_name, path))
+        print(f"[SUCCESS] {count} noeud(s) exporté(s) : {path}")
+
+    # un fichier de relations par lien (clé étrangère simple ou table d'association)
+    for source_table, relations in table_summary_relation.items():
+        for target_table, relation_info in relations.items():
+            path = os.path.join(output_dir, f"{source_table}_{relation_info['name']}.csv")
+
+            if relation_info["type"] == "inner":
+                count = export_simple_relation(source_table, target_table, relation_info, id_columns, metadata, driver_sql, path)
+            elif relation_info["type"] == "join":
+                count = export_many_to_many_relation(source_table, target_table, relation_info, id_columns, metadata, driver_sql, path)
+            else:
+                continue
+
+            if count is not None:
+                files["relationships"].append((relation_info["name"], path))
+                print(f"[SUCCESS] {count} lien(s) exporté(s) : {path}")
+
+    print("[INFO] Commande d'import :")
+    print(import_command(files))
+    return files
+
+
+def import_command(files: dict) -> str:
+    """Construit la commande `neo4j-admin database import full` pour les fichiers générés."""
+    # l'étiquette et le type sont portés par les colonnes :LABEL et :TYPE des fichiers
+    args = [f"--nodes={path}" for _, path in files["nodes"]]
+    args += [f"--relationships={path}" for _, path in files["relationships"]]
+    return "neo4j-admin database import full " + " ".join(args) + " neo4j"
+
+
+def get_import_type(sql_type: str) -> str:
+    """Convertit un type SQL en type de colonne neo4j-admin import."""
+    sql_type = sql_type.upper()
+
+    if "INT" in sql_type:
+        return "long"
+    if "FLOAT" in sql_type or "REAL" in sql_type or "DOUBLE" in sql_type or "DECIMAL" in sql_type or "NUMERIC" in sql_type:
+        return "double"
+    if "BOOL" in sql_type:
+        return "boolean"
+    # Les dates sont lues comme des chaînes depuis SQLite, comme dans models/neo
+    return "string"
+
+
+def format_boolean(values: pd.Series) -> pd.Series:
+    """
+    Écrit un booléen SQLite (0/1, ou texte) sous la forme "true"/"false" :
+    neo4j-admin import ne lit comme vrai que la chaîne "true".
+    """
+    numeric = pd.to_numeric(values, errors="coerce")
+    text = values.astype(str).str.strip().str.lower()
+    truth = (numeric.notna() & numeric.ne(0)) | text.eq("true")
+    return truth.map({True: "true", False: "false"}).where(values.notna())
+
+
+def format_columns(datas: pd.DataFrame, types: dict) -> pd.DataFrame:
+    """
+    Remet les colonnes entières au format entier (pandas les lit en float dès qu'il y a des NULL)
+    et les colonnes booléennes au format attendu par neo4j-admin import.
+    """
+    for column, import_type in types.items():
+        if column not in datas.columns:
+            continue
+        if import_type == "long":
+            try:
+                datas[column] = datas[column].astype("Int64")
+            except (TypeError, ValueError):
+                pass
+        elif import_type == "boolean":
+            datas[column] = format_boolean(datas[column])
+    return datas
+
+
+def write_batch(datas: pd.DataFrame, path: str, header: list[str], first: bool) -> None:
+    """Ajoute un lot au fichier CSV, l'en-tête étant écrit avec le premier lot."""
+    datas.to_csv(path, mode="w" if first else "a", header=header if first else False, index=False)
+
+
+def export_schema(tables_for_noeud: dict, path: str) -> None:
+    """Écrit le fichier des noeuds de métadonnées portant les types des colonnes de chaque étiquette."""
+    header = [f":ID({SCHEMA_LABEL})", "label:string", "_types:string[]", ":LABEL"]
+    rows = [
+        [table_name, table_name, ";".join(f"{col.name}:{col.type}" for col in table_struct.columns), SCHEMA_LABEL]
+        for table_name, table_struct in tables_for_noeud.items()
+    ]
+    pd.DataFrame(rows, columns=header).to_csv(path, index=False)
+
+
+def export_noeuds(table_name: str, table_struct, id_column: str, driver_sql, path: str) -> int:
+    """
+    Écrit le fichier de noeuds d'une table au format neo4j-admin import, par lots.
+
+    Args:
+        table_name (str): Nom de la table SQL (et étiquette des noeuds).
+        table_struct (Table): Structure SQLAlchemy de la table.
+        id_column (str): Colonne servant d'identifiant (recopiée dans la colonne :ID), ou None pour un identifiant généré.
+        driver_sql (Engine): Moteur de base de données SQL.
+        path (str): Fichier de sortie.
+
+    Returns:
+        int: nombre de noeuds exportés.
+    """
+    types = {col.name: get_import_type(str(col.type)) for col in table_struct.columns}
+    columns = list(types.keys())
+
+    # L'identifiant :ID n'est pas stocké comme propriété (neo4j-admin le lirait en
+    # chaîne) : la clé reste une propriété typée, comme avec l'import par Bolt
+    header = [f":ID({table_name})"]
+    header += [f"{col}:{import_type}" for col, import_type in types.items()]
+    header += [":LABEL"]
+
+    count = 0
+    first = True
+    for datas in get_batches(driver_sql, table_name):
+        datas = format_columns(datas[columns].copy(), types)
+        if id_column is None:
+            # identifiant généré
+            datas.insert(0, "_id", range(count, count + len(datas)))
+        else:
+            datas.insert(0, "_id", datas[id_column])
+        datas[":LABEL"] = table_name
+
+        write_batch(datas, path, header, first)
+        first = False
+        count += len(datas)
+
+    if first:
+        # table vide : fichier avec l'en-tête seul
+        pd.DataFrame(columns=header).to_csv(path, index=False)
+    return count
+
+
+def export_simple_relation(source_table, target_table, relation_info, id_columns, metadata, driver_sql, path):
+    """
+    Écrit le fichier de relations d'une clé étrangère simple : une relation par ligne source.
+
+    Returns:
+        int | None: nombre de relations exportées, None si la clé ne peut pas être exprimée en ID.
+    """
+    rel_data = get_all_relations(driver_sql, source_table, target_table)
+    key_map = {row['from']: row['to'] for _, row in rel_data.iterrows()}
+
+    source_id = id_columns.get(source_table)
+    target_id = id_columns.get(target_table)
+    if len(key_map) != 1 or source_id is None or list(key_map.values())[0] != target_id:
+        print(f"[WARNING] Lien {source_table} -> {target_table} ignoré : la clé ne correspond pas à l'identifiant de {target_table}")
+        return None
+
+    fk_column = list(key_map.keys())[0]
+    header = [f":START_ID({source_table})", f":END_ID({target_table})", ":TYPE"]
+
+    count = 0
+    first = True
+    for source_rows in get_batches(driver_sql, source_table):
+        datas = source_rows[[source_id, fk_column]].dropna()
+        datas = format_columns(datas.copy(), {source_id: "long", fk_column: "long"})
+        datas[":TYPE"] = relation_info["name"]
+
+        write_batch(datas, path, header, first)
+        first = False
+        count += len(datas)
+
+    if first:
+        pd.DataFrame(columns=header).to_csv(path, index=False)
+    return count
+
+
+def export_many_to_many_relation(source_table, target_table, relation_info, id_columns, metadata, driver_sql, path):
+    """
+    Écrit le fichier de relations d'une table d'association : une relation par ligne,
+    avec les colonnes de la ligne comme propriétés.
+
+    Returns:
+        int | None: nombre de relations exportées, None si les clés ne peuvent pas être exprimées en ID.
+    """
+    assoc_table = relation_info["table"]
+    rel_data = get_single_table_relations(driver_sql, assoc_table)
+    key_map = {
+        row['table']: {"to": row['to'], "from": row['from']}
+        for _, row in rel_data.iterrows()
+    }
+
+    if (source_table not in key_map or target_table not in key_map
+            or key_map[source_table]["to"] != id_columns.get(source_table)
+            or key_map[target_table]["to"] != id_columns.get(target_table)):
+        print(f"[WARNING] Lien {source_table} -> {target_table} ignoré : les clés de {assoc_table} ne correspondent pas aux identifiants")
+        return None
+
+    source_from = key_map[source_table]["from"]
+    target_from = key_map[target_table]["from"]
+
+    types = {col.name: get_import_type(str(col.type)) for col in metadata.tables[assoc_table].columns}
+    header = [f":START_ID({source_table})", f":END_ID({target_table})", ":TYPE"]
+    header += [f"{col}:{import_type}" for col, import_type in types.items()]
+
+    count = 0
+    first = True
+    for source_rows in get_batches(driver_sql, assoc_table):
+        datas = format_columns(source_rows[list(types.keys())].copy(), types)
+        datas.insert(0, "_start", datas[source_from])
+        datas.insert(1, "_end", datas[target_from])
+        datas.insert(2, "_type", relation_info["name"])
+        datas = datas.dropna(subset=["_start", "_end"])
+
+        write_batch(datas, path, header, first)
+        first = False
+        count += len(datas)
+
+    if first:
+        pd.DataFrame(columns=header).to_csv(path, index=False)
+    return count
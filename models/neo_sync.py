@@ -0,0 +1,261 @@
+from helper.relations_extractor import db_relations,summary_relation
+from helper.neo4j_db import (load_neo, erase_neo_db, insert_links, insert_noeud_from_table, create_key_indexes,
+                             store_label_types, write_by_batch, upsert_noeuds, delete_noeuds, delete_links_from,
+                             delete_links, delete_all_links, delete_label)
+from helper.db import connector, get_batches, get_all_relations
+from helper.utils import dataframe_to_records
+from helper.sync_state import (open_sync_state, has_sync_state, has_fingerprints, load_fingerprints, save_fingerprints,
+                               clear_next_fingerprints, stage_fingerprints, iter_deleted_keys, row_key, row_hash, key_values)
+from models.neo import simple_link_rows, join_link_rows, get_join_keys, link_simple_relation, link_many_to_many_relation
+from enviroment import SYNC_STATE_PATH, NEO4J_BATCH_SIZE
+
+"""
+    Incremental sync from sql to neo4j.
+
+    Each source row is fingerprinted (primary key + content hash). Only the
+    rows inserted, updated or deleted since the last sync are sent to Neo4j,
+    together with the links of those rows. Tables are read batch by batch:
+    the new fingerprints are written to the state file as they are computed
+    and the changed rows are re-read per batch when their links are synced.
+
+    Args:
+        uri (str): the database uri.
+        state_path (str): local file keeping the fingerprints between runs.
+
+    Returns:
+        bool: true when is correct an false otherwise.
+"""
+def neo_sync(uri: str, state_path: str = SYNC_STATE_PATH):
+    # construire la matrice des relation
+    all_relations = db_relations(uri)
+
+    # dataframe contenant pour chaque table ses relations
+    table_summary_relation = summary_relation(all_relations)
+
+    # connextion a notre bd sql
+    driver_sql,metadata = connector(uri)
+    # connexion a la bd neo4j
+    driver_neo = load_neo()
+
+    state = open_sync_state(state_path)
+
+    # premiere synchronisation : on repart d'une base neo4j vide
+    if not has_sync_state(state, uri):
+        print("[INFO] Aucune synchronisation précédente : reconstruction complète")
+        erase_neo_db(driver_neo)
+
+    # recuperer les nom des tables non [associative]
+    tables = all_relations.columns.to_list()
+    tables_for_noeud = {key: value for key, value in metadata.tables.items() if key in tables}
+
+    # tables d'association utilisées par les liens many-to-many
+    join_tables = {
+        details["table"]
+        for relations in table_summary_relation.values()
+        for details in relations.values()
+        if details.get("type") == "join"
+    }
+
+    changes = {}
+
+    with driver_neo.session() as session:
+        # les MERGE sur les clés ont besoin des index des la premiere ligne
+        create_key_indexes(session, metadata, list(tables_for_noeud.keys()))
+
+        print("[INFO] Début de la synchronisation des noeuds")
+        for table_name, table_struct in tables_for_noeud.items():
+            changes[table_name] = sync_noeuds(uri, state, table_name, table_struct, driver_sql, session)
+
+        # les tables d'association ne sont pas des noeuds, seules leurs lignes modifiées sont utiles aux liens
+        for table_name in join_tables:
+            changes[table_name] = diff_table(uri, state, table_name, metadata.tables[table_name], driver_sql)
+
+        print("[INFO] Début de la synchronisation des liens")
+        sync_simple_relation(table_summary_relation, changes, uri, state, driver_sql, session)
+        sync_many_to_many_relation(table_summary_relation, changes, uri, state, driver_sql, session)
+
+    # les empreintes ne remplacent les précédentes qu'une fois la synchronisation terminée :
+    # jusque-là, les lignes modifiées se retrouvent en comparant aux anciennes
+    for table_name, change in changes.items():
+        if change["keys"]:
+            save_fingerprints(state, uri, table_name)
+    state.close()
+
+    print("[INFO] Fin de la synchronisation")
+    return True
+
+
+def changed_batches(uri, state, table_name, pk_columns, driver_sql, stage=False):
+    """
+    Parcourt une table par lots et rend, pour chaque lot, les lignes insérées ou
+    modifiées depuis la dernière synchronisation.
+
+    Args:
+        uri (str): base source (clé des empreintes).
+        state (Connection): fichier d'état ouvert.
+        table_name (str): nom de la table.
+        pk_columns (list[str]): colonnes de la clé primaire.
+        driver_sql (Engine): moteur de la base SQL.
+        stage (bool): écrit aussi les empreintes du lot dans le fichier d'état.
+
+    Returns:
+        Generator[list[dict]]: les lignes changées de chaque lot.
+    """
+    for batch in get_batches(driver_sql, table_name):
+        rows = dataframe_to_records(batch)
+        keys = [row_key(row, pk_columns) for row in rows]
+        hashes = [row_hash(row) for row in rows]
+
+        previous = load_fingerprints(state, uri, table_name, keys)
+        if stage:
+            stage_fingerprints(state, uri, table_name, dict(zip(keys, hashes)))
+        yield [row for row, key, fingerprint in zip(rows, keys, hashes) if previous.get(key) != fingerprint]
+
+
+def deleted_batches(uri, state, table_name, pk_columns):
+    """Rend par lots les clés des lignes supprimées depuis la dernière synchronisation (après `diff_table`)."""
+    for keys in iter_deleted_keys(state, uri, table_name, NEO4J_BATCH_SIZE):
+        yield [key_values(key, pk_columns) for key in keys]
+
+
+def diff_table(uri, state, table_name, table_struct, driver_sql, on_batch=None):
+    """
+    Compare une table aux empreintes de la dernière synchronisation.
+
+    Les nouvelles empreintes sont écrites lot par lot dans le fichier d'état
+    (voir `save_fingerprints`) : ni les empreintes ni les lignes ne sont gardées
+    en mémoire. Les lignes modifiées sont relues par `changed_batches` et les
+    lignes supprimées par `deleted_batches`.
+
+    Args:
+        uri (str): base source (clé des empreintes).
+        state (Connection): fichier d'état ouvert.
+        table_name (str): nom de la table.
+        table_struct (Table): structure SQLAlchemy de la table.
+        driver_sql (Engine): moteur de la base SQL.
+        on_batch (callable): appelé avec les lignes insérées ou modifiées de chaque lot.
+
+    Returns:
+        dict: {"keys": [...], "upserted": int, "deleted": int, "full": bool} ;
+        "full" vaut True quand toute la table est à reprendre : table sans clé
+        primaire (sans empreintes) ou sans empreintes précédentes.
+    """
+    pk_columns = [col.name for col in table_struct.primary_key.columns]
+    if not pk_columns:
+        return {"keys": [], "upserted": 0, "deleted": 0, "full": True}
+
+    full = not has_fingerprints(state, uri, table_name)
+    clear_next_fingerprints(state, uri, table_name)
+
+    upserted = 0
+    for changed in changed_batches(uri, state, table_name, pk_columns, driver_sql, stage=True):
+        if changed and on_batch is not None:
+            on_batch(changed)
+        upserted += len(changed)
+
+    deleted = sum(len(keys) for keys in iter_deleted_keys(state, uri, table_name, NEO4J_BATCH_SIZE))
+
+    print(f"[INFO] {table_name} : {upserted} ligne(s) insérée(s) ou modifiée(s), {deleted} supprimée(s)")
+    return {"keys": pk_columns, "upserted": upserted, "deleted": deleted, "full": full}
+
+
+def sync_noeuds(uri, state, table_name, table_struct, driver_sql, session_neo):
+    """Applique aux noeuds d'une table les changements depuis la dernière synchronisation."""
+    pk_columns = [col.name for col in table_struct.primary_key.columns]
+
+    if not pk_columns:
+        # sans clé primaire, la table est rechargée entièrement
+        print(f"[WARNING] {table_name} n'a pas de clé primaire : rechargement complet")
+        session_neo.execute_write(delete_label, table_name)
+        insert_noeud_from_table(table_name, table_struct, session_neo, driver_sql)
+        return diff_table(uri, state, table_name, table_struct, driver_sql)
+
+    types = [f"{col.name}:{col.type}" for col in table_struct.columns]
+    session_neo.execute_write(store_label_types, table_name, types)
+
+    def upsert(rows):
+        write_by_batch(session_neo, upsert_noeuds, rows, table_name, pk_columns)
+
+    change = diff_table(uri, state, table_name, table_struct, driver_sql, on_batch=upsert)
+
+    for keys in deleted_batches(uri, state, table_name, pk_columns):
+        write_by_batch(session_neo, delete_noeuds, keys, table_name, pk_columns)
+    return change
+
+
+def sync_simple_relation(table_summary_relation, changes, uri, state, driver, session_neo):
+    for source_table, relations in table_summary_relation.items():
+        for target_table, relation_info in relations.items():
+            if relation_info.get("type") != "inner":
+                continue
+
+            source_change = changes.get(source_table)
+            target_change = changes.get(target_table)
+            if source_change is None:
+                continue
+
+            if source_change["full"] or (target_change is not None and target_change["full"]):
+                # une des deux tables a été rechargée : on recrée tous les liens
+                session_neo.execute_write(delete_all_links, source_table, target_table, relation_info["name"])
+                link_simple_relation(source_table, target_table, relation_info, driver, session_neo)
+                continue
+
+            if not source_change["upserted"]:
+                continue
+
+            rel_data = get_all_relations(driver, source_table, target_table)
+            key_map = {row['from']: row['to'] for _, row in rel_data.iterrows()}
+            pk_columns = source_change["keys"]
+
+            # les liens des lignes modifiées sont supprimés puis recréés avec leur nouvelle clé étrangère, lot par lot
+            count = 0
+            for rows in changed_batches(uri, state, source_table, pk_columns, driver):
+                source_keys = [{k: row[k] for k in pk_columns} for row in rows]
+                write_by_batch(session_neo, delete_links_from, source_keys, source_table, pk_columns, target_table, relation_info["name"])
+                count += insert_links(session_neo, source_table, target_table, relation_info["name"], simple_link_rows(rows, key_map))
+
+            print(f"[SUCCESS] link synced : {source_table} -----------> {target_table} ({count} pairs)")
+
+
+def sync_many_to_many_relation(table_summary_relation, changes, uri, state, driver, session_neo):
+    for source_table, relations in table_summary_relation.items():
+        for target_table, relation_info in relations.items():
+            if relation_info.get("type") != "join":
+                continue
+
+            join_change = changes.get(relation_info["table"])
+            join_keys = get_join_keys(driver, relation_info, source_table, target_table)
+            if join_change is None or join_keys is None:
+                continue
+            source_key, target_key = join_keys
+
+            # les lignes supprimées ne sont connues que par leur clé primaire
+            deletable = {source_key["from"], target_key["from"]} <= set(join_change["keys"])
+            rebuild = (
+                join_change["full"]
+                or (join_change["deleted"] and not deletable)
+                or changes.get(source_table, {}).get("full")
+                or changes.get(target_table, {}).get("full")
+            )
+
+            if rebuild:
+                session_neo.execute_write(delete_all_links, source_table, target_table, relation_info["name"])
+                link_many_to_many_relation(source_table, target_table, relation_info, driver, session_neo)
+                continue
+
+            for keys in deleted_batches(uri, state, relation_info["table"], join_change["keys"]):
+                rows = join_link_rows(keys, source_key, target_key, with_properties=False)
+                write_by_batch(
+                    session_neo, delete_links, rows,
+                    source_table, [source_key["to"]], target_table, [target_key["to"]], relation_info["name"]
+                )
+
+            count = 0
+            if join_change["upserted"]:
+                for records in changed_batches(uri, state, relation_info["table"], join_change["keys"], driver):
+                    count += insert_links(
+                        session_neo, source_table, target_table, relation_info["name"],
+                        join_link_rows(records, source_key, target_key)
+                    )
+
+            print(f"[SUCCESS] Lien synchronisé : {source_table} -----------> {target_table} ({count} ajouté(s) ou modifié(s), {join_change['deleted']} supprimé(s))")
@@ -0,0 +1,269 @@
+import csv
+import os
+import sqlite3
+import sys
+
+import pytest
+
+import Compare
+from Compare import SQLiteComparator
+
+
+def make_db(path, script, rows=None):
+    conn = sqlite3.connect(path)
+    conn.executescript(script)
+    for query, values in (rows or {}).items():
+        conn.executemany(query, values)
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def compare(db1, db2, **kwargs):
+    comparator = SQLiteComparator(db1, db2, use_cache=False, **kwargs)
+    return comparator, comparator.compare_tables()
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    """Deux bases de 2000 lignes avec quelques différences connues, comparées en petites fenêtres."""
+    monkeypatch.setattr(Compare, "CHECKSUM_LEAF_SIZE", 50)
+    monkeypatch.setattr(Compare, "CHECKSUM_FANOUT", 4)
+
+    schema = """
+        CREATE TABLE t (id INTEGER PRIMARY KEY, nom TEXT, note REAL);
+        CREATE TABLE u (x TEXT, y INTEGER, v INTEGER, PRIMARY KEY (x, y));
+        CREATE TABLE identique (id INTEGER PRIMARY KEY, nom TEXT);
+        CREATE INDEX idx_t_nom ON t (nom);
+    """
+    rows_t = [(i, f"n{i}", i / 2) for i in range(1, 2001)]
+    rows_u = [(f"k{i % 7}", i, i) for i in range(300)]
+    rows_same = [(i, f"n{i}") for i in range(100)]
+
+    db1 = make_db(tmp_path / "db1.db", schema, {
+        "INSERT INTO t VALUES (?, ?, ?)": rows_t,
+        "INSERT INTO u VALUES (?, ?, ?)": rows_u,
+        "INSERT INTO identique VALUES (?, ?)": rows_same,
+    })
+    db2 = make_db(tmp_path / "db2.db", schema, {
+        "INSERT INTO t VALUES (?, ?, ?)": rows_t,
+        "INSERT INTO u VALUES (?, ?, ?)": rows_u,
+        "INSERT INTO identique VALUES (?, ?)": rows_same,
+    })
+    conn = sqlite3.connect(db2)
+    conn.executescript("""
+        DELETE FROM t WHERE id = 1000;
+        INSERT INTO t VALUES (3000, 'nouveau', 1.0);
+        UPDATE t SET nom = 'modifié' WHERE id IN (5, 1500);
+        UPDATE t SET note = NULL WHERE id = 1999;
+        UPDATE u SET v = -1 WHERE y IN (3, 299);
+    """)
+    conn.commit()
+    conn.close()
+    return db1, db2
+
+
+def test_differences_exactes_par_fenetres(databases):
+    _, results = compare(*databases)
+
+    assert results["identical_tables"] == ["identique"]
+    keys = results["different_tables"]["t"]["data_keys"]
+    assert keys["key_columns"] == ["id"]
+    assert keys["only_in_db1"] == [(1000,)]
+    assert keys["only_in_db2"] == [(3000,)]
+    assert sorted(keys["changed"]) == [(5,), (1500,), (1999,)]
+    assert keys["counts"] == {"only_in_db1": 1, "only_in_db2": 1, "changed": 3}
+    assert results["different_tables"]["t"]["data_differences"] == (
+        "5 enregistrements différents (DB1=2000, DB2=2000) : 1 uniquement dans DB1, 1 uniquement dans DB2, 3 modifiés"
+    )
+
+    keys = results["different_tables"]["u"]["data_keys"]
+    assert keys["key_columns"] == ["x", "y"]
+    assert sorted(keys["changed"]) == [("k3", 3), ("k5", 299)]
+    assert results["summary"]["different_tables"] == 2
+
+
+def test_fenetres_differentes_seulement(databases):
+    db1, db2 = databases
+    comparator = SQLiteComparator(db1, db2)
+    conn1, conn2 = comparator.open_connections()
+    try:
+        windows = list(comparator._differing_windows(conn1, "t", ["id", "nom", "note"], ["id"]))
+    finally:
+        conn1.close()
+        conn2.close()
+
+    # 5 lignes différentes : seules quelques fenêtres de 50 lignes au plus sont relues
+    assert 1 <= len(windows) <= 5
+    assert windows[0][0] is None or windows[0][0] <= (5,)
+
+
+def test_cle_primaire_nulle(tmp_path):
+    # SQLite accepte NULL dans une clé primaire TEXT : ces lignes doivent être comparées
+    schema = "CREATE TABLE t (k TEXT PRIMARY KEY, v INTEGER);"
+    db1 = make_db(tmp_path / "db1.db", schema, {"INSERT INTO t VALUES (?, ?)": [(None, 1), ("a", 2)]})
+    db2 = make_db(tmp_path / "db2.db", schema, {"INSERT INTO t VALUES (?, ?)": [(None, 9), ("a", 2)]})
+
+    _, results = compare(db1, db2)
+
+    assert results["identical_tables"] == []
+    keys = results["different_tables"]["t"]["data_keys"]
+    assert keys["only_in_db1"] == [(None, 1)]
+    assert keys["only_in_db2"] == [(None, 9)]
+
+
+def test_lignes_en_double_sans_cle(tmp_path):
+    # mêmes lignes distinctes, mais pas le même nombre de doublons : EXCEPT ne voit rien
+    schema = "CREATE TABLE t (v INTEGER);"
+    db1 = make_db(tmp_path / "db1.db", schema, {"INSERT INTO t VALUES (?)": [(1,), (1,), (2,)]})
+    db2 = make_db(tmp_path / "db2.db", schema, {"INSERT INTO t VALUES (?)": [(1,), (2,), (2,)]})
+
+    _, results = compare(db1, db2)
+
+    assert "t" in results["different_tables"]
+    assert results["different_tables"]["t"]["data_differences"]
+
+
+def test_difference_de_structure(tmp_path):
+    db1 = make_db(tmp_path / "db1.db", "CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT); CREATE TABLE seule1 (x);")
+    db2 = make_db(tmp_path / "db2.db", "CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT NOT NULL); CREATE TABLE seule2 (x);")
+
+    _, results = compare(db1, db2)
+
+    assert results["tables_only_in_db1"] == ["seule1"]
+    assert results["tables_only_in_db2"] == ["seule2"]
+    diffs = results["different_tables"]["t"]
+    assert diffs["structure_differences"]
+    assert diffs["data_keys"] is None
+
+
+def test_jobs_memes_resultats(databases):
+    _, sequential = compare(*databases)
+    _, parallel = compare(*databases, jobs=2)
+
+    assert parallel == sequential
+    assert list(parallel["different_tables"]) == ["t", "u"]
+
+
+def test_cache_des_empreintes(databases, monkeypatch):
+    db1, db2 = databases
+    first = SQLiteComparator(db1, db2).compare_tables()
+    assert os.path.exists(f"{db1}.fingerprints")
+    assert Compare.FingerprintCache(db2).load().keys() == {"t", "u", "identique"}
+
+    # fichiers inchangés : aucune empreinte recalculée, mêmes résultats
+    computed = []
+    fingerprint_table = SQLiteComparator.fingerprint_table
+    def counting(self, conn, table, structure, indices):
+        computed.append(table)
+        return fingerprint_table(self, conn, table, structure, indices)
+    monkeypatch.setattr(SQLiteComparator, "fingerprint_table", counting)
+
+    assert SQLiteComparator(db1, db2).compare_tables() == first
+    assert computed == []
+
+    # base modifiée : son cache est ignoré et la différence est vue
+    conn = sqlite3.connect(db2)
+    conn.execute("UPDATE identique SET nom = 'modifié' WHERE id = 1")
+    conn.commit()
+    conn.close()
+    stat = os.stat(db2)
+    os.utime(db2, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert Compare.FingerprintCache(db2).load() == {}
+    results = SQLiteComparator(db1, db2).compare_tables()
+    assert "identique" in results["different_tables"]
+    assert sorted(computed) == ["identique", "t", "u"]
+
+
+def test_cache_des_empreintes_en_mode_wal(databases):
+    db1, db2 = databases
+    conn = sqlite3.connect(db2)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.close()
+    assert SQLiteComparator(db1, db2).compare_tables()["identical_tables"] == ["identique"]
+
+    # écriture validée restée dans le journal -wal : le fichier principal ne change pas
+    writer = sqlite3.connect(db2)
+    writer.execute("PRAGMA wal_autocheckpoint = 0")
+    stat = os.stat(db2)
+    writer.execute("UPDATE identique SET nom = 'modifié' WHERE id = 1")
+    writer.commit()
+    try:
+        assert os.stat(db2).st_mtime_ns == stat.st_mtime_ns
+        assert Compare.FingerprintCache(db2).load() == {}
+        results = SQLiteComparator(db1, db2).compare_tables()
+    finally:
+        writer.close()
+    assert "identique" in results["different_tables"]
+
+
+def test_sans_cache(databases):
+    db1, db2 = databases
+    SQLiteComparator(db1, db2, use_cache=False).compare_tables()
+    assert not os.path.exists(f"{db1}.fingerprints")
+
+
+def csv_report(comparator, path):
+    comparator.output_file = str(path)
+    comparator._output_csv()
+    with open(path, newline="", encoding="utf-8") as file:
+        return list(csv.reader(file))
+
+
+def test_rapport_csv(databases, tmp_path):
+    comparator, _ = compare(*databases)
+    rows = csv_report(comparator, tmp_path / "rapport.csv")
+
+    assert rows[0] == ["section", "table", "genre", "cle", "colonne", "valeur_db1", "valeur_db2", "detail"]
+    assert ["synthese", "", "different_tables", "", "", "", "", "2"] in rows
+    assert ["tables", "identique", "identique", "", "", "", "", ""] in rows
+    assert ["donnees", "t", "changed", "[5]", "nom", "n5", "modifié", ""] in rows
+    assert ["donnees", "t", "changed", "[1999]", "note", "999.5", "", ""] in rows
+    assert ["donnees", "t", "only_in_db1", "[1000]", "", '{"id": 1000, "nom": "n1000", "note": 500.0}', "", ""] in rows
+    assert ["donnees", "u", "changed", '["k3", 3]', "v", "3", "-1", ""] in rows
+    assert not [row for row in rows if row[2] == "tronque"]
+
+
+def test_rapport_csv_tronque(databases, tmp_path, monkeypatch):
+    # les lignes du rapport sont relues dans la base, pas dans les clés gardées en mémoire
+    monkeypatch.setattr(Compare, "STORED_KEYS_LIMIT", 1)
+    comparator, _ = compare(*databases, report_limit=2)
+    rows = csv_report(comparator, tmp_path / "rapport.csv")
+
+    data_t = [row for row in rows if row[:2] == ["donnees", "t"] and row[2] in ("only_in_db1", "only_in_db2", "changed")]
+    assert len({row[3] for row in data_t}) == 2
+    assert ["donnees", "t", "tronque", "", "", "", "", "3 ligne(s) différente(s) non écrite(s)"] in rows
+
+    comparator.report_limit = 0
+    rows = csv_report(comparator, tmp_path / "complet.csv")
+    data_t = [row for row in rows if row[:2] == ["donnees", "t"] and row[2] in ("only_in_db1", "only_in_db2", "changed")]
+    assert len({row[3] for row in data_t}) == 5
+
+
+def test_rapport_html(tmp_path):
+    schema = "CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT);"
+    db1 = make_db(tmp_path / "db1.db", schema, {"INSERT INTO t VALUES (?, ?)": [(i, "<b>") for i in range(5)]})
+    db2 = make_db(tmp_path / "db2.db", schema, {"INSERT INTO t VALUES (?, ?)": [(i, "&") for i in range(5)]})
+    comparator, _ = compare(db1, db2, output_format="html", output_file=str(tmp_path / "rapport.html"), report_limit=3)
+    comparator.output_results()
+
+    report = (tmp_path / "rapport.html").read_text(encoding="utf-8")
+    assert report.startswith("<!DOCTYPE html>")
+    assert report.rstrip().endswith("</html>")
+    assert report.count('<tr class="changed">') == 3
+    assert "&lt;b&gt;" in report and "<b>" not in report
+    assert "&amp;" in report
+    assert "... 2 ligne(s) différente(s) non écrite(s)" in report
+
+
+def test_ligne_de_commande(databases, tmp_path, monkeypatch):
+    db1, db2 = databases
+    output = tmp_path / "rapport.csv"
+    monkeypatch.setattr(sys, "argv", ["Compare.py", db1, db2, "-f", "csv", "-o", str(output), "--limit", "1", "--no-cache"])
+    Compare.main()
+
+    with open(output, newline="", encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    assert ["donnees", "t", "tronque", "", "", "", "", "4 ligne(s) différente(s) non écrite(s)"] in rows
+    assert not os.path.exists(f"{db1}.fingerprints")
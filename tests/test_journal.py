@@ -0,0 +1,43 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import pytest
+
+from helper.journal import MigrationJournal
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = MigrationJournal(str(tmp_path / "journal.db"), "neo:source.db")
+    yield journal
+    journal.close()
+
+
+def test_etapes_terminees(journal, tmp_path):
+    assert not journal.is_done("nodes:employe")
+    journal.mark_done("nodes:employe")
+    assert journal.is_done("nodes:employe")
+
+    # une autre migration a sa propre progression
+    other = MigrationJournal(str(tmp_path / "journal.db"), "neo:autre.db")
+    assert not other.is_done("nodes:employe")
+    other.close()
+
+    journal.reset()
+    assert not journal.is_done("nodes:employe")
+
+
+def test_point_de_reprise_garde_les_types(journal):
+    key = (10, "a", 2.5, None, date(2020, 1, 5), datetime(2020, 1, 5, 10, 30), time(8, 15),
+           Decimal("1.10"), b"\x00\xff")
+    journal.save_checkpoint("nodes:employe", key)
+
+    restored = journal.get_checkpoint("nodes:employe")
+    assert restored == key
+    assert [type(value) for value in restored] == [type(value) for value in key]
+    assert journal.get_checkpoint("nodes:projet") is None
+
+
+def test_cle_non_enregistrable(journal):
+    with pytest.raises(TypeError):
+        journal.save_checkpoint("nodes:employe", (object(),))
@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from models import m_sqlite
+
+
+class FakeResult(list):
+    def single(self):
+        return self[0] if self else None
+
+
+class FakeSession:
+    """Session Neo4j simulée pour une étiquette : nœuds (propriétés) et contraintes déclarées."""
+
+    def __init__(self, nodes, required=None):
+        self.nodes = nodes
+        self.required = required
+        self.queries = []
+
+    def run(self, query, **params):
+        self.queries.append((query, params))
+        if "count(n) AS total" in query:
+            return FakeResult([{"total": len(self.nodes)}])
+        if "SHOW CONSTRAINTS" in query:
+            if self.required is None:
+                raise RuntimeError("SHOW CONSTRAINTS indisponible")
+            return FakeResult([{"properties": self.required}])
+        nodes = self.nodes[:params["limit"]] if "LIMIT $limit" in query else self.nodes
+        props = sorted({prop for node in nodes for prop in node})
+        return FakeResult(
+            [{"prop": prop, "non_null_count": sum(prop in node for node in nodes),
+              "unique_count": len({node[prop] for node in nodes if prop in node})} for prop in props]
+            + [{"prop": "", "non_null_count": len(nodes), "unique_count": 1}]
+        )
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    m_sqlite.constraints_cache.clear()
+    yield
+    m_sqlite.constraints_cache.clear()
+
+
+NODES = [{"id": 1, "nom": "a", "code": "x"}, {"id": 2, "nom": "b"}, {"id": 3, "nom": "b", "code": "y"}]
+
+
+def test_un_seul_parcours(capsys):
+    session = FakeSession(NODES, required=["nom"])
+    constraints = m_sqlite.extract_neo4j_constraints(session, "employe")
+
+    assert constraints["not_null"] == ["id", "nom"]
+    assert constraints["unique"] == ["code", "id"]
+    assert constraints["required"] == ["nom"]
+    assert not constraints["truncated"]
+    assert not any("LIMIT" in query for query, _ in session.queries)
+    # mis en cache : pas de nouveau parcours
+    assert m_sqlite.extract_neo4j_constraints(session, "employe") is constraints
+    assert len(session.queries) == 3
+
+
+def test_parcours_tronque():
+    session = FakeSession(NODES, required=[])
+    constraints = m_sqlite.extract_neo4j_constraints(session, "employe", scan_limit=2)
+
+    assert constraints["truncated"]
+    # "nom" n'a pas de doublon sur les deux premiers nœuds
+    assert constraints["unique"] == ["code", "id", "nom"]
+    assert [params for query, params in session.queries if "LIMIT $limit" in query] == [{"limit": 2}]
+
+
+def test_not_null_seulement_si_declare(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sortie.db'}")
+    # toujours présent dans les données, mais aucune contrainte lisible dans Neo4j
+    m_sqlite.extract_neo4j_constraints(FakeSession([{"id": 1, "code": "x"}]), "t")
+    m_sqlite.create_table(engine, "t", {"id": "INTEGER", "code": "String"})
+    m_sqlite.extract_neo4j_constraints(FakeSession([{"id": 1, "code": "x"}], required=["code"]), "u")
+    m_sqlite.create_table(engine, "u", {"id": "INTEGER", "code": "String"})
+
+    conn = sqlite3.connect(tmp_path / "sortie.db")
+    not_null = {table: {row[1] for row in conn.execute(f"PRAGMA table_info({table})") if row[3]} for table in ("t", "u")}
+    conn.close()
+    assert not_null == {"t": {"id"}, "u": {"id", "code"}}
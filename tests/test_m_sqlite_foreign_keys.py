@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from models import m_sqlite
+
+
+class FakeRecord(dict):
+    def data(self):
+        return dict(self)
+
+
+class FakeSession:
+    """Session Neo4j simulée : paires (source, cible) d'une relation, lues une seule fois."""
+
+    def __init__(self, pairs):
+        self.pairs = pairs
+        self.queries = []
+
+    def run(self, query, **params):
+        self.queries.append(query)
+        return iter(FakeRecord(source_id=source, target_id=target) for source, target in self.pairs)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = tmp_path / "sortie.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE departement (id INTEGER PRIMARY KEY)")
+    conn.execute("CREATE TABLE employe (id INTEGER PRIMARY KEY, departement_id INTEGER)")
+    conn.executemany("INSERT INTO departement VALUES (?)", [(1,), (2,)])
+    conn.executemany("INSERT INTO employe (id) VALUES (?)", [(i,) for i in range(1, 7)])
+    conn.commit()
+    conn.close()
+    return create_engine(f"sqlite:///{path}")
+
+
+RELATIONS = {"employe": {"departement": {"type": "inner", "name": "link_to_departement"}}}
+CATALOG = {("employe", "link_to_departement", "departement"): {"count": 5, "direction": "out"}}
+
+
+def test_cles_etrangeres_par_lot(engine, monkeypatch):
+    monkeypatch.setattr(m_sqlite, "SQL_BATCH_SIZE", 2)
+    session = FakeSession([(1, 1), (2, 1), (3, 2), (5, 2), (6, 1)])
+
+    m_sqlite.insert_simple_relations(RELATIONS, engine, session, CATALOG)
+
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("SELECT id, departement_id FROM employe ORDER BY id").fetchall()
+        temp_tables = conn.exec_driver_sql("SELECT name FROM sqlite_temp_master").fetchall()
+    assert rows == [(1, 1), (2, 1), (3, 2), (4, None), (5, 2), (6, 1)]
+    # seuls les identifiants des extrémités sont lus
+    assert "RETURN s.id AS source_id, t.id AS target_id" in session.queries[0]
+    assert temp_tables == []
+
+
+def test_relation_absente_du_catalogue(engine):
+    session = FakeSession([(1, 1)])
+
+    m_sqlite.insert_simple_relations(RELATIONS, engine, session, {})
+
+    assert session.queries == []
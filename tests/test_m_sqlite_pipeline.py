@@ -0,0 +1,172 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from models import m_sqlite
+
+
+class FakeDriver:
+    """Driver Neo4j minimal : seules les sessions sont utilisées par les lecteurs."""
+
+    @contextmanager
+    def session(self, **kwargs):
+        yield None
+
+
+class FakeConnection:
+    """Connexion SQLite simulée : les lignes ne sont visibles qu'après commit."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.pending = {}
+
+    def commit(self):
+        self.engine.commits += 1
+        for table, rows in self.pending.items():
+            self.engine.inserted.setdefault(table, []).extend(rows)
+        self.pending = {}
+
+    def rollback(self):
+        self.pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.pending = {}
+
+
+class FakeEngine:
+    def __init__(self):
+        self.inserted = {}
+        self.commits = 0
+
+    def connect(self):
+        return FakeConnection(self)
+
+
+class FakeJournal:
+    def __init__(self, fail_on=None):
+        self.done = set()
+        self.fail_on = fail_on
+
+    def is_done(self, step):
+        return step in self.done
+
+    def mark_done(self, step):
+        if step == self.fail_on:
+            raise RuntimeError("journal indisponible")
+        self.done.add(step)
+
+
+def insert_rows(conn, table, rows, data):
+    if table == "casse":
+        raise RuntimeError("contrainte violée")
+    conn.pending.setdefault(table, []).extend(rows)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    def get_data_from_label(label, session):
+        # beaucoup plus de lots que de places dans la file
+        for i in range(50):
+            yield [{"id": i, "_types": []}]
+
+    monkeypatch.setattr(m_sqlite, "get_data_from_label", get_data_from_label)
+    monkeypatch.setattr(m_sqlite, "insert_rows", insert_rows)
+    monkeypatch.setattr(m_sqlite, "clear_table", lambda driver_sql, table: None)
+    monkeypatch.setattr(m_sqlite, "PIPELINE_QUEUE_SIZE", 2)
+    return FakeEngine()
+
+
+def run_with_timeout(function, timeout=10):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = function()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "le pipeline est resté bloqué"
+    return outcome
+
+
+def test_pipeline_insere_toutes_les_etiquettes(engine):
+    journal = FakeJournal()
+    labels = {"a": {}, "b": {}, "casse": {}}
+    outcome = run_with_timeout(lambda: m_sqlite.insert_labels_pipelined(labels, FakeDriver(), engine, 3, journal))
+
+    results = outcome["result"]
+    assert not results["casse"]["success"]
+    assert journal.done == {f"data:{table}" for table, result in results.items() if result["success"]}
+    for table in journal.done:
+        assert len(engine.inserted[table[5:]]) == 50
+    # la propriété technique _types n'est pas copiée
+    assert all(row == {"id": row["id"]} for rows in engine.inserted.values() for row in rows)
+
+
+def test_pipeline_un_seul_lecteur(engine):
+    journal = FakeJournal()
+    labels = {"a": {}, "b": {}}
+    outcome = run_with_timeout(lambda: m_sqlite.insert_labels_pipelined(labels, FakeDriver(), engine, 1, journal))
+
+    assert outcome["result"] == {table: {"success": True, "rows": 50, "error": None} for table in labels}
+    assert journal.done == {"data:a", "data:b"}
+    # 50 lots par étiquette : une transaction tous les PIPELINE_COMMIT_BATCHES lots, pas une par lot
+    assert engine.commits < 100 // m_sqlite.PIPELINE_COMMIT_BATCHES + 3
+
+
+def write(engine, items, tables, commit_batches, monkeypatch):
+    monkeypatch.setattr(m_sqlite, "PIPELINE_COMMIT_BATCHES", commit_batches)
+    batches = queue.Queue()
+    for item in items:
+        batches.put(item)
+    results = {table: {"success": True, "rows": 0, "error": None} for table in tables}
+    journal = FakeJournal()
+    m_sqlite.write_batches(batches, results, tables, engine, journal)
+    return results, journal
+
+
+def test_ecrivain_valide_par_groupes_de_lots(engine, monkeypatch):
+    items = [("a", [{"id": i}], None) for i in range(5)] + [("a", None, None)]
+    results, journal = write(engine, items, {"a": {}}, 2, monkeypatch)
+
+    assert results["a"]["rows"] == 5
+    assert len(engine.inserted["a"]) == 5
+    assert engine.commits == 3
+    assert journal.done == {"data:a"}
+
+
+def test_annulation_marque_les_etiquettes_du_lot_en_echec(engine, monkeypatch):
+    items = [("a", [{"id": 1}], None), ("casse", [{"id": 2}], None), ("a", None, None), ("casse", None, None)]
+    results, journal = write(engine, items, {"a": {}, "casse": {}}, 10, monkeypatch)
+
+    # les lignes de "a" non validées ont été annulées avec celles de "casse"
+    assert not results["a"]["success"]
+    assert not results["casse"]["success"]
+    assert journal.done == set()
+    assert engine.inserted == {}
+
+
+def test_echec_de_l_ecrivain_libere_les_lecteurs(engine):
+    journal = FakeJournal(fail_on="data:a")
+    labels = {"a": {}, "b": {}, "c": {}}
+    outcome = run_with_timeout(lambda: m_sqlite.insert_labels_pipelined(labels, FakeDriver(), engine, 3, journal))
+
+    assert isinstance(outcome.get("error"), RuntimeError)
+
+
+def test_insertion_sequentielle_en_echec(engine, monkeypatch):
+    monkeypatch.setattr(m_sqlite, "bulk_insert_data", lambda driver_sql, table, rows, data: table != "casse")
+    journal = FakeJournal()
+    results = m_sqlite.insert_labels({"a": {}, "casse": {}}, engine, None, journal)
+
+    assert results["a"] == {"success": True, "rows": 50, "error": None}
+    assert not results["casse"]["success"]
+    assert journal.done == {"data:a"}
@@ -0,0 +1,75 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from models import m_sqlite
+
+
+class FakeResult:
+    """Résultat Neo4j simulé : comme le vrai, il ne se parcourt qu'une fois."""
+
+    def __init__(self, records):
+        self.records = records
+        self.iterator = iter(records)
+
+    def __iter__(self):
+        return self.iterator
+
+    def single(self):
+        return self.records[0] if self.records else None
+
+
+class FakeSession:
+    """Session Neo4j simulée : relations (source, cible, propriétés) d'un seul type."""
+
+    def __init__(self, relations):
+        self.relations = relations
+
+    def run(self, query, **params):
+        if "collect(DISTINCT prop)" in query:
+            return FakeResult([{"props": sorted({prop for _, _, props in self.relations for prop in props})}])
+        if "properties(r)" in query:
+            return FakeResult([
+                {"source_id": source, "target_id": target, "props": props} for source, target, props in self.relations
+            ])
+        raise AssertionError(query)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = tmp_path / "sortie.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE employe (id INTEGER PRIMARY KEY)")
+    conn.execute("CREATE TABLE projet (id INTEGER PRIMARY KEY)")
+    conn.close()
+    return create_engine(f"sqlite:///{path}")
+
+
+RELATIONS = {"employe": {"projet": {"type": "join", "name": "TRAVAILLE_SUR"}}}
+CATALOG = {("employe", "TRAVAILLE_SUR", "projet"): {"count": 3}}
+
+
+def test_table_d_association(engine, monkeypatch):
+    monkeypatch.setattr(m_sqlite, "SQL_BATCH_SIZE", 2)
+    session = FakeSession([(3, 10, {"role": "chef"}), (1, 10, {}), (2, 11, {"role": "dev"})])
+    m_sqlite.insert_many_to_many_relations(RELATIONS, engine, session, CATALOG)
+
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("SELECT * FROM employe_projet_association").fetchall()
+        indexes = conn.exec_driver_sql("PRAGMA index_list(employe_projet_association)").fetchall()
+        temp_tables = conn.exec_driver_sql("SELECT name FROM sqlite_temp_master").fetchall()
+    # lignes insérées triées sur la clé, l'index de la clé primaire existe
+    assert rows == [(1, 10, None), (2, 11, "dev"), (3, 10, "chef")]
+    assert len(indexes) == 1
+    assert temp_tables == []
+
+
+def test_reexecution_sans_doublons(engine):
+    session = FakeSession([(1, 10, {"role": "chef"}), (2, 11, {"role": "dev"})])
+    m_sqlite.insert_many_to_many_relations(RELATIONS, engine, session, CATALOG)
+    m_sqlite.insert_many_to_many_relations(RELATIONS, engine, session, CATALOG)
+
+    with engine.connect() as conn:
+        count = conn.exec_driver_sql("SELECT count(*) FROM employe_projet_association").scalar()
+    assert count == 2
@@ -0,0 +1,62 @@
+from helper.neo4j_db import get_relation_catalog
+from helper.relations_extractor import get_neo_matrice_relations
+
+
+class FakeSession:
+    """Session Neo4j simulée : résultat du parcours agrégé des relations."""
+
+    def __init__(self, counts):
+        self.counts = counts
+        self.queries = 0
+
+    def run(self, query, **params):
+        self.queries += 1
+        return [
+            {"source": source, "relation_type": relation_type, "target": target, "count": count}
+            for (source, relation_type, target), count in self.counts.items()
+        ]
+
+
+COUNTS = {
+    ("employe", "link_to_departement", "departement"): 3,
+    # deux types sans rapport, en sens opposés
+    ("employe", "GERE", "projet"): 2,
+    ("projet", "SUIVI_PAR", "employe"): 1,
+    # table d'association : un type par sens, créés par models/neo
+    ("employe", "link_to_client_through_contrat", "client"): 4,
+    ("client", "link_to_employe_through_contrat", "employe"): 4,
+    # même type dans les deux sens
+    ("ville", "VOISINE", "region"): 1,
+    ("region", "VOISINE", "ville"): 1,
+}
+
+
+def test_sens_par_type_de_relation():
+    session = FakeSession(COUNTS)
+    catalog = get_relation_catalog(session)
+
+    assert session.queries == 1
+    directions = {key: entry["direction"] for key, entry in catalog.items()}
+    assert directions == {
+        ("employe", "link_to_departement", "departement"): "out",
+        ("employe", "GERE", "projet"): "out",
+        ("projet", "SUIVI_PAR", "employe"): "out",
+        ("employe", "link_to_client_through_contrat", "client"): "both",
+        ("client", "link_to_employe_through_contrat", "employe"): "both",
+        ("ville", "VOISINE", "region"): "both",
+        ("region", "VOISINE", "ville"): "both",
+    }
+    assert catalog[("employe", "GERE", "projet")]["count"] == 2
+
+
+def test_matrice_depuis_le_catalogue(capsys):
+    tables = ["employe", "departement", "projet", "client", "ville", "region"]
+    relations = get_neo_matrice_relations(FakeSession(COUNTS), tables)
+
+    assert relations["employe"]["departement"] == {"name": "link_to_departement", "type": "inner"}
+    assert relations["employe"]["projet"] == {"name": "GERE", "type": "inner"}
+    assert relations["projet"]["employe"] == {"name": "SUIVI_PAR", "type": "inner"}
+    assert relations["employe"]["client"] == {"name": "link_to_client_through_contrat", "type": "join"}
+    assert relations["ville"]["region"] == {"name": "VOISINE", "type": "join"}
+    # un seul message, pas une ligne par paire d'étiquettes
+    assert capsys.readouterr().out.count("\n") == 1
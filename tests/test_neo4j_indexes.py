@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+from neo4j.exceptions import Neo4jError
+from sqlalchemy import MetaData, create_engine
+
+from helper.neo4j_db import create_key_indexes, get_key_columns
+
+
+class FakeResult:
+    def consume(self):
+        pass
+
+
+class FakeSession:
+    """Session Neo4j simulée : retient les requêtes, la contrainte d'unicité peut échouer (doublons)."""
+
+    def __init__(self, failing_constraints=()):
+        self.queries = []
+        self.failing_constraints = failing_constraints
+
+    def run(self, query, **params):
+        self.queries.append(query)
+        if any(f"CONSTRAINT {name} " in query for name in self.failing_constraints):
+            raise Neo4jError("doublons")
+        return FakeResult()
+
+
+@pytest.fixture
+def metadata(tmp_path):
+    path = tmp_path / "source.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE projet (id INTEGER PRIMARY KEY, code TEXT UNIQUE)")
+    conn.execute("CREATE TABLE employe (id INTEGER PRIMARY KEY, projet_code TEXT REFERENCES projet(code))")
+    conn.execute("CREATE TABLE poste (site TEXT, numero INTEGER, PRIMARY KEY (site, numero))")
+    conn.close()
+
+    metadata = MetaData()
+    metadata.reflect(bind=create_engine(f"sqlite:///{path}"))
+    return metadata
+
+
+def test_cles_des_liens(metadata):
+    keys = get_key_columns(metadata, ["projet", "employe", "poste"])
+
+    assert keys["projet"] == {"primary": {("id",)}, "lookup": {("code",)}}
+    assert keys["employe"] == {"primary": {("id",)}, "lookup": {("projet_code",)}}
+    assert keys["poste"] == {"primary": {("site", "numero")}, "lookup": set()}
+
+
+def test_contraintes_puis_attente(metadata):
+    session = FakeSession()
+    create_key_indexes(session, metadata, ["projet", "employe", "poste"])
+
+    assert "CREATE CONSTRAINT uniq_projet_id IF NOT EXISTS FOR (n:projet) REQUIRE n.id IS UNIQUE" in session.queries
+    assert "CREATE INDEX idx_projet_code IF NOT EXISTS FOR (n:projet) ON (n.code)" in session.queries
+    # clé composée : index de plage sur les deux propriétés
+    assert "CREATE INDEX idx_poste_site_numero IF NOT EXISTS FOR (n:poste) ON (n.site, n.numero)" in session.queries
+    assert session.queries[-1] == "CALL db.awaitIndexes($timeout)"
+
+
+def test_index_si_la_contrainte_echoue(metadata):
+    session = FakeSession(failing_constraints=["uniq_employe_id"])
+    create_key_indexes(session, metadata, ["employe"])
+
+    assert "CREATE INDEX idx_employe_id IF NOT EXISTS FOR (n:employe) ON (n.id)" in session.queries
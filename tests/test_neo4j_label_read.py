@@ -0,0 +1,47 @@
+import pytest
+
+from helper.neo4j_db import get_data_from_label
+
+
+class FakeSession:
+    """Session Neo4j simulée : les enregistrements sont produits à la demande, comme avec fetch_size."""
+
+    def __init__(self, count, fail_after=None):
+        self.count = count
+        self.fail_after = fail_after
+        self.queries = []
+        self.pulled = 0
+
+    def records(self):
+        for i in range(self.count):
+            if i == self.fail_after:
+                raise RuntimeError("connexion perdue")
+            self.pulled += 1
+            yield {"props": {"id": i}}
+
+    def run(self, query, **params):
+        self.queries.append(query)
+        return self.records()
+
+
+def test_lots_d_une_seule_requete():
+    session = FakeSession(7)
+    batches = list(get_data_from_label("employe", session, batch_size=3))
+
+    assert [[node["id"] for node in batch] for batch in batches] == [[0, 1, 2], [3, 4, 5], [6]]
+    assert session.queries == ["MATCH (n:employe) RETURN properties(n) AS props"]
+
+
+def test_lecture_au_fil_des_lots():
+    session = FakeSession(1000)
+    batches = get_data_from_label("employe", session, batch_size=10)
+
+    assert len(next(batches)) == 10
+    # seuls les enregistrements du premier lot ont été lus
+    assert session.pulled == 10
+
+
+def test_erreur_propagee():
+    session = FakeSession(7, fail_after=4)
+    with pytest.raises(RuntimeError):
+        list(get_data_from_label("employe", session, batch_size=3))
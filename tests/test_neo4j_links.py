@@ -0,0 +1,92 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from helper.neo4j_db import insert_links
+from models.neo import insert_simple_relation, insert_many_to_many_relation
+
+
+class FakeTransaction:
+    def __init__(self, queries):
+        self.queries = queries
+
+    def run(self, query, **params):
+        self.queries.append((query, params))
+
+
+class FakeSession:
+    """Session Neo4j simulée : exécute les fonctions de transaction et retient leurs requêtes."""
+
+    def __init__(self):
+        self.queries = []
+
+    def execute_write(self, work, *args):
+        return work(FakeTransaction(self.queries), *args)
+
+    def rows(self):
+        return [row for _, params in self.queries for row in params["rows"]]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = tmp_path / "source.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE projet (id INTEGER PRIMARY KEY)")
+    conn.execute("CREATE TABLE employe (id INTEGER PRIMARY KEY, projet_id INTEGER REFERENCES projet(id))")
+    conn.execute(
+        "CREATE TABLE affectation (employe_id INTEGER REFERENCES employe(id), "
+        "projet_id INTEGER REFERENCES projet(id), role TEXT)"
+    )
+    conn.executemany("INSERT INTO projet VALUES (?)", [(10,), (11,)])
+    conn.executemany("INSERT INTO employe VALUES (?, ?)", [(1, 10), (2, 10), (3, 11), (4, None)])
+    conn.executemany("INSERT INTO affectation VALUES (?, ?, ?)", [(1, 10, "chef"), (3, 11, "dev")])
+    conn.commit()
+    conn.close()
+    return create_engine(f"sqlite:///{path}")
+
+
+def test_liens_envoyes_par_lot():
+    session = FakeSession()
+    rows = [{"source": {"id": i}, "target": {"id": i + 100}} for i in range(5)]
+
+    assert insert_links(session, "employe", "projet", "TRAVAILLE", rows, batch_size=2) == 5
+
+    assert [len(params["rows"]) for _, params in session.queries] == [2, 2, 1]
+    query = session.queries[0][0]
+    assert query.startswith("UNWIND $rows AS row")
+    assert "MATCH (a:employe) WHERE a.id = row.source.id" in query
+    assert "MERGE (a)-[r:TRAVAILLE]->(b)" in query
+    # sans propriétés, la relation n'est pas modifiée
+    assert "row.props" not in query
+
+
+def test_aucun_lien():
+    session = FakeSession()
+    assert insert_links(session, "employe", "projet", "TRAVAILLE", []) == 0
+    assert session.queries == []
+
+
+def test_cle_etrangere_simple(engine):
+    session = FakeSession()
+    relations = {"employe": {"projet": {"type": "inner", "name": "TRAVAILLE"}}}
+
+    insert_simple_relation(relations, engine, session)
+
+    # une paire par valeur de clé étrangère, les clés NULL sont ignorées
+    assert sorted(row["target"]["id"] for row in session.rows()) == [10, 11]
+    assert all(row["source"] == {"projet_id": row["target"]["id"]} for row in session.rows())
+
+
+def test_table_d_association(engine):
+    session = FakeSession()
+    relations = {"employe": {"projet": {"type": "join", "table": "affectation", "name": "AFFECTE"}}}
+
+    insert_many_to_many_relation(relations, engine, session)
+
+    rows = sorted(session.rows(), key=lambda row: row["source"]["id"])
+    assert [(row["source"], row["target"], row["props"]["role"]) for row in rows] == [
+        ({"id": 1}, {"id": 10}, "chef"),
+        ({"id": 3}, {"id": 11}, "dev"),
+    ]
+    assert "row.props" in session.queries[0][0]
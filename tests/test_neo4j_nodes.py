@@ -0,0 +1,89 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import MetaData, create_engine
+
+from helper.neo4j_db import SCHEMA_LABEL, insert_noeud_from_table
+
+
+class FakeTransaction:
+    def __init__(self, queries):
+        self.queries = queries
+
+    def run(self, query, **params):
+        self.queries.append((query, params))
+
+
+class FakeSession:
+    """Session Neo4j simulée : exécute les fonctions de transaction et retient leurs requêtes."""
+
+    def __init__(self):
+        self.queries = []
+        self.transactions = 0
+
+    def execute_write(self, work, *args):
+        self.transactions += 1
+        return work(FakeTransaction(self.queries), *args)
+
+    def batches(self):
+        return [params["rows"] for query, params in self.queries if query.startswith("UNWIND")]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE employe (id INTEGER PRIMARY KEY, nom TEXT)")
+    conn.execute("CREATE TABLE vide (id INTEGER PRIMARY KEY)")
+    conn.executemany("INSERT INTO employe VALUES (?, ?)", [(i, f"e{i}") for i in range(1, 8)])
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f"sqlite:///{path}")
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    return engine, metadata
+
+
+def test_noeuds_envoyes_par_lot(source):
+    engine, metadata = source
+    session = FakeSession()
+
+    assert insert_noeud_from_table("employe", metadata.tables["employe"], session, engine, batch_size=3)
+
+    batches = session.batches()
+    # un lot par transaction, une seule requête UNWIND par lot
+    assert [len(rows) for rows in batches] == [3, 3, 1]
+    assert [row["id"] for rows in batches for row in rows] == list(range(1, 8))
+    assert batches[0][0] == {"id": 1, "nom": "e1"}
+    assert "CREATE (n:employe)" in session.queries[-1][0]
+
+
+def test_table_vide(source):
+    engine, metadata = source
+    session = FakeSession()
+
+    assert insert_noeud_from_table("vide", metadata.tables["vide"], session, engine)
+    assert session.batches() == []
+
+
+def test_echec_signale(source):
+    engine, metadata = source
+
+    class FailingSession(FakeSession):
+        def execute_write(self, work, *args):
+            raise RuntimeError("connexion perdue")
+
+    assert not insert_noeud_from_table("employe", metadata.tables["employe"], FailingSession(), engine)
+
+
+def test_types_stockes_une_fois_par_etiquette(source):
+    engine, metadata = source
+    session = FakeSession()
+
+    insert_noeud_from_table("employe", metadata.tables["employe"], session, engine, batch_size=3)
+
+    schema = [params for query, params in session.queries if f"MERGE (m:{SCHEMA_LABEL}" in query]
+    assert schema == [{"label": "employe", "types": ["id:INTEGER", "nom:TEXT"]}]
+    # les noeuds ne portent plus la liste des types
+    assert not any("_types" in row for rows in session.batches() for row in rows)
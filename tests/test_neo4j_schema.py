@@ -0,0 +1,49 @@
+from helper.neo4j_db import get_all_etiquette, create_noeuds
+
+
+class FakeSession:
+    """Session Neo4j simulée : un nœud de métadonnées pour "employe", des types déduits pour "ville"."""
+
+    def __init__(self):
+        self.queries = 0
+
+    def run(self, query, **params):
+        self.queries += 1
+        return [
+            {"label": "employe", "types": ["id:INTEGER", "nom:VARCHAR"], "property": None, "property_types": None},
+            {"label": "employe", "types": None, "property": "id", "property_types": ["Long"]},
+            {"label": "ville", "types": None, "property": "nom", "property_types": ["String"]},
+            {"label": "ville", "types": None, "property": "code", "property_types": ["Long", "String"]},
+        ]
+
+
+class FakeTransaction:
+    def run(self, query, **params):
+        pass
+
+
+def test_schema_en_une_requete():
+    session = FakeSession()
+    assert get_all_etiquette(session) == {
+        "employe": {"id": "INTEGER", "nom": "VARCHAR"},
+        "ville": {"nom": "VARCHAR", "code": "TEXT"},
+    }
+    assert session.queries == 1
+
+
+def test_cache_par_session():
+    session, other = FakeSession(), FakeSession()
+    get_all_etiquette(session)
+    get_all_etiquette(session)
+    assert session.queries == 1
+
+    # une autre session (autre base, autre exécution) relit le schéma
+    get_all_etiquette(other)
+    assert other.queries == 1
+
+    # une écriture dans le graphe invalide le schéma de toutes les sessions
+    create_noeuds(FakeTransaction(), "employe", [{"id": 1}])
+    get_all_etiquette(session)
+    get_all_etiquette(other)
+    assert (session.queries, other.queries) == (2, 2)
+    assert get_all_etiquette(session, use_cache=False) and session.queries == 3
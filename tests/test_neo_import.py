@@ -0,0 +1,96 @@
+import csv
+import sqlite3
+
+import pytest
+
+from models.neo_import import neo_import, import_command
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        return list(csv.reader(file))
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / "source.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE departement (id INTEGER PRIMARY KEY, nom VARCHAR(50));
+        CREATE TABLE employe (
+            id INTEGER PRIMARY KEY,
+            nom VARCHAR(50),
+            salaire FLOAT,
+            departement_id INTEGER REFERENCES departement(id)
+        );
+        CREATE TABLE projet (id INTEGER PRIMARY KEY, titre VARCHAR(50), actif BOOLEAN);
+        CREATE TABLE employe_projet (
+            employe_id INTEGER REFERENCES employe(id),
+            projet_id INTEGER REFERENCES projet(id),
+            PRIMARY KEY (employe_id, projet_id)
+        );
+        INSERT INTO departement VALUES (1, 'R&D'), (2, 'Ventes');
+        INSERT INTO employe VALUES (10, 'Alice', 3000.5, 1), (11, 'Bob', NULL, NULL), (12, 'Chloé', 2500, 2);
+        INSERT INTO projet VALUES (100, 'Migration', 1), (101, 'Archive', 0), (102, 'Brouillon', NULL);
+        INSERT INTO employe_projet VALUES (10, 100), (12, 100);
+    """)
+    conn.commit()
+    conn.close()
+
+    output_dir = tmp_path / "import"
+    files = neo_import(str(path), str(output_dir))
+    return files, output_dir
+
+
+def test_noeuds_avec_cle_typee(export):
+    files, output_dir = export
+    rows = read_csv(output_dir / "employe_nodes.csv")
+
+    assert rows[0] == [":ID(employe)", "id:long", "nom:string", "salaire:double", "departement_id:long", ":LABEL"]
+    # l'identifiant est recopié, la clé reste une propriété entière (pas de "10.0")
+    assert rows[1] == ["10", "10", "Alice", "3000.5", "1", "employe"]
+    assert rows[2] == ["11", "11", "Bob", "", "", "employe"]
+    assert ("employe", str(output_dir / "employe_nodes.csv")) in files["nodes"]
+
+
+def test_booleens_ecrits_en_true_false(export):
+    files, output_dir = export
+    header, *rows = read_csv(output_dir / "projet_nodes.csv")
+    actif = header.index("actif:boolean")
+    # neo4j-admin import lirait "1" comme false
+    assert [(row[0], row[actif]) for row in rows] == [("100", "true"), ("101", "false"), ("102", "")]
+
+
+def test_table_d_association_sans_noeuds(export):
+    files, output_dir = export
+    labels = [label for label, _ in files["nodes"]]
+    assert "employe_projet" not in labels
+    assert not (output_dir / "employe_projet_nodes.csv").exists()
+
+
+def test_relations(export):
+    files, output_dir = export
+    assert read_csv(output_dir / "employe_link_to_departement.csv") == [
+        [":START_ID(employe)", ":END_ID(departement)", ":TYPE"],
+        ["10", "1", "link_to_departement"],
+        ["12", "2", "link_to_departement"],
+    ]
+    assert read_csv(output_dir / "employe_link_to_projet_through_employe_projet.csv") == [
+        [":START_ID(employe)", ":END_ID(projet)", ":TYPE", "employe_id:long", "projet_id:long"],
+        ["10", "100", "link_to_projet_through_employe_projet", "10", "100"],
+        ["12", "100", "link_to_projet_through_employe_projet", "12", "100"],
+    ]
+    assert len(files["relationships"]) == 3
+
+
+def test_commande_d_import(capsys, export):
+    files, _ = export
+    command = import_command(files)
+    assert command.startswith("neo4j-admin database import full ")
+    assert command.endswith(" neo4j")
+    for _, path in files["nodes"]:
+        assert f"--nodes={path}" in command
+    for _, path in files["relationships"]:
+        assert f"--relationships={path}" in command
+    # la commande est affichée à la fin de l'export
+    assert command in capsys.readouterr().out
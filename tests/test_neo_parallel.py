@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import MetaData, create_engine
+
+from helper.journal import MigrationJournal
+from models.neo import insert_noeuds_parallel
+
+
+class FakeTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, **params):
+        with self.driver.lock:
+            if query.startswith("UNWIND"):
+                self.driver.rows.extend(params["rows"])
+            elif "DELETE" in query:
+                self.driver.deletes.append((query, params))
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        with self.driver.lock:
+            self.driver.sessions += 1
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, work, *args):
+        if args[0] in self.driver.failing:
+            raise RuntimeError(f"échec de {args[0]}")
+        return work(FakeTransaction(self.driver), *args)
+
+
+class FakeDriver:
+    """Driver Neo4j simulé, partagé par les workers : une session par table."""
+
+    def __init__(self, failing=()):
+        self.lock = threading.Lock()
+        self.rows = []
+        self.deletes = []
+        self.sessions = 0
+        self.failing = failing
+
+    def session(self):
+        return FakeSession(self)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.db"
+    conn = sqlite3.connect(path)
+    for table, count in (("a", 5), ("b", 3), ("c", 4)):
+        conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, nom TEXT)")
+        conn.executemany(f"INSERT INTO {table} VALUES (?, ?)", [(i, f"{table}{i}") for i in range(count)])
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f"sqlite:///{path}")
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    return engine, dict(metadata.tables)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = MigrationJournal(str(tmp_path / "journal.db"), "neo:source")
+    yield journal
+    journal.close()
+
+
+def test_tables_migrees_en_parallele(source, journal):
+    engine, tables = source
+    driver = FakeDriver()
+
+    results = insert_noeuds_parallel(tables, engine, driver, 2, journal)
+
+    assert {name: res["success"] for name, res in results.items()} == {"a": True, "b": True, "c": True}
+    assert sorted(row["nom"] for row in driver.rows) == sorted(
+        [f"a{i}" for i in range(5)] + [f"b{i}" for i in range(3)] + [f"c{i}" for i in range(4)]
+    )
+    # une session Neo4j par table
+    assert driver.sessions == 3
+
+
+def test_echec_d_une_table(source, journal):
+    engine, tables = source
+    driver = FakeDriver(failing=("b",))
+
+    results = insert_noeuds_parallel(tables, engine, driver, 3, journal)
+
+    assert {name: res["success"] for name, res in results.items()} == {"a": True, "b": False, "c": True}
+    assert not any(row["nom"].startswith("b") for row in driver.rows)
+    assert not journal.is_done("nodes:b")
+
+
+def test_reprise_apres_le_dernier_lot(source, journal):
+    engine, tables = source
+    journal.mark_done("nodes:a")
+    journal.save_checkpoint("nodes:c", (1,))
+
+    driver = FakeDriver()
+    results = insert_noeuds_parallel(tables, engine, driver, 2, journal)
+
+    assert all(res["success"] for res in results.values())
+    # a est terminée, c reprend après la clé 1 en supprimant d'abord les noeuds écrits au-delà
+    assert sorted(row["nom"] for row in driver.rows) == ["b0", "b1", "b2", "c2", "c3"]
+    assert any("MATCH (n:c)" in query and params == {"k0": 1} for query, params in driver.deletes)
+    assert journal.is_done("nodes:c")
@@ -0,0 +1,133 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import MetaData, create_engine
+
+from helper.db import get_batches
+from helper.neo4j_db import add_links
+from helper.sync_state import open_sync_state, save_fingerprints
+from models import neo_sync
+
+URI = "sqlite:///source.db"
+
+
+class FakeSession:
+    """Session Neo4j simulée : retient chaque transaction (fonction, arguments, lot)."""
+
+    def __init__(self):
+        self.writes = []
+
+    def execute_write(self, work, *args):
+        self.writes.append((work.__name__, args))
+
+    def rows(self, name):
+        return [row for work, args in self.writes if work == name for row in args[-1]]
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    path = tmp_path / "source.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE projet (id INTEGER PRIMARY KEY, nom TEXT)")
+    conn.execute("CREATE TABLE employe (id INTEGER PRIMARY KEY, nom TEXT, projet_id INTEGER REFERENCES projet(id))")
+    conn.execute("CREATE TABLE affectation (employe_id INTEGER REFERENCES employe(id), projet_id INTEGER REFERENCES projet(id), role TEXT, PRIMARY KEY (employe_id, projet_id))")
+    conn.executemany("INSERT INTO projet VALUES (?, ?)", [(10, "a"), (11, "b")])
+    conn.executemany("INSERT INTO employe VALUES (?, ?, ?)", [(1, "x", 10), (2, "y", 10), (3, "z", 11), (4, "t", None), (5, "u", 11)])
+    conn.executemany("INSERT INTO affectation VALUES (?, ?, ?)", [(1, 10, "chef"), (2, 11, "dev")])
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f"sqlite:///{path}")
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    # petits lots pour vérifier le traitement lot par lot
+    monkeypatch.setattr(neo_sync, "get_batches", lambda driver, table: get_batches(driver, table, batch_size=2))
+    return path, engine, metadata
+
+
+def first_sync(state, engine, metadata):
+    for table in ("employe", "affectation"):
+        neo_sync.diff_table(URI, state, table, metadata.tables[table], engine)
+        save_fingerprints(state, URI, table)
+
+
+def test_empreintes_ecrites_par_lot(tmp_path, source):
+    path, engine, metadata = source
+    state = open_sync_state(str(tmp_path / "etat.db"))
+    batches = []
+
+    change = neo_sync.diff_table(URI, state, "employe", metadata.tables["employe"], engine, on_batch=batches.append)
+    assert change == {"keys": ["id"], "upserted": 5, "deleted": 0, "full": True}
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    # rien n'est remplacé avant la fin de la synchronisation
+    assert state.execute("SELECT count(*) FROM fingerprints").fetchone() == (0,)
+    assert state.execute("SELECT count(*) FROM next_fingerprints").fetchone() == (5,)
+
+    save_fingerprints(state, URI, "employe")
+    assert state.execute("SELECT count(*) FROM fingerprints").fetchone() == (5,)
+    assert state.execute("SELECT count(*) FROM next_fingerprints").fetchone() == (0,)
+
+
+def test_noeuds_modifies_et_supprimes(tmp_path, source):
+    path, engine, metadata = source
+    state = open_sync_state(str(tmp_path / "etat.db"))
+    first_sync(state, engine, metadata)
+
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE employe SET nom = 'x2' WHERE id = 1")
+    conn.execute("DELETE FROM employe WHERE id IN (3, 4)")
+    conn.execute("INSERT INTO employe VALUES (6, 'v', 10)")
+    conn.commit()
+    conn.close()
+
+    session = FakeSession()
+    change = neo_sync.sync_noeuds(URI, state, "employe", metadata.tables["employe"], engine, session)
+
+    assert change == {"keys": ["id"], "upserted": 2, "deleted": 2, "full": False}
+    assert sorted(row["id"] for row in session.rows("upsert_noeuds")) == [1, 6]
+    assert sorted(row["id"] for row in session.rows("delete_noeuds")) == [3, 4]
+
+    # les lignes modifiées sont relues lot par lot pour les liens, tant que les empreintes ne sont pas remplacées
+    changed = [row["id"] for rows in neo_sync.changed_batches(URI, state, "employe", ["id"], engine) for row in rows]
+    assert sorted(changed) == [1, 6]
+
+
+def test_liens_d_association_par_lot(tmp_path, source, monkeypatch):
+    path, engine, metadata = source
+    state = open_sync_state(str(tmp_path / "etat.db"))
+    first_sync(state, engine, metadata)
+
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE affectation SET role = NULL WHERE employe_id = 1")
+    conn.execute("DELETE FROM affectation WHERE employe_id = 2")
+    conn.commit()
+    conn.close()
+
+    changes = {
+        "employe": {"keys": ["id"], "upserted": 0, "deleted": 0, "full": False},
+        "projet": {"keys": ["id"], "upserted": 0, "deleted": 0, "full": False},
+        "affectation": neo_sync.diff_table(URI, state, "affectation", metadata.tables["affectation"], engine),
+    }
+    relations = {"employe": {"projet": {"type": "join", "table": "affectation", "name": "AFFECTE"}}}
+    session = FakeSession()
+    inserted = []
+    monkeypatch.setattr(neo_sync, "insert_links", lambda session, source, target, link, rows: inserted.extend(rows) or len(rows))
+    neo_sync.sync_many_to_many_relation(relations, changes, URI, state, engine, session)
+
+    assert session.rows("delete_links") == [{"source": {"id": 2}, "target": {"id": 11}}]
+    # toutes les propriétés de la ligne sont envoyées : la relation est remplacée, pas complétée
+    assert inserted == [{
+        "source": {"id": 1}, "target": {"id": 10},
+        "props": {"employe_id": 1, "projet_id": 10, "role": None},
+    }]
+
+
+def test_proprietes_de_relation_remplacees():
+    class FakeTransaction:
+        def run(self, query, **params):
+            self.query = query
+
+    tx = FakeTransaction()
+    add_links(tx, "employe", ["id"], "projet", ["id"], "AFFECTE", [], with_properties=True)
+    # une propriété retirée de la ligne d'association doit disparaître de la relation
+    assert tx.query.endswith("SET r = row.props")
@@ -0,0 +1,41 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from helper.sqlite_db import sqlite_get_batches
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = tmp_path / "source.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    conn.execute("CREATE TABLE sans_cle (v TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(i, f"v{i}") for i in range(1, 26)])
+    conn.executemany("INSERT INTO sans_cle VALUES (?)", [(f"v{i}",) for i in range(7)])
+    conn.commit()
+    conn.close()
+    return create_engine(f"sqlite:///{path}")
+
+
+def test_lots_par_cle(engine):
+    batches = list(sqlite_get_batches("t", engine, 10))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert [id for batch in batches for id in batch["id"]] == list(range(1, 26))
+
+
+def test_reprise_apres_une_cle(engine):
+    batches = list(sqlite_get_batches("t", engine, 10, after=(20,)))
+    assert [id for batch in batches for id in batch["id"]] == list(range(21, 26))
+
+
+def test_lots_sans_cle(engine):
+    batches = list(sqlite_get_batches("sans_cle", engine, 3))
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+
+
+def test_erreur_de_lecture_propagee(engine):
+    with pytest.raises(SQLAlchemyError):
+        list(sqlite_get_batches("absente", engine, 10))
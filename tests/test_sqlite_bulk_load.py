@@ -0,0 +1,88 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+
+from helper.sqlite_db import sqlite_bulk_load, bulk_load_tmp_path
+
+
+def rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT id FROM t ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("in_memory", [False, True])
+def test_chargement_remplace_la_base(tmp_path, in_memory):
+    path = str(tmp_path / "sortie.db")
+    with sqlite_bulk_load(path, in_memory) as engine:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+            conn.execute(text("INSERT INTO t VALUES (1), (2)"))
+
+    assert rows(path) == [(1,), (2,)]
+    assert not (tmp_path / "sortie.db.tmp").exists()
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    conn.close()
+
+
+def test_connexions_du_pool_fermees_avant_le_renommage(tmp_path):
+    path = str(tmp_path / "sortie.db")
+    with sqlite_bulk_load(path) as engine:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+        # plusieurs connexions restent ouvertes dans le pool après usage
+        with engine.connect() as first, engine.connect() as second:
+            first.execute(text("SELECT * FROM t")).fetchall()
+            second.execute(text("SELECT * FROM t")).fetchall()
+
+    assert rows(path) == [(1,)]
+    assert not (tmp_path / "sortie.db-wal").exists()
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    conn.close()
+
+
+def test_echec_conserve_la_base_partielle_pour_la_reprise(tmp_path):
+    path = str(tmp_path / "sortie.db")
+    with pytest.raises(RuntimeError):
+        with sqlite_bulk_load(path) as engine:
+            with engine.begin() as conn:
+                conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+                conn.execute(text("INSERT INTO t VALUES (1)"))
+            raise RuntimeError("coupure")
+
+    assert not (tmp_path / "sortie.db").exists()
+    assert rows(bulk_load_tmp_path(path)) == [(1,)]
+
+    # la reprise repart du fichier temporaire
+    with sqlite_bulk_load(path, resume=True) as engine:
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO t VALUES (2)"))
+
+    assert rows(path) == [(1,), (2,)]
+    assert not (tmp_path / "sortie.db.tmp").exists()
+
+
+def test_nouveau_chargement_efface_la_base_partielle(tmp_path):
+    path = str(tmp_path / "sortie.db")
+    sqlite3.connect(bulk_load_tmp_path(path)).execute("CREATE TABLE ancienne (x)").connection.close()
+
+    with sqlite_bulk_load(path) as engine:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+
+    conn = sqlite3.connect(path)
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    conn.close()
+    assert "ancienne" not in tables and "t" in tables
+
+
+def test_reprise_impossible_en_memoire(tmp_path):
+    with pytest.raises(ValueError):
+        with sqlite_bulk_load(str(tmp_path / "sortie.db"), in_memory=True, resume=True):
+            pass
@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from helper import sqlite_db
+from helper.sqlite_db import get_sqlite_table, invalidate_sqlite_metadata, sqlite_bulk_insert_data, sqlite_insert_rows
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = tmp_path / "sortie.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, nom VARCHAR)")
+    conn.close()
+    engine = create_engine(f"sqlite:///{path}")
+    yield engine
+    invalidate_sqlite_metadata(engine)
+
+
+def rows(engine):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("SELECT id, nom FROM t ORDER BY id").fetchall()
+
+
+def test_insertion_par_lot(engine):
+    datas = [{"id": i, "nom": f"n{i}"} for i in range(5)] + [{"id": 5}]
+
+    assert sqlite_bulk_insert_data(engine, "t", datas, {"id": "INTEGER", "nom": "VARCHAR"}, batch_size=2)
+    # propriété absente du noeud : NULL plutôt qu'une erreur
+    assert rows(engine) == [(i, f"n{i}") for i in range(5)] + [(5, None)]
+
+
+def test_structure_reflechie_une_fois(engine, monkeypatch):
+    table = get_sqlite_table(engine, "t")
+    monkeypatch.setattr(sqlite_db.MetaData, "reflect", lambda *args, **kwargs: pytest.fail("réflexion inutile"))
+
+    assert get_sqlite_table(engine, "t") is table
+    sqlite_bulk_insert_data(engine, "t", [{"id": 1, "nom": "a"}], {"id": "INTEGER", "nom": "VARCHAR"})
+    assert rows(engine) == [(1, "a")]
+
+
+def test_cache_invalide_apres_changement_de_schema(engine):
+    get_sqlite_table(engine, "t")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE t ADD COLUMN age INTEGER")
+    invalidate_sqlite_metadata(engine, "t")
+
+    assert "age" in get_sqlite_table(engine, "t").columns.keys()
+
+
+def test_insertion_dans_la_transaction_en_cours(engine):
+    with engine.connect() as conn:
+        sqlite_insert_rows(conn, "t", [{"id": i, "nom": i} for i in range(5)], {"id": "INTEGER", "nom": "VARCHAR"}, 2)
+        # rien n'est validé tant que l'appelant ne l'a pas décidé
+        conn.rollback()
+        sqlite_insert_rows(conn, "t", [{"id": 1, "nom": "a"}], {"id": "INTEGER", "nom": "VARCHAR"})
+        conn.commit()
+
+    assert rows(engine) == [(1, "a")]
+
+
+def test_erreur_propagee(engine):
+    with engine.connect() as conn:
+        with pytest.raises(ValueError):
+            sqlite_insert_rows(conn, "absente", [{"id": 1}], {"id": "INTEGER"})
+        with pytest.raises(Exception):
+            sqlite_insert_rows(conn, "t", [{"id": 1}, {"id": 1}], {"id": "INTEGER"})
@@ -0,0 +1,95 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from helper.utils import build_type_plan, cast_batch, cast_value, dataframe_to_records
+
+TYPES = {
+    "entier": "INTEGER",
+    "reel": "FLOAT",
+    "texte": "VARCHAR",
+    "jour": "DATE",
+    "instant": "DATETIME",
+    "drapeau": "BOOLEAN",
+}
+
+ROWS = [
+    {"entier": 1, "reel": 1, "texte": 75001, "jour": "2020-01-05", "instant": "2020-01-05T10:00:00", "drapeau": "true"},
+    {"entier": None, "reel": None, "texte": None, "jour": None, "instant": None, "drapeau": None},
+    {"entier": 2**60 + 1, "reel": 2.5, "texte": 2**60 + 1, "jour": "0001-01-01", "instant": "x", "drapeau": "0"},
+    {"entier": "3", "reel": "3.5", "texte": 3.5, "jour": "pas une date", "drapeau": "True"},
+    {"entier": 4.0, "reel": "mauvais", "texte": "abc", "jour": "2020-1-5", "instant": "2021-02-03"},
+    {"entier": "x", "texte": date(2020, 1, 5)},
+    {"entier": 2.5, "reel": "1_000", "texte": True, "jour": 5, "instant": "2020-01-05T10:00:00+02:00", "drapeau": 1},
+    {"entier": "3.5", "reel": True, "jour": datetime(2020, 1, 5), "instant": 20200105},
+]
+
+
+def plan_for(types):
+    return build_type_plan(tuple(types), tuple(sorted(types.items())))
+
+
+def expected(rows, types):
+    return [{column: cast_value(row.get(column), type_name) for column, type_name in types.items()} for row in rows]
+
+
+def test_cast_batch_identique_a_cast_value():
+    result = cast_batch(ROWS, plan_for(TYPES))
+    # repr distingue 75001 de '75001.0' et 1 de 1.0
+    assert repr(result) == repr(expected(ROWS, TYPES))
+
+
+def test_colonnes_sans_valeur_manquante():
+    rows = [{"entier": i, "texte": i, "reel": i / 2} for i in range(5)]
+    types = {"entier": "INTEGER", "texte": "VARCHAR", "reel": "FLOAT"}
+    assert repr(cast_batch(rows, plan_for(types))) == repr(expected(rows, types))
+
+
+def test_entiers_avec_null_ni_float_ni_arrondis():
+    rows = [{"code": 75001, "grand": 1152921504606846977}, {"code": None, "grand": None}]
+    result = cast_batch(rows, plan_for({"code": "VARCHAR", "grand": "INTEGER"}))
+    assert result == [{"code": "75001", "grand": 1152921504606846977}, {"code": None, "grand": None}]
+
+
+def test_booleens_neo4j_gardes():
+    # écart voulu avec cast_value, qui rendrait False pour True
+    result = cast_batch([{"drapeau": True}, {"drapeau": False}, {"drapeau": None}], plan_for({"drapeau": "BOOLEAN"}))
+    assert [row["drapeau"] for row in result] == [True, False, None]
+
+
+def test_colonnes_hors_plan_ignorees():
+    result = cast_batch([{"entier": 1, "autre": "x"}], plan_for({"entier": "INTEGER"}))
+    assert result == [{"entier": 1}]
+    assert cast_batch([], plan_for({"entier": "INTEGER"})) == []
+
+
+def test_dataframe_to_records():
+    frame = pd.DataFrame({
+        "id": [1, 2],
+        "note": [1.5, None],
+        "jour": pd.to_datetime(["2020-01-05", None]),
+    })
+    records = dataframe_to_records(frame)
+    assert records == [
+        {"id": 1, "note": 1.5, "jour": datetime(2020, 1, 5)},
+        {"id": 2, "note": None, "jour": None},
+    ]
+    assert type(records[0]["id"]) is int
+
+
+def test_valeurs_python_natives():
+    frame = pd.DataFrame({
+        "actif": np.array([True, False]),
+        "duree": pd.to_timedelta(["1h", None]),
+        "nom": ["a", None],
+        "taux": pd.array([1, None], dtype="Int64"),
+    })
+    records = dataframe_to_records(frame)
+    assert records == [
+        {"actif": True, "duree": timedelta(hours=1), "nom": "a", "taux": 1},
+        {"actif": False, "duree": None, "nom": None, "taux": None},
+    ]
+    assert type(records[0]["actif"]) is bool
+    assert type(records[0]["taux"]) is int
+    assert dataframe_to_records(frame.iloc[:0]) == []